@@ -0,0 +1,307 @@
+"""
+Offline batch resume analyzer
+Re-scores a directory of PDFs outside the web server using the same parser,
+scoring and course pipeline as /upload-resume.
+
+Run from the backend directory:
+    python batch_analyze.py RESUME_DIR --output results.csv
+    python batch_analyze.py RESUME_DIR --output results.parquet   # needs pyarrow
+    python batch_analyze.py RESUME_DIR --db                       # insert into user_data
+
+Processed files are appended to a checkpoint (``--checkpoint``, by default
+next to the output) so an interrupted run picks up where it stopped.
+"""
+
+import abc
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from dotenv import load_dotenv
+
+import ocr
+from database import Database, ResumeData, ensure_mysql_database, get_mysql_config
+from pipeline import analyze_resume_data, build_resume_record, parse_resume
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger("batch_analyze")
+
+BASE_DIR = Path(__file__).parent
+DB_PATH = BASE_DIR / "resume_analyzer.db"
+
+COLUMNS = ["path", "status", "error"] + [f.name for f in fields(ResumeData)]
+# Parquet column types; every part file gets this schema whatever its rows hold
+COLUMN_TYPES = {"path": str, "status": str, "error": str, **{f.name: f.type for f in fields(ResumeData)}}
+
+
+# Per-file time limit inside a worker, set by _init_worker
+_timeout = 0.0
+
+
+class FileTimeout(BaseException):
+    """A single PDF took longer than --timeout. Not an Exception subclass so
+    the parsers' broad ``except Exception`` fallbacks cannot swallow it."""
+
+
+def _on_alarm(signum, frame):
+    raise FileTimeout()
+
+
+def _init_worker(timeout: float):
+    """Each worker OCRs inline; the pool itself provides the parallelism"""
+    global _timeout
+    _timeout = timeout
+    ocr.configure(workers=1)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def analyze_file(path: str) -> Dict:
+    """Worker entry point: analyse one PDF and return an output row"""
+    # Fields a failed file never got stay None (empty in CSV, null in Parquet)
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=path, status="ok")
+    if _timeout > 0:
+        # Checked between Python bytecodes, so a stall inside native code ends
+        # as soon as control returns to the parser
+        signal.setitimer(signal.ITIMER_REAL, _timeout)
+    try:
+        parsed = parse_resume(path)
+        response_data, courses = analyze_resume_data(parsed['data'], Path(path).name)
+        row.update(asdict(build_resume_record(response_data, courses)))
+    except FileTimeout:
+        row.update(status="timeout", error=f"Timed out after {_timeout}s")
+    except Exception as e:
+        row.update(status="error", error=str(e) or type(e).__name__)
+    finally:
+        if _timeout > 0:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return row
+
+
+def find_pdfs(directory: Path, recursive: bool = True) -> List[str]:
+    pattern = "**/*" if recursive else "*"
+    return sorted(str(p) for p in directory.glob(pattern) if p.is_file() and p.suffix.lower() == ".pdf")
+
+
+def load_checkpoint(path: Path) -> Set[str]:
+    """Files already handled by an earlier run"""
+    done = set()
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue  # torn last line from a killed run
+    return done
+
+
+class ResultWriter(abc.ABC):
+    """Buffers rows and flushes them to the output, then to the checkpoint,
+    so a row is only marked done once it is stored"""
+
+    def __init__(self, checkpoint: Path, batch_size: int):
+        self.checkpoint = open(checkpoint, "a", encoding="utf-8")
+        self.batch_size = batch_size
+        self.rows: List[Dict] = []
+
+    def add(self, row: Dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        self.write(self.rows)
+        for row in self.rows:
+            self.checkpoint.write(json.dumps({"path": row["path"], "status": row["status"]}) + "\n")
+        self.checkpoint.flush()
+        self.rows = []
+
+    @abc.abstractmethod
+    def write(self, rows: List[Dict]):
+        """Store a batch of rows"""
+
+    def close(self):
+        self.flush()
+        self.checkpoint.close()
+
+
+class CsvWriter(ResultWriter):
+    def __init__(self, output: Path, checkpoint: Path, batch_size: int):
+        super().__init__(checkpoint, batch_size)
+        new_file = not output.exists() or output.stat().st_size == 0
+        self.file = open(output, "a", newline="", encoding="utf-8")
+        self.csv = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        if new_file:
+            self.csv.writeheader()
+
+    def write(self, rows: List[Dict]):
+        self.csv.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class ParquetWriter(ResultWriter):
+    """Writes one part file per batch into a dataset directory, so resumed
+    runs add parts instead of rewriting earlier ones"""
+
+    def __init__(self, output: Path, checkpoint: Path, batch_size: int):
+        if not HAS_PYARROW:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        super().__init__(checkpoint, batch_size)
+        self.output = output
+        self.output.mkdir(parents=True, exist_ok=True)
+        self.schema = pa.schema([(name, pa.int64() if COLUMN_TYPES[name] is int else pa.string())
+                                 for name in COLUMNS])
+
+    def write(self, rows: List[Dict]):
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        part = self.output / f"part-{time.time_ns()}.parquet"
+        pq.write_table(table, part)
+
+
+class DatabaseWriter(ResultWriter):
+    """Bulk-inserts successful rows into user_data"""
+
+    def __init__(self, db: Database, checkpoint: Path, batch_size: int):
+        super().__init__(checkpoint, batch_size)
+        self.db = db
+
+    def write(self, rows: List[Dict]):
+        records = [ResumeData(**{f.name: row[f.name] for f in fields(ResumeData)})
+                   for row in rows if row["status"] == "ok"]
+        try:
+            self.db.insert_resume_data_batch(records)
+            return
+        except Exception as batch_err:
+            # One bad row fails the whole executemany; save the rest individually
+            logger.warning(f"Batch insert of {len(records)} rows failed, retrying row by row: {batch_err}")
+        for record in records:
+            try:
+                self.db.insert_resume_data(record)
+            except Exception as db_err:
+                logger.warning(f"Insert failed for {record.name}: {db_err}")
+
+    def close(self):
+        super().close()
+        self.db.close()
+
+
+class Progress:
+    """Periodic one-line progress report on stderr"""
+
+    def __init__(self, total: int, interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.counts = {"ok": 0, "error": 0, "timeout": 0}
+        self.started = time.monotonic()
+        self.last = 0.0
+
+    def update(self, status: str):
+        self.counts[status] = self.counts.get(status, 0) + 1
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.report()
+            self.last = now
+
+    def report(self):
+        done = sum(self.counts.values())
+        elapsed = time.monotonic() - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - done) / rate if rate > 0 else 0.0
+        summary = ", ".join(f"{k}={v}" for k, v in self.counts.items())
+        print(f"[{done}/{self.total}] {rate:.1f} files/s, eta {eta:.0f}s ({summary})", file=sys.stderr)
+
+
+def run(paths: Iterable[str], writer: ResultWriter, workers: int, chunksize: int, timeout: float,
+        total: int) -> Dict[str, int]:
+    progress = Progress(total)
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(timeout,), maxtasksperchild=500)
+    try:
+        for row in pool.imap_unordered(analyze_file, paths, chunksize=chunksize):
+            writer.add(row)
+            progress.update(row["status"])
+        pool.close()
+    except KeyboardInterrupt:
+        print("Interrupted, saving progress...", file=sys.stderr)
+        pool.terminate()
+    finally:
+        pool.join()
+        writer.close()
+        progress.report()
+    return progress.counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyze a directory of resume PDFs")
+    parser.add_argument("directory", type=Path, help="Directory to scan for PDFs")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", type=Path, help="Results file: .csv, or .parquet (a dataset directory)")
+    target.add_argument("--db", action="store_true", help="Insert results into user_data (MySQL if configured, else SQLite)")
+    parser.add_argument("--sqlite-path", type=Path, default=DB_PATH, help="SQLite database for --db")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=8, help="Files handed to a worker at a time")
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows per output flush / bulk insert")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed per file (0 disables)")
+    parser.add_argument("--no-recursive", dest="recursive", action="store_false", help="Only scan the top-level directory")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING)
+    args = parse_args(argv)
+
+    if not args.directory.is_dir():
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+
+    if args.db:
+        mysql_cfg = get_mysql_config()
+        ensure_mysql_database(mysql_cfg)
+        db = Database(str(args.sqlite_path), mysql_config=mysql_cfg)
+        db.create_tables()
+        checkpoint = args.checkpoint or Path(f"{args.sqlite_path}.checkpoint.jsonl")
+        writer: ResultWriter = DatabaseWriter(db, checkpoint, args.batch_size)
+    else:
+        checkpoint = args.checkpoint or Path(f"{args.output}.checkpoint.jsonl")
+        if args.output.suffix.lower() == ".parquet":
+            writer = ParquetWriter(args.output, checkpoint, args.batch_size)
+        else:
+            writer = CsvWriter(args.output, checkpoint, args.batch_size)
+
+    done = load_checkpoint(checkpoint)
+    paths = [p for p in find_pdfs(args.directory, args.recursive) if p not in done]
+    print(f"{len(paths)} PDFs to analyze ({len(done)} already done per {checkpoint})", file=sys.stderr)
+    if not paths:
+        writer.close()
+        return 0
+
+    run(paths, writer, max(1, args.workers), max(1, args.chunksize), args.timeout, len(paths))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Synthetic resume corpus
+Deterministic resume PDFs built with PyMuPDF: plain text, multi-column,
+scanned (image-only) and mixed documents from 1 to 20 pages, plus a
+skills-heavy variant. The same seed always yields byte-identical text.
+
+Write the corpus to disk for manual inspection:
+    python -m benchmarks.corpus OUT_DIR
+"""
+
+import argparse
+import random
+import textwrap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import fitz
+
+import resume_parser_enhanced
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+COLUMN_GAP = 20
+FONT_SIZE = 10
+LINES_PER_COLUMN = 50
+CHARS_PER_LINE = 88
+SCAN_DPI = 150
+
+FIRST_NAMES = ['Alex', 'Priya', 'Jordan', 'Wei', 'Maria', 'Samuel', 'Aisha', 'Lucas', 'Hana', 'Omar']
+LAST_NAMES = ['Morgan', 'Sharma', 'Lee', 'Chen', 'Garcia', 'Okafor', 'Khan', 'Silva', 'Tanaka', 'Haddad']
+DEGREES = [
+    'B.Tech in Computer Science, National Institute of Technology',
+    'Master of Science in Data Science, State University',
+    'Bachelor of Engineering in Information Technology',
+    'MBA, School of Business',
+]
+VERBS = ['Built', 'Designed', 'Led', 'Maintained', 'Optimized', 'Migrated', 'Automated', 'Delivered']
+OBJECTS = [
+    'a customer-facing dashboard', 'the payments service', 'data pipelines', 'internal tooling',
+    'the search backend', 'CI/CD workflows', 'a recommendation engine', 'mobile onboarding flows',
+]
+OUTCOMES = [
+    'cutting latency by 40%', 'serving 2M monthly users', 'reducing cloud spend by 25%',
+    'improving test coverage to 85%', 'with a team of five engineers', 'ahead of schedule',
+]
+
+
+@dataclass
+class SyntheticResume:
+    name: str
+    kind: str
+    pages: int
+    skills: List[str]
+    text: str
+    pdf: bytes
+
+
+def _skill_names(rng: random.Random, count: int) -> List[str]:
+    """Skill spellings the parsers recognise (regex escapes removed)"""
+    aliases = sorted({a.replace('\\', '') for v in resume_parser_enhanced.SKILLS.values() for a in v
+                      if '[' not in a and '(' not in a})
+    rng.shuffle(aliases)
+    return [aliases[i % len(aliases)] for i in range(count)]
+
+
+def _resume_lines(rng: random.Random, pages: int, columns: int, skills: List[str]) -> Tuple[str, List[str]]:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    width = CHARS_PER_LINE // columns - (columns - 1) * 2
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "",
+        "SKILLS",
+    ]
+    lines += textwrap.wrap(", ".join(skills), width)
+    lines += ["", "EDUCATION", rng.choice(DEGREES), ""]
+    lines.append("EXPERIENCE")
+    target = pages * columns * LINES_PER_COLUMN
+    year = 2024
+    while len(lines) < target:
+        if rng.random() < 0.12:
+            lines += ["", f"Software Engineer, Company {rng.randint(1, 99)} ({year - 2} - {year})"]
+            year -= 2
+        bullet = f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}, {rng.choice(OUTCOMES)}."
+        lines += textwrap.wrap(bullet, width, subsequent_indent='  ')
+    return name, lines[:target]
+
+
+def _draw_text_page(page, lines: List[str], columns: int):
+    col_width = (PAGE_WIDTH - 2 * MARGIN - (columns - 1) * COLUMN_GAP) / columns
+    for col in range(columns):
+        chunk = lines[col * LINES_PER_COLUMN:(col + 1) * LINES_PER_COLUMN]
+        left = MARGIN + col * (col_width + COLUMN_GAP)
+        rect = fitz.Rect(left, MARGIN, left + col_width, PAGE_HEIGHT - MARGIN)
+        if page.insert_textbox(rect, "\n".join(chunk), fontsize=FONT_SIZE, fontname="helv") < 0:
+            raise ValueError("Synthetic page text does not fit its column")
+
+
+def _scan(page) -> bytes:
+    """Grayscale PNG of a rendered page, as a scanner would produce"""
+    pix = page.get_pixmap(dpi=SCAN_DPI, colorspace=fitz.csGRAY)
+    return pix.tobytes("png")
+
+
+def build_resume(kind: str, pages: int, seed: int, skill_count: int = 25, columns: int = 1) -> SyntheticResume:
+    """One synthetic resume.
+
+    kind: 'text', 'multicolumn', 'scanned' (every page image-only) or
+    'mixed' (odd pages scanned).
+    """
+    rng = random.Random(seed)
+    if kind == 'multicolumn':
+        columns = max(columns, 2)
+    skills = _skill_names(rng, skill_count)
+    name, lines = _resume_lines(rng, pages, columns, skills)
+
+    per_page = columns * LINES_PER_COLUMN
+    doc = fitz.open()
+    scratch = fitz.open()
+    for number in range(pages):
+        page_lines = lines[number * per_page:(number + 1) * per_page]
+        scanned = kind == 'scanned' or (kind == 'mixed' and number % 2 == 1)
+        if scanned:
+            src = scratch.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            _draw_text_page(src, page_lines, columns)
+            page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            page.insert_image(page.rect, stream=_scan(src))
+        else:
+            _draw_text_page(doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT), page_lines, columns)
+    doc.set_metadata({"producer": f"benchmarks.corpus ({kind})", "creator": "benchmarks.corpus"})
+    pdf = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    scratch.close()
+    return SyntheticResume(name, kind, pages, skills, "\n".join(lines), pdf)
+
+
+# (kind, pages, skill_count)
+DEFAULT_SPECS = [
+    ('text', 1, 25), ('text', 2, 25), ('text', 5, 25), ('text', 10, 25), ('text', 20, 25),
+    ('multicolumn', 1, 25), ('multicolumn', 2, 25), ('multicolumn', 5, 25),
+    ('scanned', 1, 25), ('scanned', 2, 25), ('scanned', 5, 25),
+    ('mixed', 4, 25),
+    ('text', 2, 300),
+]
+
+
+def build_corpus(seed: int = 7, kinds: Optional[List[str]] = None, max_pages: int = 20) -> List[SyntheticResume]:
+    """The default benchmark corpus, optionally filtered by kind/page count"""
+    corpus = []
+    for i, (kind, pages, skill_count) in enumerate(DEFAULT_SPECS):
+        if (kinds and kind not in kinds) or pages > max_pages:
+            continue
+        corpus.append(build_resume(kind, pages, seed + i, skill_count=skill_count))
+    return corpus
+
+
+def case_id(resume: SyntheticResume) -> str:
+    return f"{resume.kind}-{resume.pages}p-{len(resume.skills)}s"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write the synthetic resume corpus to a directory")
+    ap.add_argument('out_dir', type=Path)
+    ap.add_argument('--seed', type=int, default=7)
+    args = ap.parse_args()
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    for resume in build_corpus(args.seed):
+        path = args.out_dir / f"{case_id(resume)}.pdf"
+        path.write_bytes(resume.pdf)
+        print(f"{path} ({len(resume.pdf) // 1024} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Skill search benchmark
+Builds a synthetic candidate pool in a temporary SQLite database and times
+/admin/search queries on the SQL skill index (Database.search_resumes)
+against the in-memory bitmap index (SkillIndex.search), checking that both
+return the same resumes.
+
+Run from the backend directory:
+    python -m benchmarks.skill_index
+    python -m benchmarks.skill_index --rows 200000 --repeat 50
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import resume_parser_enhanced
+from database import SEARCH_COUNT_LIMIT, Database, ResumeData
+from skill_index import SkillIndex
+
+FIELDS = ['Data Science', 'Web Development', 'Android Development', 'iOS Development', 'UI/UX Design', 'General IT']
+LEVELS = ['Fresher', 'Intermediate', 'Mid-Level', 'Senior']
+INSERT_BATCH = 1000
+
+# (skills, filters)
+QUERIES = [
+    ('python', {}),
+    ('react,docker', {}),
+    ('react|vue|angular,node.js', {}),
+    ('python,sql,aws,docker', {}),
+    ('python', {'field': 'Data Science', 'min_score': 80}),
+    ('python,sql,aws,docker', {'field': 'Data Science', 'min_score': 80}),
+    ('ios|android', {'level': 'Senior'}),
+    ('tableau,power bi', {'kind': 'recommended'}),
+]
+
+
+def synthetic_rows(count: int, seed: int) -> List[ResumeData]:
+    """Deterministic resume rows; skill popularity falls off with taxonomy order"""
+    rng = random.Random(seed)
+    skills = list(resume_parser_enhanced.SKILLS)
+    weights = [1 / (rank + 1) for rank in range(len(skills))]
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        actual = set(rng.choices(skills, weights, k=rng.randint(3, 12)))
+        recommended = rng.sample([s for s in skills if s not in actual], 4)
+        rows.append(ResumeData(
+            name=f"Candidate {i}", email=f"candidate{i}@example.com",
+            resume_score=max(0, min(100, int(rng.gauss(62, 15)))),
+            timestamp=(start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+            page_no=rng.randint(1, 3), predicted_field=rng.choice(FIELDS), user_level=rng.choice(LEVELS),
+            actual_skills=', '.join(sorted(actual)), recommended_skills=', '.join(recommended),
+            recommended_courses='',
+        ))
+    return rows
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(rows: int, repeat: int, seed: int = 0) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / 'bench.db'))
+        try:
+            db.create_tables()
+            records = synthetic_rows(rows, seed)
+            start = time.perf_counter()
+            for i in range(0, len(records), INSERT_BATCH):
+                db.insert_resume_data_batch(records[i:i + INSERT_BATCH])
+            insert_s = time.perf_counter() - start
+
+            index = SkillIndex()
+            start = time.perf_counter()
+            index.load(db)
+            load_s = time.perf_counter() - start
+
+            results = []
+            for skills, filters in QUERIES:
+                sql = db.search_resumes(skills, **filters)
+                hits = index.search(skills, **filters)
+                if [r['id'] for r in sql['resumes']] != hits['ids'] or \
+                        sql['total'] != min(hits['total'], SEARCH_COUNT_LIMIT):
+                    raise AssertionError(f"{skills} {filters}: SQL and bitmap results differ")
+                results.append({
+                    'query': skills + ''.join(f" {k}={v}" for k, v in filters.items()),
+                    'matches': hits['total'],
+                    'sql_ms': round(_time(lambda: db.search_resumes(skills, **filters), repeat), 3),
+                    'bitmap_ms': round(_time(lambda: index.search(skills, **filters), repeat), 3),
+                    'bitmap_rows_ms': round(_time(
+                        lambda: db.get_search_rows(index.search(skills, **filters)['ids']), repeat), 3),
+                })
+        finally:
+            db.close()
+    return {'rows': rows, 'backend': index.backend, 'insert_s': round(insert_s, 2),
+            'load_s': round(load_s, 2), 'queries': results}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--rows', type=int, default=50000)
+    ap.add_argument('--repeat', type=int, default=20)
+    args = ap.parse_args()
+
+    report = run(args.rows, args.repeat)
+    print(f"{report['rows']} resumes, {report['backend']} bitmaps: "
+          f"SQL insert {report['insert_s']}s, index load {report['load_s']}s")
+    print(f"{'query':<52}{'matches':>9}{'sql ms':>9}{'bitmap ms':>11}{'+rows ms':>10}")
+    for r in report['queries']:
+        print(f"{r['query']:<52}{r['matches']:>9}{r['sql_ms']:>9}{r['bitmap_ms']:>11}{r['bitmap_rows_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
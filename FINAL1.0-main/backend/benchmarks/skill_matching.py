@@ -0,0 +1,132 @@
+"""
+Skill matching benchmark
+Compares the compiled SkillMatcher against the previous per-alias
+re.search loops on long synthetic resumes.
+
+Run from the backend directory:
+    python -m benchmarks.skill_matching
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, Dict, List
+
+import resume_parser
+import resume_parser_enhanced
+
+FILLER = [
+    'developed', 'maintained', 'team', 'project', 'using', 'built', 'the', 'and',
+    'with', 'data', 'system', 'performance', 'led', 'design', 'implemented',
+    'services', 'customer', 'improved', 'across', 'platform', 'delivered',
+    'requirements', 'stakeholders', 'production', 'features', 'responsible',
+]
+
+
+def legacy_resume_parser(text_lower: str) -> List[str]:
+    """Skill loop as it was in ResumeParser.extract_skills"""
+    found_skills = []
+    for skill_name, patterns in resume_parser.ALL_SKILLS.items():
+        for pattern in patterns:
+            if re.search(r'\b' + re.escape(pattern) + r'\b', text_lower):
+                if skill_name not in found_skills:
+                    found_skills.append(skill_name)
+                break
+    return found_skills
+
+
+def legacy_enhanced(text_lower: str) -> List[str]:
+    """Skill loop as it was in ResumeParserEnhanced.extract_skills"""
+    found_skills = []
+    tokens = re.split(r'[\s,;\|\/]+', text_lower)
+    dotted_parts = []
+    for tok in tokens:
+        dotted_parts.extend(tok.split('.'))
+    tokens.extend(dotted_parts)
+
+    for skill, patterns in resume_parser_enhanced.SKILLS.items():
+        for pattern in patterns:
+            if re.search(r'\b' + pattern + r'\b', text_lower):
+                found_skills.append(skill)
+                break
+            if pattern in tokens:
+                found_skills.append(skill)
+                break
+    return list(dict.fromkeys(found_skills))
+
+
+def compiled_resume_parser(text_lower: str) -> List[str]:
+    return resume_parser._SKILL_MATCHER.find(text_lower)
+
+
+def compiled_enhanced(text_lower: str) -> List[str]:
+    tokens = re.split(r'[\s,;\|\/]+', text_lower)
+    dotted_parts = []
+    for tok in tokens:
+        dotted_parts.extend(tok.split('.'))
+    tokens.extend(dotted_parts)
+    return resume_parser_enhanced._SKILL_MATCHER.find(text_lower, tokens=set(tokens))
+
+
+def synthetic_resume(words: int, skill_density: float, seed: int) -> str:
+    """Deterministic resume-like text with skill aliases sprinkled in"""
+    rng = random.Random(seed)
+    aliases = [a for v in resume_parser.ALL_SKILLS.values() for a in v]
+    aliases += [a.replace('\\', '') for v in resume_parser_enhanced.SKILLS.values() for a in v]
+    out = []
+    for i in range(words):
+        out.append(rng.choice(aliases) if rng.random() < skill_density else rng.choice(FILLER))
+        if i % 12 == 11:
+            out.append(rng.choice([',', '.', '\n', '|', '/']))
+    return ' '.join(out).lower()
+
+
+def _time(fn: Callable[[str], List[str]], text: str, repeat: int) -> float:
+    fn(text)  # warm regex caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(sizes: List[int], repeat: int) -> List[Dict]:
+    results = []
+    pairs = [
+        ('resume_parser', legacy_resume_parser, compiled_resume_parser),
+        ('resume_parser_enhanced', legacy_enhanced, compiled_enhanced),
+    ]
+    for words in sizes:
+        for density in (0.0, 0.02, 0.1):
+            text = synthetic_resume(words, density, seed=words)
+            for name, legacy, compiled in pairs:
+                if legacy(text) != compiled(text):
+                    raise AssertionError(f"{name}: results differ for {words} words, density {density}")
+                legacy_ms = _time(legacy, text, repeat)
+                compiled_ms = _time(compiled, text, repeat)
+                results.append({
+                    'parser': name,
+                    'words': words,
+                    'skill_density': density,
+                    'chars': len(text),
+                    'legacy_ms': round(legacy_ms, 3),
+                    'compiled_ms': round(compiled_ms, 3),
+                    'speedup': round(legacy_ms / compiled_ms, 1) if compiled_ms else None,
+                })
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 8000])
+    ap.add_argument('--repeat', type=int, default=10)
+    args = ap.parse_args()
+
+    print(f"{'parser':<24}{'words':>7}{'density':>9}{'chars':>8}{'legacy ms':>11}{'compiled ms':>13}{'speedup':>9}")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['parser']:<24}{r['words']:>7}{r['skill_density']:>9}{r['chars']:>8}"
+              f"{r['legacy_ms']:>11}{r['compiled_ms']:>13}{r['speedup']:>8}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Stage-level pipeline benchmark
+Times each stage of resume analysis separately on the synthetic corpus and
+writes the results as JSON so runs can be compared across versions.
+
+Run from the backend directory:
+    python -m benchmarks.stages
+    python -m benchmarks.stages --kinds text scanned --repeat 5
+    python -m benchmarks.stages --compare benchmarks/results/OLD.json
+
+Text stages (skills, name, scoring, keywords...) run on the generator's
+ground-truth text, so their timings do not depend on OCR quality.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+import ocr
+from courses import get_personalized_courses
+from resume_parser_enhanced import PARSER_VERSION, TAXONOMY_VERSION, ResumeParserEnhanced
+from src import job_api
+from src.helper import EXTRACTOR_VERSION, extract_keywords
+
+from benchmarks.corpus import DEFAULT_SPECS, SyntheticResume, build_corpus, case_id
+
+RESULTS_DIR = Path(__file__).parent / "results"
+FEED_ITEMS = 400
+
+STAGES = [
+    'extract_text', 'extract_text_ocr', 'extract_skills', 'extract_name', 'analyze_skills',
+    'calculate_score', 'get_personalized_courses', 'extract_keywords', 'fetch_rss_jobs',
+]
+
+
+def write_feed_fixture(directory: Path, items: int = FEED_ITEMS, seed: int = 7) -> Path:
+    """Local RSS feed shaped like the real job boards, so fetch_rss_jobs is
+    timed without the network"""
+    rng = random.Random(seed)
+    titles = ['Backend Engineer', 'Frontend Developer', 'Data Scientist', 'DevOps Engineer',
+              'Full Stack Developer', 'Mobile Developer', 'ML Engineer', 'QA Automation Engineer']
+    stacks = ['Python, Django, PostgreSQL', 'React, TypeScript, GraphQL', 'Go, Kubernetes, AWS',
+              'Java, Spring, Kafka', 'Node.js, Express, MongoDB', 'Swift, Kotlin, Firebase']
+    published = format_datetime(datetime(2024, 1, 1, tzinfo=timezone.utc))
+    entries = []
+    for i in range(items):
+        title = f"{rng.choice(titles)} - Company {i}"
+        summary = f"We are hiring. Stack: {rng.choice(stacks)}. Remote friendly."
+        entries.append(
+            f"<item><title>{escape(title)}</title><link>https://jobs.example.com/{i}</link>"
+            f"<description>{escape(summary)}</description><pubDate>{published}</pubDate></item>"
+        )
+    path = directory / "jobs_feed.xml"
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        "<title>Benchmark jobs</title><link>https://jobs.example.com</link><description>fixture</description>"
+        + "".join(entries) + "</channel></rss>",
+        encoding="utf-8",
+    )
+    return path
+
+
+def _time(fn: Callable[[], object], repeat: int) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'repeat': repeat,
+    }
+
+
+def _has_tesseract() -> bool:
+    return ocr.health_check()["ok"]
+
+
+def bench_resume(resume: SyntheticResume, repeat: int, run_ocr: bool, feed_path: Path) -> Dict[str, Dict]:
+    """Time every stage for one corpus document"""
+    parser = ResumeParserEnhanced("", data=resume.pdf)
+    text = resume.text
+    timings: Dict[str, Dict] = {}
+
+    timings['extract_text'] = _time(parser.extract_text, repeat)
+    if run_ocr and resume.kind in ('scanned', 'mixed'):
+        timings['extract_text_ocr'] = _time(parser.extract_text_ocr, max(1, repeat // 2))
+
+    skills = parser.extract_skills(text)
+    timings['extract_skills'] = _time(lambda: parser.extract_skills(text), repeat)
+    timings['extract_name'] = _time(lambda: parser.extract_name(text), repeat)
+
+    analysis = parser.analyze_skills(skills)
+    timings['analyze_skills'] = _time(lambda: parser.analyze_skills(skills), repeat)
+    resume_data = parser.parse_text(text, resume.pages)
+    timings['calculate_score'] = _time(lambda: parser.calculate_score(resume_data, analysis), repeat)
+    timings['get_personalized_courses'] = _time(lambda: get_personalized_courses(
+        user_skills=skills, field=analysis['field'],
+        recommended_skills=analysis.get('recommended_skills', []), max_courses=8,
+    ), repeat)
+
+    keywords, _ = extract_keywords(text, limit=12)
+    timings['extract_keywords'] = _time(lambda: extract_keywords(text, limit=12), repeat)
+
+    original_feeds = job_api.RSS_FEEDS
+    job_api.RSS_FEEDS = [("Fixture", str(feed_path))]
+    try:
+        timings['fetch_rss_jobs'] = _time(lambda: job_api.fetch_rss_jobs(keywords, rows=60), repeat)
+    finally:
+        job_api.RSS_FEEDS = original_feeds
+    return timings
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(seed: int, kinds: Optional[List[str]], max_pages: int, repeat: int, run_ocr: bool) -> Dict:
+    corpus = build_corpus(seed, kinds, max_pages)
+    cases = []
+    with tempfile.TemporaryDirectory() as tmp:
+        feed_path = write_feed_fixture(Path(tmp))
+        for resume in corpus:
+            # Warm-up pass so import/regex compilation costs are not attributed to the first case
+            bench_resume(resume, 1, False, feed_path)
+            timings = bench_resume(resume, repeat, run_ocr, feed_path)
+            cases.append({'case': case_id(resume), 'kind': resume.kind, 'pages': resume.pages,
+                          'skills': len(resume.skills), 'pdf_bytes': len(resume.pdf), 'stages': timings})
+            print(f"{case_id(resume):<24}" + " ".join(
+                f"{stage}={t['median_ms']:.2f}ms" for stage, t in timings.items()), file=sys.stderr)
+
+    totals = {}
+    for stage in STAGES:
+        medians = [c['stages'][stage]['median_ms'] for c in cases if stage in c['stages']]
+        if medians:
+            totals[stage] = {'cases': len(medians), 'sum_median_ms': round(sum(medians), 3),
+                             'max_median_ms': round(max(medians), 3)}
+
+    return {
+        'benchmark': 'stages',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': {'parser': PARSER_VERSION, 'taxonomy': TAXONOMY_VERSION, 'extractor': EXTRACTOR_VERSION},
+        'config': {'seed': seed, 'kinds': kinds, 'max_pages': max_pages, 'repeat': repeat,
+                   'ocr': run_ocr, 'ocr_engine': ocr.engine_name(), 'ocr_workers': ocr.OCR_WORKERS,
+                   'feed_items': FEED_ITEMS},
+        'cases': cases,
+        'totals': totals,
+    }
+
+
+def compare(current: Dict, baseline: Dict):
+    """Print per-case, per-stage median ratios against an earlier run"""
+    old = {c['case']: c['stages'] for c in baseline['cases']}
+    print(f"\nvs {baseline.get('git_revision')} ({baseline.get('created')}): ratio = new / old median")
+    for case in current['cases']:
+        if case['case'] not in old:
+            continue
+        ratios = []
+        for stage, t in case['stages'].items():
+            before = old[case['case']].get(stage)
+            if before and before['median_ms'] > 0:
+                ratios.append(f"{stage}={t['median_ms'] / before['median_ms']:.2f}x")
+        print(f"{case['case']:<24}" + " ".join(ratios))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--seed', type=int, default=7)
+    ap.add_argument('--kinds', nargs='+', choices=sorted({k for k, _, _ in DEFAULT_SPECS}))
+    ap.add_argument('--max-pages', type=int, default=20)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--no-ocr', dest='ocr', action='store_false', help='Skip the extract_text_ocr stage')
+    ap.add_argument('--output', type=Path, help='JSON results path (default: benchmarks/results/stages-<time>.json)')
+    ap.add_argument('--compare', type=Path, help='Earlier results JSON to compare against')
+    args = ap.parse_args()
+
+    run_ocr = args.ocr and _has_tesseract()
+    if args.ocr and not run_ocr:
+        print("tesseract not available, skipping extract_text_ocr", file=sys.stderr)
+
+    results = run(args.seed, args.kinds, args.max_pages, args.repeat, run_ocr)
+
+    output = args.output or RESULTS_DIR / f"stages-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    print(f"\n{'stage':<26}{'cases':>6}{'sum ms':>12}{'max ms':>12}")
+    for stage, t in results['totals'].items():
+        print(f"{stage:<26}{t['cases']:>6}{t['sum_median_ms']:>12.2f}{t['max_median_ms']:>12.2f}")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == '__main__':
+    main()
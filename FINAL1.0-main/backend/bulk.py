@@ -0,0 +1,202 @@
+"""
+Bulk resume ingestion
+Expands a multipart batch (PDFs and/or zip archives) into resumes, analyses
+them concurrently on the extraction pool and streams one NDJSON line per
+resume as it finishes; database rows go through the write-behind buffer.
+Upload parts are spooled to a per-request temp directory, so only the
+resumes being analysed are held in memory.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastapi import UploadFile
+
+from cache import TieredCache
+from executors import EXTRACTION_WORKERS, ServerBusy
+from jobs import UnreadableResume, analyze_resume_file
+from pipeline import build_resume_record
+from write_behind import WriteBehindBuffer, WriterClosed
+
+logger = logging.getLogger("resume_analyzer")
+
+# Resumes accepted per request (PDFs plus zip members)
+BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "500"))
+# Entries (files and directories) a zip archive may list; larger archives are rejected unread
+BULK_MAX_ZIP_ENTRIES = int(os.getenv("BULK_MAX_ZIP_ENTRIES", str(2 * BULK_MAX_FILES)))
+# Per-resume limit, same as /upload-resume
+BULK_MAX_FILE_BYTES = 10 * 1024 * 1024
+# Total upload size per request (all parts, as sent); larger batches get a 413
+BULK_MAX_TOTAL_BYTES = int(os.getenv("BULK_MAX_TOTAL_MB", "1024")) * 1024 * 1024
+# Where upload parts are spooled while a batch runs (default: the system temp dir)
+BULK_SPOOL_DIR = os.getenv("BULK_SPOOL_DIR") or None
+# Resumes analysed at once; defaults to the extraction pool size so a batch
+# keeps every worker busy without tripping the pool's admission limit
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", str(EXTRACTION_WORKERS)))
+# Attempts per resume while the extraction pool is saturated
+BULK_BUSY_RETRIES = 5
+
+
+class BulkTooLarge(Exception):
+    """The upload parts add up to more than BULK_MAX_TOTAL_BYTES"""
+
+
+@dataclass
+class BulkItem:
+    """One resume from a bulk upload; zip members are only decompressed when
+    the resume is analysed"""
+    filename: str
+    size: int
+    read: Callable[[], bytes]
+    error: Optional[str] = None
+
+
+def _check_pdf(filename: str, size: int) -> Optional[str]:
+    if not filename.lower().endswith(".pdf"):
+        return "Only PDF files are supported"
+    if size == 0:
+        return "File is empty"
+    if size > BULK_MAX_FILE_BYTES:
+        return "File size exceeds 10MB limit"
+    return None
+
+
+def new_spool_dir() -> Path:
+    """A private directory for one request's upload parts"""
+    return Path(tempfile.mkdtemp(prefix="bulk-", dir=BULK_SPOOL_DIR))
+
+
+def remove_spool_dir(spool_dir: Path):
+    shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+def _spool(source, path: Path, budget: int) -> int:
+    """Copy an upload part to ``path`` in chunks; returns its size. Raises
+    BulkTooLarge once more than ``budget`` bytes have been copied."""
+    size = 0
+    with open(path, "wb") as out:
+        while True:
+            chunk = source.read(1024 * 1024)
+            if not chunk:
+                return size
+            size += len(chunk)
+            if size > budget:
+                raise BulkTooLarge(f"Upload exceeds {BULK_MAX_TOTAL_BYTES // (1024 * 1024)}MB in total")
+            out.write(chunk)
+
+
+def _zip_members(path: Path):
+    with zipfile.ZipFile(path) as archive:
+        return archive.infolist()
+
+
+def _read_member(path: Path, info: zipfile.ZipInfo) -> bytes:
+    with zipfile.ZipFile(path) as archive:
+        return archive.read(info)
+
+
+async def expand_uploads(files: List[UploadFile], spool_dir: Path) -> List[BulkItem]:
+    """Turn uploaded PDFs and zip archives into a flat list of resumes.
+
+    Each part is copied to ``spool_dir`` here because the form files are
+    closed once the endpoint returns, before the streamed response is
+    consumed. Copying and reading the zip directory happen in a thread;
+    files and members are read later, also in a thread (see _analyze_item).
+    Raises BulkTooLarge past BULK_MAX_TOTAL_BYTES.
+    """
+    items: List[BulkItem] = []
+    budget = BULK_MAX_TOTAL_BYTES
+    for number, upload in enumerate(files):
+        name = upload.filename or "unnamed"
+        path = spool_dir / str(number)
+        await upload.seek(0)
+        size = await asyncio.to_thread(_spool, upload.file, path, budget)
+        budget -= size
+
+        if name.lower().endswith(".zip"):
+            try:
+                members = await asyncio.to_thread(_zip_members, path)
+            except zipfile.BadZipFile:
+                items.append(BulkItem(name, size, bytes, error="Not a valid zip archive"))
+                continue
+            if len(members) > BULK_MAX_ZIP_ENTRIES:
+                items.append(BulkItem(name, size, bytes,
+                                      error=f"Archive lists too many entries (max {BULK_MAX_ZIP_ENTRIES})"))
+                continue
+            for info in members:
+                member = PurePosixPath(info.filename)
+                if info.is_dir() or member.name.startswith(".") or "__MACOSX" in member.parts:
+                    continue
+                display = f"{name}/{info.filename}"
+                items.append(BulkItem(
+                    display, info.file_size,
+                    lambda path=path, info=info: _read_member(path, info),
+                    error=_check_pdf(member.name, info.file_size),
+                ))
+        else:
+            items.append(BulkItem(name, size, path.read_bytes, error=_check_pdf(name, size)))
+    return items
+
+
+async def _analyze_item(item: BulkItem, writer: WriteBehindBuffer, cache: TieredCache, slots: asyncio.Semaphore) -> dict:
+    if item.error:
+        return {"filename": item.filename, "status": "error", "error": item.error}
+    async with slots:
+        try:
+            # Spooled files are read (and zip members inflated) here; keep that off the event loop
+            data = await asyncio.to_thread(item.read)
+            for attempt in range(BULK_BUSY_RETRIES):
+                try:
+                    result = await analyze_resume_file(item.filename, data, PurePosixPath(item.filename).name,
+                                                       writer, cache, save=False)
+                    break
+                except ServerBusy as busy:
+                    # Interactive uploads share the pool; back off instead of failing the item
+                    if attempt == BULK_BUSY_RETRIES - 1:
+                        raise
+                    await asyncio.sleep(busy.retry_after)
+        except UnreadableResume as e:
+            return {"filename": item.filename, "status": "error", "error": f"Could not read the PDF: {e}"}
+        except Exception as e:
+            logger.exception(f"Bulk analysis failed for {item.filename}")
+            return {"filename": item.filename, "status": "error", "error": str(e)}
+    return {"filename": item.filename, "status": "ok", "result": result}
+
+
+async def stream_bulk_analysis(items: List[BulkItem], writer: WriteBehindBuffer, cache: TieredCache,
+                               spool_dir: Optional[Path] = None) -> AsyncIterator[str]:
+    """NDJSON lines, one per resume in completion order, then a summary line.
+    ``spool_dir`` is removed once the stream ends."""
+    slots = asyncio.Semaphore(max(1, BULK_CONCURRENCY))
+    tasks = [asyncio.create_task(_analyze_item(item, writer, cache, slots)) for item in items]
+    writes: List[asyncio.Future] = []
+    counts = {"total": len(items), "ok": 0, "error": 0, "saved": 0}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            line = await next_done
+            counts[line["status"]] += 1
+            if line["status"] == "ok":
+                result = line["result"]
+                try:
+                    writes.append(await writer.add(build_resume_record(result, result["courses"])))
+                except WriterClosed as db_err:
+                    logger.warning(f"Database insert failed (non-critical): {str(db_err)}")
+            yield json.dumps(line) + "\n"
+        counts["saved"] = sum(await asyncio.gather(*writes))
+        logger.info(f"Bulk ingestion finished: {counts}")
+        yield json.dumps({"summary": counts}) + "\n"
+    finally:
+        # Client went away mid-stream: stop analysing the rest
+        for task in tasks:
+            task.cancel()
+        if spool_dir is not None:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(remove_spool_dir, spool_dir)
@@ -0,0 +1,198 @@
+"""
+Two-tier result cache
+An in-process LRU in front of a size-bounded SQLite store, used to skip
+re-parsing PDFs that were already analysed
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(data: bytes, *parts: str) -> str:
+    """Cache key from the SHA-256 of the content plus version/namespace parts"""
+    return ":".join((hashlib.sha256(data).hexdigest(),) + parts)
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU keyed by string"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# A hit only rewrites last_access once the stored value is this many seconds
+# old, so hot entries do not take the write lock on every read
+LAST_ACCESS_RESOLUTION = 60.0
+
+
+class SQLiteCache:
+    """On-disk key/value store that evicts least recently used rows once the
+    stored payload exceeds ``max_bytes``.
+
+    Several processes (the OCR workers) share one file, so the byte total
+    lives in the database, next to the rows, and is read and updated inside
+    each write transaction.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Autocommit mode: write transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._write():
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries(last_access)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # Files written before cache_meta existed get their total counted once
+            self._conn.execute("INSERT OR IGNORE INTO cache_meta (name, value) "
+                               "SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM cache_entries")
+
+    @contextmanager
+    def _write(self):
+        """Write transaction; BEGIN IMMEDIATE takes the file's write lock up
+        front so other processes' totals cannot interleave"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, last_access FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] >= LAST_ACCESS_RESOLUTION:
+                self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, value: bytes):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock, self._write():
+            old = self._conn.execute("SELECT size FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            total = self._add_total(size - (old[0] if old else 0))
+            if total > self.max_bytes:
+                self._evict(total)
+
+    def _add_total(self, delta: int) -> int:
+        self._conn.execute("UPDATE cache_meta SET value = value + ? WHERE name = 'total_bytes'", (delta,))
+        return self._conn.execute("SELECT value FROM cache_meta WHERE name = 'total_bytes'").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT value FROM cache_meta WHERE name = 'total_bytes'").fetchone()[0]
+
+    def _evict(self, total: int):
+        freed = 0
+        while total - freed > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache_entries ORDER BY last_access ASC LIMIT 32"
+            ).fetchall()
+            if not rows:
+                # Nothing left to evict; the total can only be zero
+                freed = total
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                freed += size
+                if total - freed <= self.max_bytes:
+                    break
+        self._add_total(-freed)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """JSON-serialisable values cached in memory first, then on disk"""
+
+    def __init__(self, path: Optional[str], max_bytes: int, memory_entries: int = 256):
+        self.memory = LRUCache(memory_entries)
+        self.disk: Optional[SQLiteCache] = None
+        self.hits = 0
+        self.misses = 0
+        if path:
+            try:
+                self.disk = SQLiteCache(path, max_bytes)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache unavailable at {path}, using memory only: {e}")
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            try:
+                raw = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.memory.put(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, json.dumps(value).encode("utf-8"))
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache write failed: {e}")
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
@@ -1,10 +1,317 @@
+import base64
+import binascii
+import functools
+import json
+import logging
+import os
 import sqlite3
-from typing import List, Dict, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, List, Dict, Optional, Sequence, Tuple
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from lazy_imports import lazy_import
+from metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT_SECONDS, DB_RECONNECTS, DB_SECONDS, timed
+
+# Only imported when MySQL is configured
+mysql_connector = lazy_import("mysql.connector")
+
+logger = logging.getLogger(__name__)
+
+# Connections kept per Database; keep it at least DB_WORKERS (executors.py)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# Seconds to wait for a free connection (and, on SQLite, for the write lock)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections idle longer than this are pinged before reuse
+DB_POOL_PING_SECONDS = float(os.getenv("DB_POOL_PING_SECONDS", "30"))
+
+
+def get_mysql_config() -> Optional[dict]:
+    host = os.getenv("MYSQL_HOST")
+    user = os.getenv("MYSQL_USER")
+    password = os.getenv("MYSQL_PASSWORD", "")
+    database = os.getenv("MYSQL_DB") or os.getenv("MYSQL_DATABASE")
+    port = int(os.getenv("MYSQL_PORT", "3306"))
+    if host and user and database:
+        return {
+            "host": host,
+            "user": user,
+            "password": password,
+            "database": database,
+            "port": port,
+        }
+    return None
+
+
+def ensure_mysql_database(cfg: Optional[dict]):
+    """Ensure MySQL database exists before connecting"""
+    if not cfg:
+        return
+    db_name = cfg.get("database")
+    base_cfg = {k: v for k, v in cfg.items() if k != "database"}
+    try:
+        conn = mysql_connector.connect(**base_cfg)
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}` DEFAULT CHARACTER SET utf8mb4")
+        conn.commit()
+    finally:
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+
+
+# Columns of analysis_jobs that update_job may change
+JOB_COLUMNS = ("status", "stage", "result", "error")
+
+# user_data columns the admin listing can return (fields=) and its page size limits
+RESUME_COLUMNS = ("id", "name", "email", "resume_score", "timestamp", "page_no", "predicted_field",
+                  "user_level", "actual_skills", "recommended_skills", "recommended_courses")
+RESUME_PAGE_DEFAULT = 50
+RESUME_PAGE_MAX = 500
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Analytics rollup tables per bucket size, and the bucket key format of each
+ANALYTICS_TABLES = {"hour": "analytics_hourly", "day": "analytics_daily"}
+BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d"}
+# Widest range (in buckets) one analytics query may cover, which bounds its cost
+ANALYTICS_MAX_BUCKETS = {"hour": 24 * 31, "day": 366 * 10}
+# Range used when a query gives no `since`
+ANALYTICS_DEFAULT_BUCKETS = {"hour": 48, "day": 30}
+# Score histogram bins (inclusive)
+SCORE_BINS = tuple((low, low + 9) for low in range(0, 90, 10)) + ((90, 100),)
+# Analytics dimension per user_data skill column
+SKILL_DIMENSIONS = {"actual": "skill", "recommended": "recommended_skill"}
+# Primary key of the analytics tables; dimension first so each query is one range scan
+ANALYTICS_KEY = ("dimension", "bucket", "label")
+# Candidate search result limits
+SEARCH_LIMIT_DEFAULT = 50
+SEARCH_MAX_TERMS = 20
+# Matches counted per search; beyond this "total" is a lower bound
+SEARCH_COUNT_LIMIT = int(os.getenv("SEARCH_COUNT_LIMIT", "1000"))
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change, applied once per database in version order"""
+    version: int
+    description: str
+    sqlite: Tuple[str, ...]
+    mysql: Tuple[str, ...]
+    # Database method called with the cursor after the statements, for data fixes SQL cannot do
+    backfill: Optional[str] = None
+
+
+# Recomputes stats_rollup from user_data (after the table has been emptied)
+STATS_ROLLUP_REBUILD = (
+    "INSERT INTO stats_rollup (dimension, label, resumes, score_sum) "
+    "SELECT 'total', '', COUNT(*), COALESCE(SUM(resume_score), 0) FROM user_data",
+    "INSERT INTO stats_rollup (dimension, label, resumes, score_sum) "
+    "SELECT 'field', predicted_field, COUNT(*), SUM(resume_score) FROM user_data GROUP BY predicted_field",
+    "INSERT INTO stats_rollup (dimension, label, resumes, score_sum) "
+    "SELECT 'level', user_level, COUNT(*), SUM(resume_score) FROM user_data GROUP BY user_level",
+)
+
+def _analytics_ddl(table: str, mysql: bool) -> str:
+    if mysql:
+        return (f"CREATE TABLE IF NOT EXISTS {table} (bucket VARCHAR(19) NOT NULL, dimension VARCHAR(20) NOT NULL, "
+                "label VARCHAR(255) NOT NULL, resumes BIGINT NOT NULL, score_sum BIGINT NOT NULL, "
+                "PRIMARY KEY (dimension, bucket, label)) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4")
+    return (f"CREATE TABLE IF NOT EXISTS {table} (bucket TEXT NOT NULL, dimension TEXT NOT NULL, label TEXT NOT NULL, "
+            "resumes INTEGER NOT NULL, score_sum INTEGER NOT NULL, PRIMARY KEY (dimension, bucket, label))")
+
+
+# Seconds a process waits for another one to finish migrating the schema
+MIGRATION_LOCK_TIMEOUT = float(os.getenv("MIGRATION_LOCK_TIMEOUT", "600"))
+MIGRATION_LOCK_NAME = "resume_analyzer_schema_migrations"
+# MySQL errors meaning a migration statement's object already exists:
+# table, column, index (ER_TABLE_EXISTS_ERROR, ER_DUP_FIELDNAME, ER_DUP_KEYNAME)
+MYSQL_ALREADY_EXISTS = {1050, 1060, 1061}
+
+# Append new migrations at the end; never edit or renumber an applied one.
+# Statements must be safe to re-run: MySQL commits DDL as it goes, so a
+# migration that failed half-way is retried from its first statement
+MIGRATIONS = (
+    Migration(1, "Native DATETIME for user_data.timestamp", (
+        # SQLite has no date type; its date functions work on this ISO-8601 text,
+        # which also sorts chronologically
+    ), (
+        "ALTER TABLE user_data MODIFY COLUMN timestamp DATETIME NOT NULL",
+    )),
+    Migration(2, "Indexes for admin listing, filters and sorting", (
+        "CREATE INDEX IF NOT EXISTS idx_user_data_timestamp ON user_data (timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_data_field ON user_data (predicted_field, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_data_level ON user_data (user_level, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_data_score ON user_data (resume_score)",
+    ), (
+        "CREATE INDEX idx_user_data_timestamp ON user_data (timestamp, id)",
+        "CREATE INDEX idx_user_data_field ON user_data (predicted_field, timestamp, id)",
+        "CREATE INDEX idx_user_data_level ON user_data (user_level, timestamp, id)",
+        "CREATE INDEX idx_user_data_score ON user_data (resume_score)",
+    )),
+    Migration(3, "stats_rollup: running totals for /admin/stats", (
+        "CREATE TABLE IF NOT EXISTS stats_rollup (dimension TEXT NOT NULL, label TEXT NOT NULL, "
+        "resumes INTEGER NOT NULL, score_sum INTEGER NOT NULL, PRIMARY KEY (dimension, label))",
+        *STATS_ROLLUP_REBUILD,
+    ), (
+        "CREATE TABLE IF NOT EXISTS stats_rollup (dimension VARCHAR(20) NOT NULL, label VARCHAR(100) NOT NULL, "
+        "resumes BIGINT NOT NULL, score_sum BIGINT NOT NULL, PRIMARY KEY (dimension, label)) "
+        "ENGINE=InnoDB DEFAULT CHARSET=utf8mb4",
+        *STATS_ROLLUP_REBUILD,
+    )),
+    # Backfilled by Database._fill_analytics (skills need splitting)
+    Migration(4, "Hourly and daily analytics rollups", (
+        _analytics_ddl("analytics_hourly", mysql=False),
+        _analytics_ddl("analytics_daily", mysql=False),
+    ), (
+        _analytics_ddl("analytics_hourly", mysql=True),
+        _analytics_ddl("analytics_daily", mysql=True),
+    ), backfill="_fill_analytics"),
+    # resume_skills is an inverted index: (kind, skill_id) -> resume ids, best score first
+    Migration(5, "Normalized skills and resume_skills tables", (
+        "CREATE TABLE IF NOT EXISTS skills (id INTEGER PRIMARY KEY AUTOINCREMENT, skill_key TEXT NOT NULL UNIQUE, "
+        "name TEXT NOT NULL, actual_resumes INTEGER NOT NULL DEFAULT 0, "
+        "recommended_resumes INTEGER NOT NULL DEFAULT 0)",
+        "CREATE TABLE IF NOT EXISTS resume_skills (kind TEXT NOT NULL, skill_id INTEGER NOT NULL, resume_score INTEGER NOT NULL, "
+        "resume_id INTEGER NOT NULL, PRIMARY KEY (kind, skill_id, resume_score, resume_id)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON resume_skills (resume_id, kind, skill_id)",
+    ), (
+        "CREATE TABLE IF NOT EXISTS skills (id INT NOT NULL AUTO_INCREMENT, skill_key VARCHAR(255) NOT NULL, "
+        "name VARCHAR(255) NOT NULL, actual_resumes BIGINT NOT NULL DEFAULT 0, "
+        "recommended_resumes BIGINT NOT NULL DEFAULT 0, PRIMARY KEY (id), UNIQUE KEY uq_skills_key (skill_key)) "
+        "ENGINE=InnoDB DEFAULT CHARSET=utf8mb4",
+        "CREATE TABLE IF NOT EXISTS resume_skills (kind VARCHAR(12) NOT NULL, skill_id INT NOT NULL, resume_score INT NOT NULL, "
+        "resume_id INT NOT NULL, PRIMARY KEY (kind, skill_id, resume_score, resume_id), "
+        "INDEX idx_resume_skills_resume (resume_id, kind, skill_id)) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4",
+    ), backfill="_fill_resume_skills"),
+    Migration(6, "Binary collation for skills.skill_key", (
+        # SQLite compares TEXT bytewise already
+    ), (
+        # The default utf8mb4 collation ignores accents, so "café" and "cafe"
+        # collided on uq_skills_key and the id lookup for one of them failed
+        "ALTER TABLE skills MODIFY COLUMN skill_key VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL",
+    )),
+    # owner is the JobQueue holding an unfinished job; lease_until (Unix time)
+    # is when other processes may take it over if the owner stops renewing
+    Migration(7, "Owner and lease on analysis_jobs", (
+        "ALTER TABLE analysis_jobs ADD COLUMN owner TEXT",
+        "ALTER TABLE analysis_jobs ADD COLUMN lease_until REAL",
+    ), (
+        "ALTER TABLE analysis_jobs ADD COLUMN owner VARCHAR(100) NULL",
+        "ALTER TABLE analysis_jobs ADD COLUMN lease_until DOUBLE NULL",
+    )),
+)
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    """Opaque keyset cursor for the row a page ended on"""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, row_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+        return timestamp, int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _parse_bound(value: str, name: str, end_of_day: bool = False) -> str:
+    """Normalise a since/until filter to TIMESTAMP_FORMAT"""
+    for fmt in (TIMESTAMP_FORMAT, "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt != TIMESTAMP_FORMAT and end_of_day:
+            parsed = parsed.replace(hour=23, minute=59, second=59)
+        return parsed.strftime(TIMESTAMP_FORMAT)
+    raise ValueError(f"{name} must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+
+
+def _score_bin(score: int) -> str:
+    for low, high in SCORE_BINS:
+        if score <= high:
+            return f"{low}-{high}"
+    return f"{SCORE_BINS[-1][0]}-{SCORE_BINS[-1][1]}"
+
+
+def _split_skills(joined: str) -> List[str]:
+    """Skills from a comma-joined user_data column, each once"""
+    return list(dict.fromkeys(s.strip() for s in (joined or "").split(",") if s.strip()))
+
+
+def skill_key(name: str) -> str:
+    """Case-insensitive lookup key for a skill name. Never ends in a space:
+    MySQL's utf8mb4_bin ignores trailing spaces when comparing keys."""
+    return name.strip().lower()[:255].rstrip()
+
+
+def parse_skill_query(query: str) -> List[List[str]]:
+    """"react|vue, docker" -> [["react", "vue"], ["docker"]]: commas AND
+    groups together, "|" ORs skills within a group"""
+    groups = []
+    for term in query.split(","):
+        group = list(dict.fromkeys(skill_key(s) for s in term.split("|") if s.strip()))
+        if group:
+            groups.append(group)
+    if not groups:
+        raise ValueError("skills must name at least one skill")
+    if sum(len(g) for g in groups) > SEARCH_MAX_TERMS:
+        raise ValueError(f"At most {SEARCH_MAX_TERMS} skills per search")
+    return groups
+
+
+@functools.lru_cache(maxsize=None)
+def taxonomy_aliases() -> Dict[str, str]:
+    """Parser alias -> skill key of its canonical skill ("k8s" -> "kubernetes")"""
+    # Imported on first search so manage_db.py does not load the parser stack
+    import resume_parser_enhanced
+    aliases = {}
+    for name, patterns in resume_parser_enhanced.SKILLS.items():
+        for pattern in patterns:
+            aliases.setdefault(skill_key(pattern.replace("\\", "")), skill_key(name))
+    return aliases
+
+
+def resolve_skill_keys(keys: Sequence[str], known) -> Dict[str, str]:
+    """Query key -> key to look up. Terms never indexed may be parser
+    aliases ("k8s"), which then stand for their canonical skill."""
+    aliases = taxonomy_aliases()
+    return {key: aliases[key] if key not in known and aliases.get(key) in known else key for key in keys}
+
+
+def _analytics_deltas(records) -> Dict[str, Dict[Tuple[str, str, str], List[int]]]:
+    """Per-table (dimension, bucket, label) -> [resumes, score_sum] increments
+    for resume rows (ResumeData or user_data dicts)"""
+    deltas = {table: {} for table in ANALYTICS_TABLES.values()}
+    for data in records:
+        get = data.get if isinstance(data, dict) else lambda name: getattr(data, name)
+        timestamp = get("timestamp")
+        if not isinstance(timestamp, datetime):
+            timestamp = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+        score = int(get("resume_score"))
+        keys = [("total", ""), ("field", get("predicted_field")), ("level", get("user_level")),
+                ("score", _score_bin(score))]
+        for kind, dimension in SKILL_DIMENSIONS.items():
+            keys.extend((dimension, skill[:255]) for skill in _split_skills(get(f"{kind}_skills")))
+        for interval, table in ANALYTICS_TABLES.items():
+            bucket = timestamp.strftime(BUCKET_FORMATS[interval])
+            for dimension, label in keys:
+                delta = deltas[table].setdefault((dimension, bucket, label), [0, 0])
+                delta[0] += 1
+                delta[1] += score
+    return deltas
+
+
+def _timestamp_text(value) -> str:
+    # MySQL returns DATETIME columns as datetime objects
+    return value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value
 
-import mysql.connector
-from mysql.connector import Error as MySQLError
 
 @dataclass
 class ResumeData:
@@ -19,143 +326,975 @@ class ResumeData:
     recommended_skills: str
     recommended_courses: str
 
+class PoolTimeout(RuntimeError):
+    """Raised when no pooled connection frees up within the pool timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections shared by the DB worker threads.
+    Each connection is used by one thread at a time; idle ones are pinged
+    before reuse and replaced when stale."""
+
+    def __init__(self, connect: Callable[[], Any], ping: Callable[[Any], bool],
+                 size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 ping_interval: float = DB_POOL_PING_SECONDS):
+        self._connect = connect
+        self._ping = ping
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._idle: List[Tuple[Any, float]] = []  # (connection, last released), most recent last
+        self._open = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "in_use": self._open - len(self._idle),
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+            }
+
+    def _reserve(self) -> Tuple[Optional[Any], float]:
+        """Take an idle connection, or a slot to open a new one (None)"""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        DB_POOL_TIMEOUTS.inc()
+                        raise PoolTimeout(f"No database connection free after {self.timeout:g}s")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    return self._idle.pop()
+                self._open += 1
+                return None, 0.0
+            finally:
+                self._waiting -= 1
+
+    def _discard(self, conn: Optional[Any]):
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def acquire(self) -> Any:
+        start = time.perf_counter()
+        conn, released_at = self._reserve()
+        DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        try:
+            if conn is not None and time.monotonic() - released_at > self.ping_interval and not self._ping(conn):
+                logger.warning("Replacing stale database connection")
+                DB_RECONNECTS.inc()
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except BaseException:
+            self._discard(None)
+            raise
+        return conn
+
+    def release(self, conn: Any, failed: bool = False):
+        """Return a connection. Any open transaction is rolled back so the
+        next user starts clean; after an error it must also answer a ping."""
+        try:
+            if getattr(conn, "in_transaction", False):
+                conn.rollback()
+            healthy = not failed or self._ping(conn)
+        except Exception:
+            healthy = False
+        if not healthy:
+            DB_RECONNECTS.inc()
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        failed = False
+        try:
+            yield conn
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(conn, failed)
+
+    def close(self):
+        """Close idle connections; the pool reopens them on demand"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
 class Database:
     def __init__(self, sqlite_path: str = "resume_analyzer.db", mysql_config: Optional[Dict] = None):
         self.sqlite_path = sqlite_path
         self.mysql_config = mysql_config
         self.use_mysql = mysql_config is not None
-        self.connection = None
-    
-    def get_connection(self):
-        """Get database connection"""
-        if self.connection:
-            return self.connection
-
         if self.use_mysql:
-            try:
-                self.connection = mysql.connector.connect(**self.mysql_config)
-            except MySQLError as exc:  # surface clear error for misconfig
-                raise RuntimeError(f"MySQL connection failed: {exc}")
+            self.pool = ConnectionPool(self._connect_mysql, self._ping_mysql)
         else:
-            self.connection = sqlite3.connect(self.sqlite_path, check_same_thread=False)
-            self.connection.row_factory = sqlite3.Row
-        return self.connection
-    
+            self.pool = ConnectionPool(self._connect_sqlite, self._ping_sqlite)
+
+    def _connect_mysql(self):
+        try:
+            return mysql_connector.connect(**self.mysql_config)
+        except mysql_connector.Error as exc:  # surface clear error for misconfig
+            raise RuntimeError(f"MySQL connection failed: {exc}")
+
+    @staticmethod
+    def _ping_mysql(conn) -> bool:
+        return conn.is_connected()
+
+    def _connect_sqlite(self):
+        # Pooled connections move between DB worker threads, one at a time
+        conn = sqlite3.connect(self.sqlite_path, timeout=DB_POOL_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run alongside the single writer
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _ping_sqlite(conn) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def connection(self):
+        """Context manager lending a pooled connection to the calling thread"""
+        return self.pool.connection()
+
+    def _cursor(self, conn):
+        return conn.cursor(dictionary=True) if self.use_mysql else conn.cursor()
+
+    def health_check(self) -> Dict:
+        """Round-trip a trivial query and report pool usage"""
+        status = {"backend": "mysql" if self.use_mysql else "sqlite", "ok": False}
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            status["ok"] = True
+        except Exception as e:
+            status["error"] = str(e) or type(e).__name__
+        status["pool"] = self.pool.stats()
+        return status
+
     def create_tables(self):
         """Create database tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor(dictionary=True) if self.use_mysql else conn.cursor()
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            if self.use_mysql:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS user_data (
+                        id INT NOT NULL AUTO_INCREMENT,
+                        name VARCHAR(255) NOT NULL,
+                        email VARCHAR(255) NOT NULL,
+                        resume_score INT NOT NULL,
+                        timestamp VARCHAR(50) NOT NULL,
+                        page_no INT NOT NULL,
+                        predicted_field VARCHAR(100) NOT NULL,
+                        user_level VARCHAR(50) NOT NULL,
+                        actual_skills TEXT NOT NULL,
+                        recommended_skills TEXT NOT NULL,
+                        recommended_courses TEXT NOT NULL,
+                        PRIMARY KEY (id)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                """)
+            else:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS user_data (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        email TEXT NOT NULL,
+                        resume_score INTEGER NOT NULL,
+                        timestamp TEXT NOT NULL,
+                        page_no INTEGER NOT NULL,
+                        predicted_field TEXT NOT NULL,
+                        user_level TEXT NOT NULL,
+                        actual_skills TEXT NOT NULL,
+                        recommended_skills TEXT NOT NULL,
+                        recommended_courses TEXT NOT NULL
+                    )
+                """)
+
+            if self.use_mysql:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_jobs (
+                        id VARCHAR(32) NOT NULL,
+                        status VARCHAR(20) NOT NULL,
+                        stage VARCHAR(20),
+                        filename VARCHAR(255) NOT NULL,
+                        file_path VARCHAR(512) NOT NULL,
+                        result LONGTEXT,
+                        error TEXT,
+                        created_at VARCHAR(50) NOT NULL,
+                        updated_at VARCHAR(50) NOT NULL,
+                        PRIMARY KEY (id),
+                        INDEX idx_analysis_jobs_status (status)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                """)
+            else:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_jobs (
+                        id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,
+                        stage TEXT,
+                        filename TEXT NOT NULL,
+                        file_path TEXT NOT NULL,
+                        result TEXT,
+                        error TEXT,
+                        created_at TEXT NOT NULL,
+                        updated_at TEXT NOT NULL
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs(status)")
+
+            conn.commit()
+        self.migrate()
+
+    def migrate(self) -> List[int]:
+        """Apply pending MIGRATIONS; returns the versions applied. Safe to run
+        from several processes at once: each migration is applied under a
+        lock by whichever process gets there first."""
+        applied = []
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version INT NOT NULL PRIMARY KEY, description VARCHAR(255) NOT NULL, "
+                "applied_at VARCHAR(50) NOT NULL)"
+            )
+            conn.commit()
+            placeholder = "%s" if self.use_mysql else "?"
+            for migration in MIGRATIONS:
+                with self._migration_lock(conn, cursor):
+                    cursor.execute(f"SELECT version FROM schema_migrations WHERE version = {placeholder}",
+                                   (migration.version,))
+                    if cursor.fetchall():
+                        continue
+                    logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+                    for statement in (migration.mysql if self.use_mysql else migration.sqlite):
+                        self._execute_ddl(cursor, statement)
+                    if migration.backfill:
+                        getattr(self, migration.backfill)(cursor)
+                    cursor.execute(
+                        f"INSERT INTO schema_migrations (version, description, applied_at) "
+                        f"VALUES ({placeholder}, {placeholder}, {placeholder})",
+                        (migration.version, migration.description, datetime.now().strftime(TIMESTAMP_FORMAT)),
+                    )
+                applied.append(migration.version)
+        return applied
 
+    @contextmanager
+    def _migration_lock(self, conn, cursor):
+        """Serialise one migration across processes. SQLite runs it in an
+        exclusive transaction, so a failure rolls all of it back; MySQL takes
+        a named lock (its DDL commits implicitly, hence re-runnable statements)."""
         if self.use_mysql:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS user_data (
-                    id INT NOT NULL AUTO_INCREMENT,
-                    name VARCHAR(255) NOT NULL,
-                    email VARCHAR(255) NOT NULL,
-                    resume_score INT NOT NULL,
-                    timestamp VARCHAR(50) NOT NULL,
-                    page_no INT NOT NULL,
-                    predicted_field VARCHAR(100) NOT NULL,
-                    user_level VARCHAR(50) NOT NULL,
-                    actual_skills TEXT NOT NULL,
-                    recommended_skills TEXT NOT NULL,
-                    recommended_courses TEXT NOT NULL,
-                    PRIMARY KEY (id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """)
-        else:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS user_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    email TEXT NOT NULL,
-                    resume_score INTEGER NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    page_no INTEGER NOT NULL,
-                    predicted_field TEXT NOT NULL,
-                    user_level TEXT NOT NULL,
-                    actual_skills TEXT NOT NULL,
-                    recommended_skills TEXT NOT NULL,
-                    recommended_courses TEXT NOT NULL
-                )
-            """)
+            cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+            if not cursor.fetchone()['locked']:
+                raise RuntimeError(f"Timed out after {MIGRATION_LOCK_TIMEOUT}s waiting for another "
+                                   "process to finish migrating the schema")
+            try:
+                yield
+                conn.commit()
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s) AS released", (MIGRATION_LOCK_NAME,))
+                cursor.fetchall()
+            return
+        # A backfill can outlast the usual busy timeout other workers wait with
+        cursor.execute(f"PRAGMA busy_timeout = {int(MIGRATION_LOCK_TIMEOUT * 1000)}")
+        try:
+            cursor.execute("BEGIN EXCLUSIVE")
+            try:
+                yield
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        finally:
+            cursor.execute(f"PRAGMA busy_timeout = {int(DB_POOL_TIMEOUT * 1000)}")
 
-        conn.commit()
-    
+    def _execute_ddl(self, cursor, statement: str):
+        """Run a migration statement; on MySQL, objects a failed earlier
+        attempt already created are skipped (CREATE INDEX has no IF NOT EXISTS)"""
+        try:
+            cursor.execute(statement)
+        except Exception as exc:
+            if not (self.use_mysql and getattr(exc, "errno", None) in MYSQL_ALREADY_EXISTS):
+                raise
+            logger.info(f"Skipping migration statement already applied: {exc}")
+
+    @timed(DB_SECONDS, "insert_resume")
     def insert_resume_data(self, data: ResumeData):
         """Insert resume data into database"""
-        conn = self.get_connection()
-        cursor = conn.cursor(dictionary=True) if self.use_mysql else conn.cursor()
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            values_placeholders = ", ".join([placeholder] * 10)
+            cursor.execute(f"""
+                INSERT INTO user_data (
+                    name, email, resume_score, timestamp, page_no,
+                    predicted_field, user_level, actual_skills,
+                    recommended_skills, recommended_courses
+                ) VALUES ({values_placeholders})
+            """, (
+                data.name, data.email, data.resume_score, data.timestamp,
+                data.page_no, data.predicted_field, data.user_level,
+                data.actual_skills, data.recommended_skills, data.recommended_courses
+            ))
+            row_id = cursor.lastrowid
+            self._add_to_rollups(cursor, [data])
+            self._index_skills(cursor, [(row_id, data.resume_score, data.actual_skills, data.recommended_skills)])
+
+            conn.commit()
+            return row_id
+    
+    @timed(DB_SECONDS, "insert_resume_batch")
+    def insert_resume_data_batch(self, records: List[ResumeData]) -> List[int]:
+        """Insert many resume rows in one transaction; returns their ids"""
+        if not records:
+            return []
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            values_placeholders = ", ".join([placeholder] * 10)
+            try:
+                ids = self._insert_rows(cursor, f"""
+                    INSERT INTO user_data (
+                        name, email, resume_score, timestamp, page_no,
+                        predicted_field, user_level, actual_skills,
+                        recommended_skills, recommended_courses
+                    ) VALUES ({values_placeholders})
+                """, [(
+                    data.name, data.email, data.resume_score, data.timestamp,
+                    data.page_no, data.predicted_field, data.user_level,
+                    data.actual_skills, data.recommended_skills, data.recommended_courses
+                ) for data in records])
+                self._add_to_rollups(cursor, records)
+                self._index_skills(cursor, [(row_id, data.resume_score, data.actual_skills, data.recommended_skills)
+                                            for row_id, data in zip(ids, records)])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            return ids
+    
+    @timed(DB_SECONDS, "list_resumes")
+    def list_resumes(self, limit: int = RESUME_PAGE_DEFAULT, cursor: Optional[str] = None,
+                     fields: Optional[List[str]] = None, field: Optional[str] = None,
+                     level: Optional[str] = None, min_score: Optional[int] = None,
+                     max_score: Optional[int] = None, since: Optional[str] = None,
+                     until: Optional[str] = None) -> Dict:
+        """One page of resume records, newest first.
+
+        Keyset pagination on (timestamp, id): pass the previous page's
+        ``next_cursor`` to continue, so every page is an index range scan.
+        ``fields`` limits the columns returned; ``since``/``until`` are
+        inclusive "YYYY-MM-DD[ HH:MM:SS]" bounds. Raises ValueError for bad
+        arguments.
+        """
+        columns = list(fields) if fields else list(RESUME_COLUMNS)
+        unknown = set(columns) - set(RESUME_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if not 1 <= limit <= RESUME_PAGE_MAX:
+            raise ValueError(f"limit must be between 1 and {RESUME_PAGE_MAX}")
 
         placeholder = "%s" if self.use_mysql else "?"
-        values_placeholders = ", ".join([placeholder] * 10)
-        cursor.execute(f"""
-            INSERT INTO user_data (
-                name, email, resume_score, timestamp, page_no,
-                predicted_field, user_level, actual_skills,
-                recommended_skills, recommended_courses
-            ) VALUES ({values_placeholders})
-        """, (
-            data.name, data.email, data.resume_score, data.timestamp,
-            data.page_no, data.predicted_field, data.user_level,
-            data.actual_skills, data.recommended_skills, data.recommended_courses
-        ))
+        where, params = [], []
+        for column, value in (("predicted_field", field), ("user_level", level)):
+            if value is not None:
+                where.append(f"{column} = {placeholder}")
+                params.append(value)
+        if min_score is not None:
+            where.append(f"resume_score >= {placeholder}")
+            params.append(min_score)
+        if max_score is not None:
+            where.append(f"resume_score <= {placeholder}")
+            params.append(max_score)
+        if since is not None:
+            where.append(f"timestamp >= {placeholder}")
+            params.append(_parse_bound(since, "since"))
+        if until is not None:
+            where.append(f"timestamp <= {placeholder}")
+            params.append(_parse_bound(until, "until", end_of_day=True))
+        if cursor is not None:
+            after_timestamp, after_id = decode_cursor(cursor)
+            # (timestamp, id) < cursor, spelled so the leading "timestamp <=" is an
+            # index range on both backends; a bare OR makes SQLite scan the index
+            where.append(f"timestamp <= {placeholder} AND (timestamp < {placeholder} OR id < {placeholder})")
+            params.extend([after_timestamp, after_timestamp, after_id])
 
-        conn.commit()
-        return cursor.lastrowid
+        # id and timestamp are always read to build the next cursor
+        selected = list(dict.fromkeys(columns + ["timestamp", "id"]))
+        sql = f"SELECT {', '.join(selected)} FROM user_data"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY timestamp DESC, id DESC LIMIT {int(limit) + 1}"
+
+        with self.connection() as conn:
+            db_cursor = self._cursor(conn)
+            db_cursor.execute(sql, params)
+            rows = [dict(row) for row in db_cursor.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(_timestamp_text(last['timestamp']), last['id'])
+        for row in rows:
+            row['timestamp'] = _timestamp_text(row['timestamp'])
+            for extra in set(row) - set(columns):
+                del row[extra]
+        return {"resumes": rows, "next_cursor": next_cursor}
     
-    def get_all_resumes(self) -> List[Dict]:
-        """Get all resume records"""
-        conn = self.get_connection()
-        cursor = conn.cursor(dictionary=True) if self.use_mysql else conn.cursor()
+    def _insert_rows(self, cursor, sql: str, rows: List[Tuple]) -> List[int]:
+        """Run an INSERT for each row and return the new auto-increment ids.
+        MySQL gets one statement per row, reading each id back: under
+        innodb_autoinc_lock_mode=2 (the 8.0 default) a multi-row INSERT's ids
+        may interleave with other sessions'. SQLite holds the write lock for
+        the whole executemany(), so its ids are consecutive."""
+        if self.use_mysql:
+            ids = []
+            for row in rows:
+                cursor.execute(sql, row)
+                ids.append(int(cursor.lastrowid))
+            return ids
+        cursor.executemany(sql, rows)
+        cursor.execute("SELECT last_insert_rowid()")
+        last = int(cursor.fetchone()[0])
+        return list(range(last - len(rows) + 1, last + 1))
 
-        cursor.execute("SELECT * FROM user_data ORDER BY timestamp DESC")
-        rows = cursor.fetchall()
+    def _skill_ids(self, cursor, names: Dict[str, str]) -> Dict[str, int]:
+        """Ids for skill keys (key -> display name), adding unknown ones"""
+        if not names:
+            return {}
+        placeholder = "%s" if self.use_mysql else "?"
+        insert = "INSERT IGNORE" if self.use_mysql else "INSERT OR IGNORE"
+        cursor.executemany(f"{insert} INTO skills (skill_key, name) VALUES ({placeholder}, {placeholder})",
+                           sorted(names.items()))
+        keys = sorted(names)
+        cursor.execute(f"SELECT id, skill_key FROM skills WHERE skill_key IN ({', '.join([placeholder] * len(keys))})",
+                       keys)
+        return {row['skill_key']: int(row['id']) for row in cursor.fetchall()}
 
+    def _index_skills(self, cursor, rows: List[Tuple[int, int, str, str]]):
+        """Add (resume_id, resume_score, actual_skills, recommended_skills)
+        rows to the skills/resume_skills index, inside the caller's transaction"""
+        postings = []  # (kind, skill key, resume score, resume id)
+        names: Dict[str, str] = {}
+        for resume_id, score, actual, recommended in rows:
+            for kind, joined in (("actual", actual), ("recommended", recommended)):
+                keys = {}
+                for name in _split_skills(joined):
+                    keys.setdefault(skill_key(name), name[:255])
+                names.update((k, v) for k, v in keys.items() if k not in names)
+                postings.extend((kind, key, score, resume_id) for key in keys)
+        if not postings:
+            return
+        ids = self._skill_ids(cursor, names)
+        placeholder = "%s" if self.use_mysql else "?"
+        cursor.executemany(
+            f"INSERT INTO resume_skills (kind, skill_id, resume_score, resume_id) "
+            f"VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})",
+            [(kind, ids[key], score, resume_id) for kind, key, score, resume_id in postings],
+        )
+        counts: Dict[Tuple[str, int], int] = {}
+        for kind, key, _, _ in postings:
+            counts[(kind, ids[key])] = counts.get((kind, ids[key]), 0) + 1
+        for kind in SKILL_DIMENSIONS:
+            # In id order, like the rollup upserts, so concurrent writers lock rows consistently
+            updates = [(n, skill_id) for (k, skill_id), n in sorted(counts.items(), key=lambda c: c[0][1]) if k == kind]
+            if updates:
+                cursor.executemany(
+                    f"UPDATE skills SET {kind}_resumes = {kind}_resumes + {placeholder} WHERE id = {placeholder}",
+                    updates,
+                )
+
+    def _fill_resume_skills(self, cursor, chunk: int = 5000):
+        """Index the skills of every user_data row (resume_skills is empty)"""
+        placeholder = "%s" if self.use_mysql else "?"
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id, resume_score, actual_skills, recommended_skills FROM user_data "
+                f"WHERE id > {placeholder} ORDER BY id LIMIT {chunk}",
+                (last_id,),
+            )
+            rows = [(int(row['id']), int(row['resume_score']), row['actual_skills'], row['recommended_skills'])
+                    for row in cursor.fetchall()]
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            self._index_skills(cursor, rows)
+
+    @timed(DB_SECONDS, "rebuild_skill_index")
+    def rebuild_skill_index(self):
+        """Recompute resume_skills and the skill counts from user_data in one
+        transaction (skill names are kept, so ids stay stable)"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute("DELETE FROM resume_skills")
+            cursor.execute("UPDATE skills SET actual_resumes = 0, recommended_resumes = 0")
+            self._fill_resume_skills(cursor)
+            conn.commit()
+
+    @timed(DB_SECONDS, "search_resumes")
+    def search_resumes(self, skills: str, kind: str = "actual", field: Optional[str] = None,
+                       level: Optional[str] = None, min_score: Optional[int] = None,
+                       limit: int = SEARCH_LIMIT_DEFAULT) -> Dict:
+        """Resumes matching a skill query (see parse_skill_query), best score first.
+
+        The rarest AND group drives the query, walking its postings in score
+        order; every other group is checked with index lookups on
+        resume_skills. The walk stops after ``limit`` hits (and the count
+        after SEARCH_COUNT_LIMIT), so the cost does not grow with the table.
+        """
+        if kind not in SKILL_DIMENSIONS:
+            raise ValueError(f"kind must be one of: {', '.join(SKILL_DIMENSIONS)}")
+        if not 1 <= limit <= RESUME_PAGE_MAX:
+            raise ValueError(f"limit must be between 1 and {RESUME_PAGE_MAX}")
+        groups = parse_skill_query(skills)
+        keys = sorted({key for group in groups for key in group})
+        aliases = taxonomy_aliases()
+        lookup = sorted(set(keys) | {aliases[key] for key in keys if key in aliases})
+        placeholder = "%s" if self.use_mysql else "?"
+
+        def in_list(values: List) -> str:
+            return ", ".join([placeholder] * len(values))
+
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(f"SELECT id, skill_key, {kind}_resumes AS resumes FROM skills "
+                           f"WHERE skill_key IN ({in_list(lookup)})", lookup)
+            known = {row['skill_key']: (int(row['id']), int(row['resumes'])) for row in cursor.fetchall()}
+            canonical = resolve_skill_keys(keys, known)
+            result = {"total": 0, "total_exact": True, "resumes": [],
+                      "unknown_skills": [key for key in keys if canonical[key] not in known]}
+            resolved = []
+            for group in groups:
+                group = dict.fromkeys(canonical[key] for key in group)
+                ids = [known[key] for key in group if key in known and known[key][1] > 0]
+                if not ids:
+                    return result
+                resolved.append((sum(n for _, n in ids), [skill_id for skill_id, _ in ids]))
+            resolved.sort()
+
+            driver = resolved[0][1]
+            where = [f"d.kind = {placeholder}", f"d.skill_id IN ({in_list(driver)})"]
+            params = [kind, *driver]
+            if min_score is not None:
+                where.append(f"d.resume_score >= {placeholder}")
+                params.append(min_score)
+            for _, ids in resolved[1:]:
+                where.append(f"EXISTS (SELECT 1 FROM resume_skills r WHERE r.resume_id = d.resume_id "
+                             f"AND r.kind = {placeholder} AND r.skill_id IN ({in_list(ids)}))")
+                params.extend([kind, *ids])
+            sql = "FROM resume_skills d"
+            if field is not None or level is not None:
+                sql += " JOIN user_data u ON u.id = d.resume_id"
+                for column, value in (("predicted_field", field), ("user_level", level)):
+                    if value is not None:
+                        where.append(f"u.{column} = {placeholder}")
+                        params.append(value)
+            sql += " WHERE " + " AND ".join(where)
+            # An OR group as driver can list a resume once per matching skill
+            select = "SELECT DISTINCT d.resume_score, d.resume_id" if len(driver) > 1 else "SELECT d.resume_score, d.resume_id"
+
+            cursor.execute(f"SELECT COUNT(*) AS total FROM ({select} {sql} LIMIT {SEARCH_COUNT_LIMIT + 1}) hits",
+                           params)
+            total = int(cursor.fetchone()['total'])
+            result["total"] = min(total, SEARCH_COUNT_LIMIT)
+            result["total_exact"] = total <= SEARCH_COUNT_LIMIT
+            cursor.execute(f"{select} {sql} ORDER BY d.resume_score DESC, d.resume_id DESC LIMIT {int(limit)}",
+                           params)
+            order = [int(row['resume_id']) for row in cursor.fetchall()]
+            if not order:
+                return result
+            result["resumes"] = self._search_rows(cursor, order)
+        return result
+
+    @timed(DB_SECONDS, "get_search_rows")
+    def get_search_rows(self, ids: List[int]) -> List[Dict]:
+        """/admin/search rows for resume ids, in the given order"""
+        if not ids:
+            return []
+        with self.connection() as conn:
+            return self._search_rows(self._cursor(conn), ids)
+
+    def _search_rows(self, cursor, ids: List[int]) -> List[Dict]:
+        placeholder = "%s" if self.use_mysql else "?"
+        cursor.execute("SELECT id, name, email, resume_score, timestamp, predicted_field, user_level, "
+                       f"actual_skills FROM user_data WHERE id IN ({', '.join([placeholder] * len(ids))})", ids)
+        rows = {int(row['id']): dict(row) for row in cursor.fetchall()}
+        for row in rows.values():
+            row['timestamp'] = _timestamp_text(row['timestamp'])
+        return [rows[resume_id] for resume_id in ids if resume_id in rows]
+
+    @timed(DB_SECONDS, "scan_index_rows")
+    def scan_index_rows(self, after_id: int = 0, limit: int = 5000, ids: Sequence[int] = ()) -> List[Dict]:
+        """The next ``limit`` user_data rows after ``after_id`` (id order),
+        plus the rows among ``ids``, with the columns the in-memory skill
+        index needs"""
+        placeholder = "%s" if self.use_mysql else "?"
+        where = f"id > {placeholder}"
+        if ids:
+            where += f" OR id IN ({', '.join([placeholder] * len(ids))})"
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(
+                "SELECT id, resume_score, predicted_field, user_level, actual_skills, recommended_skills "
+                f"FROM user_data WHERE {where} ORDER BY id LIMIT {int(limit)}",
+                (after_id, *ids),
+            )
+            return [dict(row, id=int(row['id']), resume_score=int(row['resume_score']))
+                    for row in cursor.fetchall()]
+
+    def _add_to_rollups(self, cursor, records: List[ResumeData]):
+        """Add new rows to stats_rollup and the analytics rollups, inside the
+        caller's transaction"""
+        deltas: Dict[Tuple[str, str], List[int]] = {}
+        for data in records:
+            for key in (("total", ""), ("field", data.predicted_field), ("level", data.user_level)):
+                delta = deltas.setdefault(key, [0, 0])
+                delta[0] += 1
+                delta[1] += data.resume_score
+        self._upsert_counts(cursor, "stats_rollup", ("dimension", "label"), deltas)
+        for table, table_deltas in _analytics_deltas(records).items():
+            self._upsert_counts(cursor, table, ANALYTICS_KEY, table_deltas)
+
+    def _upsert_counts(self, cursor, table: str, key_columns: Tuple[str, ...],
+                       deltas: Dict[Tuple, List[int]]):
+        """Add [resumes, score_sum] increments to the rollup rows of ``table``"""
+        columns = ", ".join(key_columns + ("resumes", "score_sum"))
         if self.use_mysql:
-            return rows
-        return [dict(row) for row in rows]
-    
+            values = ", ".join(["%s"] * (len(key_columns) + 2))
+            sql = (f"INSERT INTO {table} ({columns}) VALUES ({values}) "
+                   "ON DUPLICATE KEY UPDATE resumes = resumes + VALUES(resumes), "
+                   "score_sum = score_sum + VALUES(score_sum)")
+        else:
+            values = ", ".join(["?"] * (len(key_columns) + 2))
+            sql = (f"INSERT INTO {table} ({columns}) VALUES ({values}) "
+                   f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET resumes = resumes + excluded.resumes, "
+                   "score_sum = score_sum + excluded.score_sum")
+        # Fixed key order keeps concurrent MySQL writers from deadlocking on the rows
+        cursor.executemany(sql, [(*key, *delta) for key, delta in sorted(deltas.items())])
+
+    def _fill_analytics(self, cursor, chunk: int = 5000):
+        """Add every user_data row to the (empty) analytics rollups"""
+        placeholder = "%s" if self.use_mysql else "?"
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id, timestamp, resume_score, predicted_field, user_level, actual_skills, "
+                f"recommended_skills FROM user_data WHERE id > {placeholder} ORDER BY id LIMIT {chunk}",
+                (last_id,),
+            )
+            rows = [dict(row) for row in cursor.fetchall()]
+            if not rows:
+                return
+            last_id = rows[-1]['id']
+            for table, table_deltas in _analytics_deltas(rows).items():
+                self._upsert_counts(cursor, table, ANALYTICS_KEY, table_deltas)
+
+    @timed(DB_SECONDS, "rebuild_analytics")
+    def rebuild_analytics(self):
+        """Recompute the hourly and daily analytics rollups from user_data in
+        one transaction"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            for table in ANALYTICS_TABLES.values():
+                cursor.execute(f"DELETE FROM {table}")
+            self._fill_analytics(cursor)
+            conn.commit()
+
+    def _analytics_range(self, interval: str, since: Optional[str], until: Optional[str]) -> Tuple[str, List[str]]:
+        """Rollup table and bucket keys (oldest first) covering since..until;
+        ValueError when the range is invalid or wider than the interval allows"""
+        if interval not in ANALYTICS_TABLES:
+            raise ValueError(f"interval must be one of: {', '.join(ANALYTICS_TABLES)}")
+        step = timedelta(hours=1) if interval == "hour" else timedelta(days=1)
+        fmt = BUCKET_FORMATS[interval]
+        end = datetime.strptime(_parse_bound(until, "until", end_of_day=True), TIMESTAMP_FORMAT) if until else datetime.now()
+        if since:
+            start = datetime.strptime(_parse_bound(since, "since"), TIMESTAMP_FORMAT)
+        else:
+            start = end - step * (ANALYTICS_DEFAULT_BUCKETS[interval] - 1)
+        start = datetime.strptime(start.strftime(fmt), fmt)
+        if start > end:
+            raise ValueError("since must not be after until")
+        buckets = []
+        while start <= end:
+            if len(buckets) == ANALYTICS_MAX_BUCKETS[interval]:
+                raise ValueError(f"Range too wide for interval={interval} "
+                                 f"(max {ANALYTICS_MAX_BUCKETS[interval]} buckets)")
+            buckets.append(start.strftime(fmt))
+            start += step
+        return ANALYTICS_TABLES[interval], buckets
+
+    def _analytics_rows(self, table: str, buckets: List[str], dimension: str) -> List[Dict]:
+        placeholder = "%s" if self.use_mysql else "?"
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(
+                f"SELECT bucket, label, resumes, score_sum FROM {table} "
+                f"WHERE dimension = {placeholder} AND bucket >= {placeholder} AND bucket <= {placeholder}",
+                (dimension, buckets[0], buckets[-1]),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    @timed(DB_SECONDS, "analytics_uploads")
+    def analytics_uploads(self, interval: str = "day", since: Optional[str] = None,
+                          until: Optional[str] = None) -> List[Dict]:
+        """Uploads and average score per bucket, empty buckets included"""
+        table, buckets = self._analytics_range(interval, since, until)
+        totals = {row['bucket']: row for row in self._analytics_rows(table, buckets, "total")}
+        series = []
+        for bucket in buckets:
+            row = totals.get(bucket)
+            resumes = int(row['resumes']) if row else 0
+            series.append({
+                "bucket": bucket,
+                "resumes": resumes,
+                "average_score": round(int(row['score_sum']) / resumes, 2) if resumes else None,
+            })
+        return series
+
+    @timed(DB_SECONDS, "analytics_fields")
+    def analytics_fields(self, interval: str = "day", since: Optional[str] = None,
+                         until: Optional[str] = None) -> List[Dict]:
+        """Predicted-field counts per bucket"""
+        table, buckets = self._analytics_range(interval, since, until)
+        mix: Dict[str, Dict[str, int]] = {bucket: {} for bucket in buckets}
+        for row in self._analytics_rows(table, buckets, "field"):
+            mix[row['bucket']][row['label']] = int(row['resumes'])
+        return [{"bucket": bucket, "fields": fields} for bucket, fields in mix.items()]
+
+    @timed(DB_SECONDS, "analytics_scores")
+    def analytics_scores(self, interval: str = "day", since: Optional[str] = None,
+                         until: Optional[str] = None) -> List[Dict]:
+        """Score histogram (SCORE_BINS) over the whole range"""
+        table, buckets = self._analytics_range(interval, since, until)
+        counts = {f"{low}-{high}": 0 for low, high in SCORE_BINS}
+        for row in self._analytics_rows(table, buckets, "score"):
+            counts[row['label']] = counts.get(row['label'], 0) + int(row['resumes'])
+        return [{"range": label, "resumes": n} for label, n in counts.items()]
+
+    @timed(DB_SECONDS, "analytics_skills")
+    def analytics_skills(self, kind: str = "actual", interval: str = "day", since: Optional[str] = None,
+                         until: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Most common actual or recommended skills over the range"""
+        if kind not in SKILL_DIMENSIONS:
+            raise ValueError(f"kind must be one of: {', '.join(SKILL_DIMENSIONS)}")
+        if not 1 <= limit <= RESUME_PAGE_MAX:
+            raise ValueError(f"limit must be between 1 and {RESUME_PAGE_MAX}")
+        table, buckets = self._analytics_range(interval, since, until)
+        placeholder = "%s" if self.use_mysql else "?"
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(
+                f"SELECT label, SUM(resumes) AS total FROM {table} "
+                f"WHERE dimension = {placeholder} AND bucket >= {placeholder} AND bucket <= {placeholder} "
+                f"GROUP BY label ORDER BY total DESC, label LIMIT {int(limit)}",
+                (SKILL_DIMENSIONS[kind], buckets[0], buckets[-1]),
+            )
+            return [{"skill": row['label'], "resumes": int(row['total'])} for row in cursor.fetchall()]
+
+    @timed(DB_SECONDS, "rebuild_statistics")
+    def rebuild_statistics(self) -> Dict:
+        """Recompute stats_rollup from user_data in one transaction (repairs
+        drift, e.g. after rows were edited or deleted by hand)"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute("DELETE FROM stats_rollup")
+            for statement in STATS_ROLLUP_REBUILD:
+                cursor.execute(statement)
+            conn.commit()
+        return self.get_statistics()
+
+    @timed(DB_SECONDS, "get_statistics")
     def get_statistics(self) -> Dict:
-        """Get statistics for admin dashboard"""
-        conn = self.get_connection()
-        cursor = conn.cursor(dictionary=True) if self.use_mysql else conn.cursor()
-
-        # Total resumes
-        cursor.execute("SELECT COUNT(*) as total FROM user_data")
-        total_row = cursor.fetchone()
-        total = total_row['total']
-
-        # Average score
-        cursor.execute("SELECT AVG(resume_score) as avg_score FROM user_data")
-        avg_row = cursor.fetchone()
-        avg_score = (avg_row['avg_score']) or 0
-
-        # Field distribution
-        cursor.execute("""
-            SELECT predicted_field, COUNT(*) as count 
-            FROM user_data 
-            GROUP BY predicted_field
-        """)
-        field_dist = {row['predicted_field']: row['count'] for row in cursor.fetchall()}
-
-        # Level distribution
-        cursor.execute("""
-            SELECT user_level, COUNT(*) as count 
-            FROM user_data 
-            GROUP BY user_level
-        """)
-        level_dist = {row['user_level']: row['count'] for row in cursor.fetchall()}
+        """Get statistics for admin dashboard (from the stats_rollup rows)"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute("SELECT dimension, label, resumes, score_sum FROM stats_rollup WHERE resumes > 0")
+            rows = cursor.fetchall()
+
+        total, score_sum = 0, 0
+        field_dist, level_dist = {}, {}
+        for row in rows:
+            if row['dimension'] == 'total':
+                total, score_sum = int(row['resumes']), int(row['score_sum'])
+            elif row['dimension'] == 'field':
+                field_dist[row['label']] = int(row['resumes'])
+            elif row['dimension'] == 'level':
+                level_dist[row['label']] = int(row['resumes'])
 
         return {
             'total_resumes': total,
-            'average_score': round(float(avg_score), 2),
+            'average_score': round(score_sum / total, 2) if total else 0.0,
             'field_distribution': field_dist,
             'level_distribution': level_dist
         }
     
+    def create_job(self, job_id: str, filename: str, file_path: str,
+                   owner: Optional[str] = None, lease_seconds: float = 0.0):
+        """Record a newly queued analysis job, leased to ``owner`` if given"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            lease_until = time.time() + lease_seconds if owner else None
+            cursor.execute(f"""
+                INSERT INTO analysis_jobs (id, status, stage, filename, file_path, created_at, updated_at,
+                                           owner, lease_until)
+                VALUES ({", ".join([placeholder] * 9)})
+            """, (job_id, "queued", None, filename, file_path, now, now, owner, lease_until))
+
+            conn.commit()
+
+    @timed(DB_SECONDS, "claim_job")
+    def claim_job(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Take or renew the lease on an unfinished job. False when the job is
+        finished or another owner holds a lease that has not run out; the
+        check and the update are one statement, so only one claimant wins."""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            now = time.time()
+            cursor.execute(
+                f"UPDATE analysis_jobs SET owner = {placeholder}, lease_until = {placeholder} "
+                f"WHERE id = {placeholder} AND status IN ('queued', 'running') "
+                f"AND (owner IS NULL OR owner = {placeholder} OR lease_until < {placeholder})",
+                (owner, now + lease_seconds, job_id, owner, now)
+            )
+            claimed = cursor.rowcount == 1
+
+            conn.commit()
+            return claimed
+
+    def renew_job_leases(self, owner: str, lease_seconds: float) -> int:
+        """Extend every unfinished job lease held by ``owner``; returns how many"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            cursor.execute(
+                f"UPDATE analysis_jobs SET lease_until = {placeholder} "
+                f"WHERE owner = {placeholder} AND status IN ('queued', 'running')",
+                (time.time() + lease_seconds, owner)
+            )
+            renewed = cursor.rowcount
+
+            conn.commit()
+            return renewed
+
+    def release_jobs(self, owner: str):
+        """Give up ``owner``'s unfinished jobs so another process can take them now"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            cursor.execute(
+                f"UPDATE analysis_jobs SET owner = NULL, lease_until = NULL "
+                f"WHERE owner = {placeholder} AND status IN ('queued', 'running')",
+                (owner,)
+            )
+
+            conn.commit()
+
+    @timed(DB_SECONDS, "update_job")
+    def update_job(self, job_id: str, **fields):
+        """Update status/stage/result/error of an analysis job"""
+        unknown = set(fields) - set(JOB_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+        if 'result' in fields and fields['result'] is not None:
+            fields['result'] = json.dumps(fields['result'])
+
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            fields['updated_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            assignments = ", ".join(f"{column} = {placeholder}" for column in fields)
+            cursor.execute(
+                f"UPDATE analysis_jobs SET {assignments} WHERE id = {placeholder}",
+                (*fields.values(), job_id)
+            )
+
+            conn.commit()
+
+    @timed(DB_SECONDS, "get_job")
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get one analysis job, with its result decoded"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            cursor.execute(f"SELECT * FROM analysis_jobs WHERE id = {placeholder}", (job_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+
+            job = dict(row)
+            if job.get('result'):
+                job['result'] = json.loads(job['result'])
+            return job
+
+    def get_unfinished_jobs(self) -> List[Dict]:
+        """Queued or running jobs that no live process holds: never leased, or
+        their owner stopped renewing the lease (e.g. it crashed)"""
+        with self.connection() as conn:
+            cursor = self._cursor(conn)
+
+            placeholder = "%s" if self.use_mysql else "?"
+            cursor.execute(
+                "SELECT id, filename, file_path FROM analysis_jobs "
+                "WHERE status IN ('queued', 'running') "
+                f"AND (owner IS NULL OR lease_until < {placeholder}) ORDER BY created_at",
+                (time.time(),)
+            )
+            rows = cursor.fetchall()
+
+            if self.use_mysql:
+                return rows
+            return [dict(row) for row in rows]
+
     def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Close pooled database connections"""
+        self.pool.close()
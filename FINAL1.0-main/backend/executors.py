@@ -0,0 +1,156 @@
+"""
+Executor layer for blocking work
+Keeps PDF extraction/OCR (process pool) and database calls (thread pool)
+off the asyncio event loop, with bounded admission so overload turns into
+a fast 503 instead of an ever-growing backlog
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+import metrics
+import ocr
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+# Extraction jobs running or waiting for a worker before new ones are rejected
+EXTRACTION_MAX_PENDING = int(os.getenv("EXTRACTION_MAX_PENDING", str(EXTRACTION_WORKERS * 4)))
+# Threads running database calls; each borrows a connection from the pool (DB_POOL_SIZE)
+DB_WORKERS = int(os.getenv("DB_WORKERS", "4"))
+DB_MAX_PENDING = int(os.getenv("DB_MAX_PENDING", "256"))
+# Seconds clients are told to wait after a 503
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "5"))
+
+REJECTED = metrics.Counter("executor_rejected_total", "Calls refused with a 503 because a pool was full", ["pool"])
+
+
+class ServerBusy(Exception):
+    """Raised when an executor's submission queue is full"""
+
+    def __init__(self, name: str, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__(f"{name} queue is full")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def ocr_workers_per_extraction_worker() -> int:
+    """OCR processes in each extraction worker: a share of OCR_WORKERS, but at
+    least two, so a scanned resume's pages are still recognised in parallel"""
+    if ocr.OCR_WORKERS <= 1:
+        return 1
+    return max(2, ocr.OCR_WORKERS // max(1, EXTRACTION_WORKERS))
+
+
+def _init_extraction_worker(ocr_workers: int, page_slots):
+    """Give the worker its OCR pool. ``page_slots`` is shared by all extraction
+    workers, so together they never OCR more than OCR_WORKERS pages at once
+    and the nested pools do not oversubscribe the machine."""
+    ocr.configure(workers=ocr_workers, max_concurrent_pages=max(1, ocr.OCR_WORKERS), page_slots=page_slots)
+    # A worker joins its children on exit; stop the nested OCR pool before
+    # multiprocessing closes the queues its shutdown sentinels travel on
+    multiprocessing.util.Finalize(None, ocr.shutdown_pool, kwargs={"wait": True}, exitpriority=100)
+
+
+class BoundedExecutor:
+    """Wraps an executor with a cap on submitted-but-unfinished calls"""
+
+    def __init__(self, name: str, factory: Callable[[], Executor], max_pending: int):
+        self.name = name
+        self.max_pending = max_pending
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    def _reset(self, executor: Executor):
+        with self._lock:
+            if self._executor is executor:
+                logger.warning(f"{self.name} executor broke, restarting")
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in the pool; raises ServerBusy when saturated"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                REJECTED.inc(self.name)
+                raise ServerBusy(self.name)
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            try:
+                loop = asyncio.get_running_loop()
+                if not isinstance(executor, ProcessPoolExecutor):
+                    return await loop.run_in_executor(executor, fn, *args)
+                # Worker processes have their own metrics registry; fold their samples in here
+                result, samples = await loop.run_in_executor(executor, metrics.call_collecting, fn, *args)
+                metrics.merge(samples)
+                return result
+            except BrokenProcessPool:
+                self._reset(executor)
+                raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def extraction_pool() -> ProcessPoolExecutor:
+    """Extraction worker processes; a restarted pool gets fresh page slots, so
+    slots held by a crashed worker are not lost"""
+    context = multiprocessing.get_context()
+    return ProcessPoolExecutor(
+        max_workers=EXTRACTION_WORKERS,
+        mp_context=context,
+        initializer=_init_extraction_worker,
+        initargs=(ocr_workers_per_extraction_worker(), context.BoundedSemaphore(max(1, ocr.OCR_WORKERS))),
+    )
+
+
+extraction_executor = BoundedExecutor("extraction", extraction_pool, EXTRACTION_MAX_PENDING)
+
+db_executor = BoundedExecutor(
+    "database",
+    lambda: ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db"),
+    DB_MAX_PENDING,
+)
+
+
+metrics.Gauge(
+    "executor_pending", "Calls running or waiting in each worker pool", ["pool"],
+    callback=lambda: {(e.name,): e.pending for e in (extraction_executor, db_executor)},
+)
+metrics.Gauge(
+    "executor_saturation", "Pending calls as a fraction of each pool's admission limit", ["pool"],
+    callback=lambda: {(e.name,): e.pending / e.max_pending for e in (extraction_executor, db_executor)},
+)
+
+
+def shutdown_executors():
+    """Stop all worker pools (called from the app lifespan)"""
+    extraction_executor.shutdown()
+    db_executor.shutdown()
+    ocr.shutdown_pool()
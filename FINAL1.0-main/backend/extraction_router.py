@@ -0,0 +1,111 @@
+"""
+Adaptive text extraction routing
+Scores extracted text (printable ratio, words per page, garbage glyphs) so
+the fast PyMuPDF text layer can be accepted as-is, and only poor results
+escalate to pdfplumber's slower layout analysis. Which backend wins is
+recorded per PDF producer, so producers whose PyMuPDF output is routinely
+beaten go straight to pdfplumber.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Accept the fast-path text at or above this quality score (0..1)
+EXTRACTION_MIN_QUALITY = float(os.getenv("EXTRACTION_MIN_QUALITY", "0.6"))
+# A page of resume text usually carries at least this many words
+WORDS_PER_PAGE_TARGET = 40
+# Producers with fewer recorded documents than this keep the default route
+ROUTE_MIN_SAMPLES = int(os.getenv("EXTRACTION_ROUTE_MIN_SAMPLES", "5"))
+ROUTE_MAX_PRODUCERS = 256
+
+_WORD_RE = re.compile(r"[A-Za-z]{2,}")
+# pdfminer/pdfplumber emit "(cid:123)" for glyphs without a unicode mapping
+_CID_RE = re.compile(r"\(cid:\d+\)")
+_VERSION_RE = re.compile(r"[\d.()®™,;:_/\\-]+")
+
+
+@dataclass
+class TextQuality:
+    score: float
+    printable_ratio: float
+    words_per_page: float
+    garbage_ratio: float
+
+
+def _is_garbage(ch: str) -> bool:
+    code = ord(ch)
+    return ch == "\ufffd" or 0xE000 <= code <= 0xF8FF or (code < 32 and ch not in "\n\r\t\f")
+
+
+def score_text(text: str, pages: int) -> TextQuality:
+    """Quality of extracted text: 1.0 for clean, word-dense text; near 0 for
+    empty, unmapped-glyph or binary-looking output"""
+    stripped = text.strip()
+    if not stripped:
+        return TextQuality(0.0, 0.0, 0.0, 1.0)
+
+    total = len(stripped)
+    printable = sum(1 for ch in stripped if ch.isprintable() or ch.isspace())
+    garbage = sum(1 for ch in stripped if _is_garbage(ch))
+    garbage += sum(len(m) for m in _CID_RE.findall(stripped))
+    words = len(_WORD_RE.findall(stripped))
+
+    printable_ratio = printable / total
+    garbage_ratio = min(1.0, garbage / total)
+    words_per_page = words / max(1, pages)
+
+    score = (
+        printable_ratio
+        * max(0.0, 1.0 - garbage_ratio * 10)  # 10% garbage glyphs zeroes the score
+        * min(1.0, words_per_page / WORDS_PER_PAGE_TARGET)
+    )
+    return TextQuality(round(score, 3), round(printable_ratio, 3), round(words_per_page, 1), round(garbage_ratio, 4))
+
+
+def producer_key(producer: Optional[str]) -> str:
+    """Producer metadata without version numbers, e.g. 'microsoft word'"""
+    if not producer:
+        return "unknown"
+    words = _VERSION_RE.sub(" ", producer.lower()).split()
+    return " ".join(words[:3])[:64] or "unknown"
+
+
+class BackendRouter:
+    """Per-producer record of which backend produced the better text"""
+
+    def __init__(self, min_samples: int = ROUTE_MIN_SAMPLES, max_producers: int = ROUTE_MAX_PRODUCERS):
+        self.min_samples = min_samples
+        self.max_producers = max_producers
+        self._wins: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def route(self, producer: Optional[str]) -> str:
+        """'pymupdf' (fast path first) or 'pdfplumber' (go straight to layout analysis)"""
+        wins = self._wins.get(producer_key(producer))
+        if not wins:
+            return "pymupdf"
+        total = sum(wins.values())
+        if total >= self.min_samples and wins.get("pdfplumber", 0) * 2 > total:
+            return "pdfplumber"
+        return "pymupdf"
+
+    def record(self, producer: Optional[str], backend: str):
+        key = producer_key(producer)
+        with self._lock:
+            wins = self._wins.pop(key, None) or {}
+            wins[backend] = wins.get(backend, 0) + 1
+            self._wins[key] = wins
+            while len(self._wins) > self.max_producers:
+                self._wins.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._wins.items()}
+
+
+# Shared by every parse in this process
+router = BackendRouter()
@@ -0,0 +1,296 @@
+"""
+Background resume analysis jobs
+An in-process queue of analysis jobs drained by a fixed number of worker
+tasks. Job state lives in the database so clients can poll it (and queued
+work resumes) across restarts; progress is also pushed to SSE subscribers.
+Each unfinished job is leased to one queue, so several server processes
+sharing the database never run the same job twice.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import socket
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from cache import TieredCache, content_key
+from database import Database
+from executors import ServerBusy, db_executor, extraction_executor
+from pipeline import build_resume_record, build_response, parse_resume, recommend_courses, score_resume
+from resume_parser_enhanced import PARSER_VERSION, TAXONOMY_VERSION
+from write_behind import WriteBehindBuffer, WriterClosed
+
+logger = logging.getLogger("resume_analyzer")
+
+# Jobs analysed concurrently; extraction itself is still bounded by the executor
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Jobs waiting for a worker before submissions get a 503
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+# Times a job is retried when the extraction pool is saturated
+JOB_MAX_RETRIES = int(os.getenv("JOB_MAX_RETRIES", "3"))
+# Seconds between SSE keepalive comments (and database re-checks)
+JOB_EVENT_KEEPALIVE = float(os.getenv("JOB_EVENT_KEEPALIVE", "15"))
+# Seconds a queue's claim on a job lasts; it renews every third of that, and
+# other processes take over jobs whose lease ran out (their owner died)
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+STAGES = ("extracted", "parsed", "analyzed", "courses", "saved")
+TERMINAL_STATUSES = ("done", "failed")
+
+StageCallback = Callable[[str, Dict], Awaitable[None]]
+
+
+class UnreadableResume(Exception):
+    """The PDF could not be turned into resume data"""
+
+
+async def analyze_resume_file(file_path: str, data: bytes, filename: str, writer: WriteBehindBuffer,
+                              cache: TieredCache, on_stage: Optional[StageCallback] = None,
+                              save: bool = True) -> Dict:
+    """Run the full upload pipeline for one resume and return the API payload.
+
+    ``on_stage`` is awaited after each of STAGES with a small progress dict.
+    The database row goes to ``writer``; only callers that follow progress
+    wait for it to be committed. With ``save=False`` the insert is left to
+    the caller (bulk ingestion counts its saved rows).
+    """
+    async def report(stage: str, **info):
+        if on_stage is not None:
+            await on_stage(stage, info)
+
+    # Parse resume (re-uploads of the same bytes skip straight to analysis)
+    cache_key = content_key(data, "resume", PARSER_VERSION, TAXONOMY_VERSION)
+    # Cache lookups hit SQLite on a memory miss, so they run on the storage pool
+    parsed = await db_executor.run(cache.get, cache_key)
+    if parsed is not None:
+        logger.info(f"Resume parse cache hit: {parsed['data']['name']}")
+        await report("extracted", cached=True)
+        await report("parsed", cached=True)
+    else:
+        try:
+            # Extraction/OCR and the field/skill regex scans run in one worker
+            # call, so a retry after ServerBusy never throws away finished OCR
+            parsed = await extraction_executor.run(parse_resume, file_path, data)
+        except ServerBusy:
+            raise
+        except Exception as parse_err:
+            logger.exception("Failed to parse resume")
+            raise UnreadableResume(str(parse_err)) from parse_err
+        logger.info(f"Resume parsed successfully: {parsed['data']['name']}")
+        await report("extracted", chars=len(parsed['text']), pages=parsed['data']['pages'])
+        await report("parsed", skills=len(parsed['data']['skills']))
+        await db_executor.run(cache.put, cache_key, parsed)
+    resume_data = parsed['data']
+
+    # Analysis, scoring and course lookup are cheap set/dict work; run inline
+    analysis, score = score_resume(resume_data)
+    await report("analyzed", field=analysis.get('field'), score=score)
+    courses = recommend_courses(resume_data, analysis)
+    await report("courses", count=len(courses))
+    response_data = build_response(resume_data, analysis, score, courses, filename)
+    if not save:
+        return response_data
+
+    # Save to database (non-critical, batched by the write-behind buffer)
+    try:
+        saved = await writer.add(build_resume_record(response_data, courses))
+    except WriterClosed as db_err:
+        logger.warning(f"Database insert failed (non-critical): {str(db_err)}")
+        saved = None
+    if on_stage is not None:
+        await report("saved", saved=await saved if saved is not None else False)
+
+    return response_data
+
+
+def public_job(job: Dict) -> Dict:
+    """Job row as returned to API clients (no server paths)"""
+    return {k: v for k, v in job.items() if k != 'file_path'}
+
+
+def _sse(event: str, payload: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+class JobQueue:
+    """Queue of resume analysis jobs processed by background worker tasks"""
+
+    def __init__(self, db: Database, cache: TieredCache, writer: WriteBehindBuffer,
+                 workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_MAX,
+                 lease_seconds: float = JOB_LEASE_SECONDS):
+        self.db = db
+        self.cache = cache
+        self.writer = writer
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        # Lease holder name, unique per queue even across hosts sharing MySQL
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._held: Set[str] = set()  # ids of jobs queued or running here
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start the workers and take over jobs whose lease has run out
+        (interrupted by the last shutdown, or by another process dying)"""
+        self._queue = asyncio.Queue()
+        adopted = await self._adopt_expired()
+        if adopted:
+            logger.info(f"Resumed {adopted} unfinished analysis jobs")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._keep_leases()))
+
+    async def stop(self):
+        """Cancel the workers; jobs in flight stay queued/running in the database
+        and their leases are released, so the next start (here or in another
+        process) picks them up without waiting for the leases to run out"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._held.clear()
+        try:
+            await db_executor.run(self.db.release_jobs, self.owner)
+        except Exception as e:
+            logger.warning(f"Could not release job leases, they expire in {self.lease_seconds:g}s: {e}")
+
+    async def _adopt_expired(self) -> int:
+        """Claim unfinished jobs nobody holds a live lease on and queue them here"""
+        adopted = 0
+        for job in await db_executor.run(self.db.get_unfinished_jobs):
+            if job['id'] in self._held or self._queue.qsize() >= self.max_queued:
+                continue
+            if not await db_executor.run(self.db.claim_job, job['id'], self.owner, self.lease_seconds):
+                continue  # another process claimed it first
+            if Path(job['file_path']).exists():
+                await self._update(job['id'], status="queued", stage=None)
+                self._held.add(job['id'])
+                self._queue.put_nowait(job)
+                adopted += 1
+            else:
+                await self._update(job['id'], status="failed", error="Uploaded file is no longer available")
+        return adopted
+
+    async def _keep_leases(self):
+        """Renew this queue's leases, and take over jobs whose owner stopped renewing"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await db_executor.run(self.db.renew_job_leases, self.owner, self.lease_seconds)
+                adopted = await self._adopt_expired()
+                if adopted:
+                    logger.info(f"Took over {adopted} analysis jobs with expired leases")
+            except Exception as e:
+                logger.warning(f"Job lease renewal failed: {e}")
+
+    async def submit(self, file_path: str, filename: str) -> str:
+        """Queue an uploaded resume for analysis and return its job id"""
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self._queue.qsize() >= self.max_queued:
+            raise ServerBusy("jobs")
+        job_id = uuid.uuid4().hex
+        await db_executor.run(self.db.create_job, job_id, filename, file_path, self.owner, self.lease_seconds)
+        self._held.add(job_id)
+        self._queue.put_nowait({'id': job_id, 'filename': filename, 'file_path': file_path})
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        job = await db_executor.run(self.db.get_job, job_id)
+        return public_job(job) if job else None
+
+    async def _update(self, job_id: str, **fields):
+        await db_executor.run(functools.partial(self.db.update_job, job_id, **fields))
+
+    def _publish(self, job_id: str, event: str, payload: Dict):
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait((event, payload))
+
+    async def _worker(self, number: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception(f"Job worker {number} failed on {job['id']}")
+            finally:
+                self._held.discard(job['id'])
+                self._queue.task_done()
+
+    async def _run(self, job: Dict):
+        job_id = job['id']
+
+        async def on_stage(stage: str, info: Dict):
+            await self._update(job_id, stage=stage)
+            self._publish(job_id, "stage", {"job_id": job_id, "stage": stage, **info})
+
+        # Re-checked here: the lease may have lapsed while the job waited
+        if not await db_executor.run(self.db.claim_job, job_id, self.owner, self.lease_seconds):
+            logger.info(f"Job {job_id} was taken over by another process")
+            return
+        await self._update(job_id, status="running")
+        self._publish(job_id, "status", {"job_id": job_id, "status": "running"})
+        try:
+            data = await asyncio.to_thread(Path(job['file_path']).read_bytes)
+            for attempt in range(JOB_MAX_RETRIES + 1):
+                try:
+                    result = await analyze_resume_file(job['file_path'], data, job['filename'],
+                                                       self.writer, self.cache, on_stage)
+                    break
+                except ServerBusy as busy:
+                    if attempt == JOB_MAX_RETRIES:
+                        raise
+                    logger.info(f"Job {job_id} waiting for {busy.name} capacity")
+                    await asyncio.sleep(busy.retry_after * (attempt + 1))
+        except Exception as e:
+            error = f"Could not read the PDF: {e}" if isinstance(e, UnreadableResume) else str(e)
+            await self._update(job_id, status="failed", error=error)
+            self._publish(job_id, "failed", {"job_id": job_id, "status": "failed", "error": error})
+            return
+
+        await self._update(job_id, status="done", result=result)
+        self._publish(job_id, "done", {"job_id": job_id, "status": "done", "result": result})
+
+    async def events(self, job_id: str) -> AsyncIterator[str]:
+        """Server-sent events for one job: its current state, then each stage
+        until it finishes"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            yield _sse("status", job)
+            if job['status'] in TERMINAL_STATUSES:
+                return
+            while True:
+                try:
+                    event, payload = await asyncio.wait_for(queue.get(), JOB_EVENT_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # Nothing pushed (e.g. the job ran in another process); re-check storage
+                    job = await self.get(job_id)
+                    if job is None or job['status'] in TERMINAL_STATUSES:
+                        if job is not None:
+                            yield _sse(job['status'], job)
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(event, payload)
+                if event in TERMINAL_STATUSES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
@@ -0,0 +1,54 @@
+"""
+Deferred imports for heavy optional dependencies
+PDF, OCR, HTTP and MySQL libraries cost hundreds of milliseconds to import.
+Modules bind them with ``lazy_import`` so importing the app stays cheap; the
+real import happens on first attribute access (or in the lifespan warm-up).
+"""
+
+import importlib
+import importlib.util
+import threading
+from typing import Iterable, List, Optional
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> Optional[LazyModule]:
+    """Lazy handle on ``name``, or None when it is not installed"""
+    try:
+        if importlib.util.find_spec(name) is None:
+            return None
+    except (ImportError, ValueError):  # missing parent package
+        return None
+    return LazyModule(name)
+
+
+def load(modules: Iterable[Optional[LazyModule]]) -> List[str]:
+    """Import the given lazy modules now; returns the names loaded"""
+    loaded = []
+    for module in modules:
+        if module is not None:
+            module._load()
+            loaded.append(module._name)
+    return loaded
@@ -1,24 +1,38 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 import uvicorn
 from typing import List, Optional
 from datetime import datetime
 from pathlib import Path
 import os
+import functools
 import shutil
 import logging
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
-import mysql.connector
 
 # Use the enhanced parser
-from resume_parser_enhanced import ResumeParser, ResumeParserEnhanced
-from database import Database, ResumeData
+from database import RESUME_PAGE_DEFAULT, SEARCH_LIMIT_DEFAULT, Database, ensure_mysql_database, get_mysql_config
 from courses import get_courses_by_field, get_personalized_courses
-from src.helper import extract_text_from_pdf, extract_keywords as local_extract_keywords, analyze_resume as run_analysis
+from cache import TieredCache, content_key
+import metrics
+import ocr
+from metrics import HTTP_REQUESTS, HTTP_SECONDS, STAGE_SECONDS, timed
+from bulk import (BULK_MAX_FILES, BulkTooLarge, expand_uploads, new_spool_dir, remove_spool_dir,
+                  stream_bulk_analysis)
+from executors import ServerBusy, db_executor, extraction_executor, shutdown_executors
+from jobs import JobQueue, UnreadableResume, analyze_resume_file
+from pipeline import extract_resume_text, warm_up
+from src.helper import extract_keywords as local_extract_keywords, analyze_resume as run_analysis, EXTRACTOR_VERSION
 from src.job_api import fetch_rss_jobs
+from write_behind import WriteBehindBuffer
+from skill_index import SkillIndex
 from pydantic import BaseModel
 
 load_dotenv()
@@ -26,67 +40,147 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent
 UPLOAD_DIR = BASE_DIR / "uploaded_resumes"
 DB_PATH = BASE_DIR / "resume_analyzer.db"
+# Parse results keyed by upload SHA-256; set PARSE_CACHE_PATH= (empty) for memory only
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", str(BASE_DIR / "parse_cache.db"))
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "256"))
+PARSE_CACHE_MEMORY_ENTRIES = int(os.getenv("PARSE_CACHE_MEMORY_ENTRIES", "256"))
+# Preload libraries and worker pools at startup; /api/ready reports when done. WARMUP=0 skips it
+WARMUP = os.getenv("WARMUP", "1") != "0"
+# Serve /admin/search from the in-memory bitmap index (loaded at startup); SKILL_INDEX=0 uses SQL
+SKILL_INDEX = os.getenv("SKILL_INDEX", "1") != "0"
+# /api/health reuses an OCR probe result for this many seconds, and gives a
+# fresh probe this long to answer before reporting the engine as degraded
+OCR_HEALTH_TTL = float(os.getenv("OCR_HEALTH_TTL", "30"))
+OCR_HEALTH_PROBE_TIMEOUT = float(os.getenv("OCR_HEALTH_PROBE_TIMEOUT", "3"))
 
+mysql_cfg = get_mysql_config()
 
-def get_mysql_config() -> Optional[dict]:
-    host = os.getenv("MYSQL_HOST")
-    user = os.getenv("MYSQL_USER")
-    password = os.getenv("MYSQL_PASSWORD", "")
-    database = os.getenv("MYSQL_DB") or os.getenv("MYSQL_DATABASE")
-    port = int(os.getenv("MYSQL_PORT", "3306"))
-    if host and user and database:
-        return {
-            "host": host,
-            "user": user,
-            "password": password,
-            "database": database,
-            "port": port,
-        }
-    return None
+# Initialize database (MySQL if configured, else SQLite)
+db = Database(str(DB_PATH), mysql_config=mysql_cfg)
 
+parse_cache = TieredCache(
+    PARSE_CACHE_PATH or None,
+    max_bytes=PARSE_CACHE_MAX_MB * 1024 * 1024,
+    memory_entries=PARSE_CACHE_MEMORY_ENTRIES,
+)
 
-mysql_cfg = get_mysql_config()
+# One thread of its own for OCR health probes: they never queue behind
+# uploads in the extraction pool, and a hung probe cannot pile up threads
+health_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-health")
+ocr_health = {"status": None, "checked": 0.0, "probe": None}
 
+skill_index = SkillIndex()
+resume_writer = WriteBehindBuffer(db)
+job_queue = JobQueue(db, parse_cache, resume_writer)
 
-def ensure_mysql_database(cfg: Optional[dict]):
-    """Ensure MySQL database exists before connecting"""
-    if not cfg:
-        return
-    db_name = cfg.get("database")
-    base_cfg = {k: v for k, v in cfg.items() if k != "database"}
-    try:
-        conn = mysql.connector.connect(**base_cfg)
-        cursor = conn.cursor()
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}` DEFAULT CHARACTER SET utf8mb4")
-        conn.commit()
-    finally:
-        try:
-            cursor.close()
-            conn.close()
-        except Exception:
-            pass
+metrics.Gauge(
+    "job_queue_depth", "Analysis jobs waiting for a worker",
+    callback=lambda: {(): job_queue.depth},
+)
+metrics.Gauge(
+    "db_write_buffer_rows", "Resume rows waiting in the write-behind buffer",
+    callback=lambda: {(): resume_writer.depth},
+)
+metrics.Gauge(
+    "skill_index_resumes", "Resumes in the in-memory skill index",
+    callback=lambda: {(): len(skill_index)},
+)
+metrics.Gauge(
+    "db_pool_connections", "Pooled database connections by state", ["state"],
+    callback=lambda: {(state,): n for state, n in db.pool.stats().items() if state != "size"},
+)
+metrics.Gauge(
+    "cache_lookups", "Parse cache lookups since start", ["result"],
+    callback=lambda: {("hit",): parse_cache.hits, ("miss",): parse_cache.misses},
+)
+metrics.Gauge(
+    "cache_hit_ratio", "Fraction of parse cache lookups served from cache",
+    callback=lambda: {(): parse_cache.hits / max(1, parse_cache.hits + parse_cache.misses)},
+)
 
 
-ensure_mysql_database(mysql_cfg)
+async def get_resume_text(data: bytes) -> str:
+    """Job-matcher text for an uploaded PDF, cached by content hash"""
+    key = content_key(data, "text", EXTRACTOR_VERSION)
+    text = await db_executor.run(parse_cache.get, key)
+    if text is None:
+        text = await extraction_executor.run(extract_resume_text, data)
+        if text.strip():
+            await db_executor.run(parse_cache.put, key, text)
+    return text
 
-# Initialize database (MySQL if configured, else SQLite)
-db = Database(str(DB_PATH), mysql_config=mysql_cfg)
+
+warmup_state = {"ready": not WARMUP}
+
+
+async def run_warm_up():
+    """Warm this process first so forked extraction workers inherit the
+    loaded modules, then warm a worker and its OCR engine"""
+    try:
+        warmup_state["api"] = await run_in_threadpool(warm_up, False)
+        warmup_state["extraction"] = await extraction_executor.run(warm_up)
+        logger.info(f"Warm-up finished: {warmup_state['extraction']}")
+    except Exception as e:
+        # Not fatal: anything not warmed loads on first use instead
+        warmup_state["error"] = str(e) or type(e).__name__
+        logger.warning(f"Warm-up failed: {warmup_state['error']}")
+    finally:
+        warmup_state["ready"] = True
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan manager to init and cleanup resources"""
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    ensure_mysql_database(mysql_cfg)
     db.create_tables()
+    if SKILL_INDEX:
+        await db_executor.run(skill_index.load, db)
+    await resume_writer.start()
+    await job_queue.start()
+    warmup_task = asyncio.create_task(run_warm_up()) if WARMUP else None
     yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await job_queue.stop()
+    await resume_writer.stop()
+    shutdown_executors()
+    health_executor.shutdown(wait=False, cancel_futures=True)
     db.close()
+    parse_cache.close()
 
 
 app = FastAPI(title="Smart Resume Analyzer API", lifespan=lifespan)
 
+
+@app.exception_handler(ServerBusy)
+async def server_busy_handler(request, exc: ServerBusy):
+    """Saturated worker pools shed load instead of queueing without bound"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Server busy ({exc.name}), please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 logger = logging.getLogger("resume_analyzer")
 logging.basicConfig(level=logging.INFO)
 
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Request count and latency per route template (not raw path, to keep label sets bounded)"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        HTTP_SECONDS.observe(time.perf_counter() - start, request.method, path)
+        HTTP_REQUESTS.inc(request.method, path, str(status))
+
 # Enable CORS
 # CORS: allow all origins so forwarded URLs (Codespaces/preview) work
 app.add_middleware(
@@ -101,170 +195,187 @@ app.add_middleware(
 async def root():
     return {"message": "Smart Resume Analyzer API", "status": "running"}
 
+async def save_upload(file: UploadFile) -> tuple:
+    """Validate an uploaded resume and save it to UPLOAD_DIR"""
+    if not file:
+        raise HTTPException(status_code=400, detail="No file provided")
+    
+    # Validate file type (case-insensitive)
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    
+    ext = Path(file.filename).suffix.lower()
+    if ext != '.pdf':
+        raise HTTPException(status_code=400, detail="Only PDF files are supported. Please upload a .pdf file.")
+    
+    # Validate file size (max 10MB)
+    file_content = await file.read()
+    file_size = len(file_content)
+    if file_size == 0:
+        raise HTTPException(status_code=400, detail="File is empty")
+    if file_size > 10 * 1024 * 1024:
+        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+    
+    # Save uploaded file
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    file_path = UPLOAD_DIR / f"{timestamp}_{file.filename}"
+    
+    with open(file_path, "wb") as buffer:
+        buffer.write(file_content)
+    
+    logger.info(f"File saved: {file_path}")
+    return file_path, file_content
+
 @app.post("/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     """Upload and analyze resume"""
     try:
-        if not file:
-            raise HTTPException(status_code=400, detail="No file provided")
-        
-        # Validate file type (case-insensitive)
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="Invalid filename")
-        
-        ext = Path(file.filename).suffix.lower()
-        if ext != '.pdf':
-            raise HTTPException(status_code=400, detail="Only PDF files are supported. Please upload a .pdf file.")
-        
-        # Validate file size (max 10MB)
-        file_content = await file.read()
-        file_size = len(file_content)
-        if file_size == 0:
-            raise HTTPException(status_code=400, detail="File is empty")
-        if file_size > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
-        
-        # Save uploaded file
-        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_path = UPLOAD_DIR / f"{timestamp}_{file.filename}"
+        file_path, file_content = await save_upload(file)
         
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-        
-        logger.info(f"File saved: {file_path}")
-        
-        # Parse resume
-        parser = ResumeParser(str(file_path))
         try:
-            resume_data = parser.extract_data()
-            logger.info(f"Resume parsed successfully: {resume_data['name']}")
-        except Exception as parse_err:
-            logger.exception("Failed to parse resume")
+            response_data = await analyze_resume_file(str(file_path), file_content, file.filename, resume_writer, parse_cache)
+        except UnreadableResume as parse_err:
             raise HTTPException(status_code=400, detail=f"Could not read the PDF: {str(parse_err)}") from parse_err
         
-        # Analyze skills and recommend field
-        try:
-            analysis = parser.analyze_skills(resume_data['skills'])
-            logger.info(f"Skills analysis complete: {analysis['field']}")
-        except Exception as analysis_err:
-            logger.exception("Failed to analyze skills")
-            analysis = {'field': 'General IT', 'level': 'Intermediate', 'recommended_skills': []}
-        
-        # Calculate resume score
-        try:
-            score = parser.calculate_score(resume_data, analysis)
-        except Exception as score_err:
-            logger.exception("Failed to calculate score")
-            score = 50
-        
-        # Get personalized course recommendations based on missing skills
-        try:
-            courses = get_personalized_courses(
-                user_skills=resume_data.get('skills', []),
-                field=analysis['field'],
-                recommended_skills=analysis.get('recommended_skills', []),
-                max_courses=8
-            )
-            logger.info(f"Generated {len(courses)} personalized course recommendations")
-        except Exception as course_err:
-            logger.exception("Failed to get personalized courses, falling back to field courses")
-            courses = get_courses_by_field(analysis['field'])
-        
-        # Prepare response
-        # Basic field validations
-        def _is_valid_email(email: str) -> bool:
-            if not email or not isinstance(email, str):
-                return False
-            import re
-            return re.match(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$", email) is not None
-
-        def _is_valid_phone(phone: str) -> bool:
-            if not phone or not isinstance(phone, str):
-                return False
-            digits = "".join(ch for ch in phone if ch.isdigit())
-            # Consider valid if 10-14 digits
-            return 10 <= len(digits) <= 14
-
-        def _is_valid_name(name: str) -> bool:
-            if not name or not isinstance(name, str):
-                return False
-            import re
-            if name.strip().lower() in {"unknown", "professional", "n/a"}:
-                return False
-            if any(ch.isdigit() for ch in name):
-                return False
-            # Must contain letters and at least one space or be 3+ letters
-            letters = re.sub(r"[^A-Za-z\s]", "", name).strip()
-            return bool(letters) and (" " in letters or len(letters) >= 3)
-
-        validations = {
-            "name": _is_valid_name(resume_data.get('name')),
-            "email": _is_valid_email(resume_data.get('email')),
-            "phone": _is_valid_phone(resume_data.get('phone')),
-        }
-
-        response_data = {
-            "name": resume_data.get('name', 'Unknown'),
-            "email": resume_data.get('email', 'N/A'),
-            "phone": resume_data.get('phone', 'N/A'),
-            "pages": resume_data.get('pages', 1),
-            "skills": resume_data.get('skills', []),
-            "experience": resume_data.get('experience', 'Fresher'),
-            "education": resume_data.get('education', []),
-            "score": score,
-            "level": analysis.get('level', 'Fresher'),
-            "field": analysis.get('field', 'General IT'),
-            "recommended_skills": analysis.get('recommended_skills', []),
-            "courses": courses[:8] if courses else [],  # Up to 8 personalized courses
-            "filename": file.filename,
-            "validations": validations,
-        }
-        
-        # Save to database (non-blocking)
-        try:
-            db.insert_resume_data(ResumeData(
-                name=response_data['name'],
-                email=response_data['email'],
-                resume_score=score,
-                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                page_no=response_data['pages'],
-                predicted_field=response_data['field'],
-                user_level=response_data['level'],
-                actual_skills=", ".join(response_data['skills']) if response_data['skills'] else "",
-                recommended_skills=", ".join(response_data['recommended_skills']) if response_data['recommended_skills'] else "",
-                recommended_courses=", ".join([c['name'] for c in courses[:5]]) if courses else ""
-            ))
-            logger.info(f"Resume data saved to database: {response_data['name']}")
-        except Exception as db_err:
-            logger.warning(f"Database insert failed (non-critical): {str(db_err)}")
-        
         return JSONResponse(content=response_data, status_code=200)
     
-    except HTTPException:
+    except (HTTPException, ServerBusy):
         raise
     except Exception as e:
         logger.exception("Unhandled error while analyzing resume")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}") from e
 
+@app.post("/bulk/resumes")
+async def bulk_upload_resumes(files: List[UploadFile] = File(...)):
+    """Analyze a batch of resumes (PDFs and/or zip archives), streaming one
+    NDJSON line per resume as it completes"""
+    spool_dir = await asyncio.to_thread(new_spool_dir)
+    try:
+        items = await expand_uploads(files, spool_dir)
+        if not items:
+            raise HTTPException(status_code=400, detail="No resumes found in upload")
+        if len(items) > BULK_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Too many resumes in one batch (max {BULK_MAX_FILES})")
+    except BulkTooLarge as e:
+        await asyncio.to_thread(remove_spool_dir, spool_dir)
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except BaseException:
+        await asyncio.to_thread(remove_spool_dir, spool_dir)
+        raise
+    logger.info(f"Bulk upload: {len(items)} resumes")
+    return StreamingResponse(stream_bulk_analysis(items, resume_writer, parse_cache, spool_dir),
+                             media_type="application/x-ndjson")
+
+@app.post("/jobs/resume", status_code=202)
+async def submit_resume_job(file: UploadFile = File(...)):
+    """Queue a resume for background analysis; poll /jobs/{id} or stream /jobs/{id}/events"""
+    file_path, _ = await save_upload(file)
+    job_id = await job_queue.submit(str(file_path), file.filename)
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_resume_job(job_id: str):
+    """Status, current stage and (once done) result of an analysis job"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JSONResponse(content=job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_resume_job(job_id: str):
+    """Server-sent events with each stage of an analysis job"""
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_queue.events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/admin/stats")
 async def get_stats():
     """Get admin statistics"""
     try:
-        stats = db.get_statistics()
+        stats = await db_executor.run(db.get_statistics)
         return JSONResponse(content=stats)
+    except ServerBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/resumes")
-async def get_all_resumes():
-    """Get all resume data for admin"""
+async def get_all_resumes(limit: int = RESUME_PAGE_DEFAULT, cursor: Optional[str] = None,
+                          field: Optional[str] = None, level: Optional[str] = None,
+                          min_score: Optional[int] = None, max_score: Optional[int] = None,
+                          since: Optional[str] = None, until: Optional[str] = None,
+                          fields: Optional[str] = None):
+    """Resume records for admin, newest first, one page at a time. Pass the
+    returned next_cursor as ``cursor`` for the next page; ``fields`` is a
+    comma-separated column list."""
+    columns = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
     try:
-        resumes = db.get_all_resumes()
-        return JSONResponse(content={"resumes": resumes})
+        page = await db_executor.run(functools.partial(
+            db.list_resumes, limit=limit, cursor=cursor, fields=columns, field=field, level=level,
+            min_score=min_score, max_score=max_score, since=since, until=until,
+        ))
+        return JSONResponse(content=page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ServerBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _analytics(method, **params):
+    """Run an analytics query on the DB pool; bad ranges/arguments become a 400"""
+    try:
+        return await db_executor.run(functools.partial(method, **params))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/admin/analytics/uploads")
+async def analytics_uploads(interval: str = "day", since: Optional[str] = None, until: Optional[str] = None):
+    """Uploads and average score per hour or day"""
+    return {"interval": interval, "buckets": await _analytics(db.analytics_uploads, interval=interval, since=since, until=until)}
+
+@app.get("/admin/analytics/fields")
+async def analytics_fields(interval: str = "day", since: Optional[str] = None, until: Optional[str] = None):
+    """Predicted-field mix per hour or day"""
+    return {"interval": interval, "buckets": await _analytics(db.analytics_fields, interval=interval, since=since, until=until)}
+
+@app.get("/admin/analytics/scores")
+async def analytics_scores(interval: str = "day", since: Optional[str] = None, until: Optional[str] = None):
+    """Score histogram over a date range"""
+    return {"histogram": await _analytics(db.analytics_scores, interval=interval, since=since, until=until)}
+
+@app.get("/admin/analytics/skills")
+async def analytics_skills(kind: str = "actual", limit: int = 20, interval: str = "day",
+                           since: Optional[str] = None, until: Optional[str] = None):
+    """Most common actual (or recommended) skills over a date range"""
+    return {"kind": kind, "skills": await _analytics(db.analytics_skills, kind=kind, limit=limit,
+                                                     interval=interval, since=since, until=until)}
+
+@app.get("/admin/search")
+async def search_resumes(skills: str, kind: str = "actual", field: Optional[str] = None,
+                         level: Optional[str] = None, min_score: Optional[int] = None,
+                         limit: int = SEARCH_LIMIT_DEFAULT):
+    """Candidates by skill, best score first. ``skills`` ANDs comma-separated
+    terms and ORs "|"-separated alternatives: ``react|vue,docker``."""
+    try:
+        if not skill_index.loaded:
+            return await db_executor.run(functools.partial(
+                db.search_resumes, skills, kind=kind, field=field, level=level, min_score=min_score, limit=limit,
+            ))
+        # Pick up rows committed since the last search (by any process), then
+        # match in memory; only the winning rows come from the database
+        await db_executor.run(skill_index.refresh, db)
+        result = skill_index.search(skills, kind=kind, field=field, level=level, min_score=min_score, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result["resumes"] = await db_executor.run(db.get_search_rows, result.pop("ids"))
+    return result
+
 @app.get("/courses/{field}")
 async def get_courses(field: str):
     """Get courses for a specific field"""
@@ -301,15 +412,9 @@ async def analyze_resume_endpoint(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
     data = await file.read()
-
-    class _U:
-        def __init__(self, b: bytes):
-            self._b = b
-        def read(self):
-            return self._b
-
-    resume_text = extract_text_from_pdf(_U(data))
-    summary, gaps, roadmap = run_analysis(resume_text)
+    resume_text = await get_resume_text(data)
+    # May call OpenRouter over the network; keep it off the loop
+    summary, gaps, roadmap = await run_in_threadpool(run_analysis, resume_text)
     return AnalysisOut(summary=summary, gaps=gaps, roadmap=roadmap)
 
 @app.post("/api/keywords")
@@ -325,14 +430,7 @@ async def extract_skills_from_resume(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
     data = await file.read()
-
-    class _U:
-        def __init__(self, b: bytes):
-            self._b = b
-        def read(self):
-            return self._b
-
-    resume_text = extract_text_from_pdf(_U(data))
+    resume_text = await get_resume_text(data)
     keywords, keyword_list = local_extract_keywords(resume_text, limit=12)
     return {"keywords": keywords, "keyword_list": keyword_list}
 
@@ -340,7 +438,8 @@ async def extract_skills_from_resume(file: UploadFile = File(...)):
 async def get_jobs(keywords: str, rows: int = 60):
     """Get job recommendations based on keywords"""
     try:
-        jobs = fetch_rss_jobs(keywords, rows=rows)
+        with timed(STAGE_SECONDS, "rss_fetch"):
+            jobs = await run_in_threadpool(fetch_rss_jobs, keywords, rows=rows)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Job search failed: {e}")
 
@@ -355,10 +454,49 @@ async def get_jobs(keywords: str, rows: int = 60):
 
     return JobsOut(jobs=[map_job(j) for j in jobs])
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+async def ocr_health_status() -> dict:
+    """Latest OCR engine probe, refreshed at most every OCR_HEALTH_TTL seconds.
+    Concurrent callers share one in-flight probe."""
+    now = time.monotonic()
+    if ocr_health["status"] is not None and now - ocr_health["checked"] < OCR_HEALTH_TTL:
+        return {**ocr_health["status"], "age": round(now - ocr_health["checked"], 1)}
+    probe = ocr_health["probe"]
+    if probe is None or probe.done():
+        probe = ocr_health["probe"] = asyncio.get_running_loop().run_in_executor(health_executor, ocr.engine_check)
+    try:
+        status = await asyncio.wait_for(asyncio.shield(probe), OCR_HEALTH_PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        status = {"engine": ocr.engine_name(), "workers": ocr.OCR_WORKERS, "ok": False,
+                  "error": f"probe did not answer within {OCR_HEALTH_PROBE_TIMEOUT:g}s"}
+    except Exception as e:
+        status = {"engine": ocr.engine_name(), "workers": ocr.OCR_WORKERS, "ok": False,
+                  "error": str(e) or type(e).__name__}
+    ocr_health.update(status=status, checked=time.monotonic())
+    return {**status, "age": 0.0}
+
 @app.get("/api/health")
 async def health():
-    """Health check for job recommendation service"""
-    return {"status": "ok"}
+    """Health check: API up, plus a cached probe of the OCR engine (on its own
+    thread, not in the extraction queue) and of a pooled database connection"""
+    ocr_status = await ocr_health_status()
+    try:
+        db_status = await db_executor.run(db.health_check)
+    except ServerBusy:
+        db_status = {"ok": True, "busy": True, "pool": db.pool.stats()}
+    ok = ocr_status.get("ok") and db_status.get("ok")
+    return {"status": "ok" if ok else "degraded", "ocr": ocr_status, "db": db_status}
+
+@app.get("/api/ready")
+async def ready():
+    """Readiness probe: 503 until the startup warm-up has finished"""
+    if not warmup_state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready", **{k: v for k, v in warmup_state.items() if k != "ready"}}
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,60 @@
+"""
+Database maintenance commands
+Applies schema migrations and rebuilds derived tables from user_data.
+
+Run from the backend directory:
+    python manage_db.py migrate
+    python manage_db.py rebuild-stats      # recompute stats_rollup
+    python manage_db.py rebuild-analytics  # recompute the hourly/daily analytics rollups
+    python manage_db.py rebuild-skills     # recompute the resume_skills search index
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from database import Database, ensure_mysql_database, get_mysql_config
+
+DB_PATH = Path(__file__).parent / "resume_analyzer.db"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Resume analyzer database maintenance")
+    parser.add_argument("--sqlite-path", type=Path, default=DB_PATH, help="SQLite database (when MySQL is not configured)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="Create tables and apply pending schema migrations")
+    commands.add_parser("rebuild-stats", help="Recompute the /admin/stats rollup from user_data")
+    commands.add_parser("rebuild-analytics", help="Recompute the /admin/analytics rollups from user_data")
+    commands.add_parser("rebuild-skills", help="Recompute the /admin/search skill index from user_data")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+
+    mysql_cfg = get_mysql_config()
+    ensure_mysql_database(mysql_cfg)
+    db = Database(str(args.sqlite_path), mysql_config=mysql_cfg)
+    try:
+        # create_tables() also applies pending migrations
+        db.create_tables()
+        if args.command == "rebuild-stats":
+            print(json.dumps(db.rebuild_statistics(), indent=2))
+        elif args.command == "rebuild-analytics":
+            db.rebuild_analytics()
+        elif args.command == "rebuild-skills":
+            db.rebuild_skill_index()
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Prometheus-style metrics
+Counters, gauges and histograms rendered in the Prometheus text format for
+the /metrics endpoint, plus the ``timed`` helper used to instrument the
+pipeline. Everything is in-process and lock-protected; samples recorded in
+extraction worker processes are shipped back to the server with each result
+(see ``call_collecting`` / ``merge``).
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+_registry: Dict[str, "_Metric"] = {}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def drain(self):
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values):
+        with self._lock:
+            for labels, amount in values.items():
+                self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Point-in-time value, either set directly or read from a callback at
+    scrape time (callback returns {label values: value})"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        if self.callback is not None:
+            try:
+                items = sorted(self.callback().items())
+            except Exception:
+                items = []
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Bucketed observations (seconds, by default) per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last = +Inf), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def drain(self):
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def merge(self, series):
+        with self._lock:
+            for labels, (counts, total, n) in series.items():
+                mine = self._series.get(labels)
+                if mine is None:
+                    self._series[labels] = [list(counts), total, n]
+                    continue
+                mine[0] = [a + b for a, b in zip(mine[0], counts)]
+                mine[1] += total
+                mine[2] += n
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        lines = []
+        for labels, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {n}")
+        return lines
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels: str):
+    """Observe the wall time of the ``with`` block, also when it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels)
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in list(_registry.values()):
+        body = metric.render()
+        if body:
+            lines.extend(metric.header())
+            lines.extend(body)
+    return "\n".join(lines) + "\n"
+
+
+def drain() -> Dict[str, object]:
+    """Take (and reset) this process's counter/histogram samples"""
+    return {name: m.drain() for name, m in _registry.items() if isinstance(m, (Counter, Histogram))}
+
+
+def merge(samples: Dict[str, object]):
+    """Add samples drained in another process"""
+    for name, values in samples.items():
+        metric = _registry.get(name)
+        if isinstance(metric, (Counter, Histogram)) and values:
+            metric.merge(values)
+
+
+def call_collecting(fn: Callable, *args):
+    """Worker-process entry point: run ``fn`` and return its result together
+    with the metrics it recorded"""
+    result = fn(*args)
+    return result, drain()
+
+
+# Shared pipeline metrics
+STAGE_SECONDS = Histogram(
+    "resume_stage_seconds", "Time spent in each resume pipeline stage", ["stage"])
+EXTRACTION_BACKEND = Counter(
+    "resume_extraction_backend_total", "PDFs whose text came from each extraction backend", ["backend"])
+OCR_PAGES = Counter(
+    "resume_ocr_pages_total", "Pages sent to OCR")
+OCR_CACHE_LOOKUPS = Counter(
+    "resume_ocr_cache_lookups_total", "Page OCR cache lookups", ["result"])
+OCR_RETRIES = Counter(
+    "resume_ocr_retries_total", "Pages re-rendered at a higher DPI after a low-confidence OCR pass")
+OCR_EARLY_STOPS = Counter(
+    "resume_ocr_early_stops_total", "Documents whose remaining pages were skipped once OCR found enough")
+OCR_TIMEOUTS = Counter(
+    "resume_ocr_timeouts_total",
+    "Pages that hit OCR_PAGE_TIMEOUT, by where it was enforced (engine, or a stuck worker that was killed)",
+    ["where"])
+DB_SECONDS = Histogram(
+    "db_operation_seconds", "Database call latency", ["operation"])
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled database connection")
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Database calls that gave up waiting for a free connection")
+DB_RECONNECTS = Counter(
+    "db_reconnects_total", "Stale or broken database connections that were replaced")
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+HTTP_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response starts", ["method", "route"])
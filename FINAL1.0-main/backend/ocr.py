@@ -0,0 +1,461 @@
+"""
+Parallel page OCR
+Fans rendered page images out to a bounded, reusable process pool and
+merges the recognised text back in page order. Pages arrive as raw
+grayscale pixel buffers (``GrayImage``) so no PNG encode/decode happens
+between rendering and Tesseract. Each page comes back with Tesseract's
+mean word confidence so callers can re-render weak pages at a higher DPI.
+
+Every worker keeps a warm recognition engine between pages: tesserocr's
+in-process API when installed (traineddata loaded once per worker), else
+pytesseract, which still runs one tesseract process per page.
+
+Recognised pages are cached on disk, keyed by a hash of the downsampled
+grayscale page plus DPI, language and engine, so pages seen before (shared
+transcripts, certificates, re-uploads) skip Tesseract entirely.
+"""
+
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+from cache import TieredCache, content_key
+from lazy_imports import lazy_import
+from metrics import OCR_CACHE_LOOKUPS, OCR_PAGES, OCR_TIMEOUTS, STAGE_SECONDS, timed
+
+Image = lazy_import("PIL.Image")
+HAS_PIL = Image is not None
+tesserocr = lazy_import("tesserocr")
+HAS_TESSEROCR = HAS_PIL and tesserocr is not None
+pytesseract = lazy_import("pytesseract")
+HAS_PYTESSERACT = HAS_PIL and pytesseract is not None
+
+HAS_TESSERACT = HAS_TESSEROCR or HAS_PYTESSERACT
+
+logger = logging.getLogger(__name__)
+
+# Worker processes shared by every request
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Pages OCR'd per document; the rest are ignored
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+# Pages queued or running across all requests; callers block when exhausted
+OCR_MAX_CONCURRENT_PAGES = int(os.getenv("OCR_MAX_CONCURRENT_PAGES", str(OCR_WORKERS * 2)))
+# Seconds a single page may take; the engine itself aborts recognition after this
+OCR_PAGE_TIMEOUT = float(os.getenv("OCR_PAGE_TIMEOUT", "60"))
+# Extra seconds before a page whose engine ignored the timeout counts as a stuck
+# worker; the pool is then killed and replaced so the worker is not lost for good
+OCR_STUCK_GRACE = 10
+# Rendering resolution for OCR; pages read with low confidence at OCR_FAST_DPI are retried at this one
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+# First-pass resolution, enough for most clean scans (set >= OCR_DPI to always use OCR_DPI)
+OCR_FAST_DPI = int(os.getenv("OCR_FAST_DPI", "150"))
+# Mean word confidence (0-100) a first-pass page needs to skip the OCR_DPI retry
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "75"))
+# Pixel ceiling per rendered page (1 byte each in grayscale); larger pages are rendered at a lower DPI
+OCR_MAX_PIXELS = int(os.getenv("OCR_MAX_PIXELS", "12000000"))
+# Engine used by workers: "tesserocr", "pytesseract" or "auto" (tesserocr when installed)
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto")
+# Pages an engine recognises before it is recycled, bounding leaks in native code (0 = never)
+OCR_ENGINE_MAX_PAGES = int(os.getenv("OCR_ENGINE_MAX_PAGES", "1000"))
+# Seconds a health check waits for a worker to answer
+OCR_HEALTH_TIMEOUT = float(os.getenv("OCR_HEALTH_TIMEOUT", "10"))
+# Page OCR cache shared by all processes; set OCR_CACHE_PATH= (empty) to disable
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_cache.db"))
+OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", "128"))
+OCR_CACHE_MEMORY_ENTRIES = int(os.getenv("OCR_CACHE_MEMORY_ENTRIES", "64"))
+# Width pages are downsampled to before hashing; small enough to absorb
+# encoder noise, large enough that different text never collides
+OCR_CACHE_HASH_WIDTH = 256
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_page_slots = threading.BoundedSemaphore(max(1, OCR_MAX_CONCURRENT_PAGES))
+
+
+def configure(workers: Optional[int] = None, max_concurrent_pages: Optional[int] = None, page_slots=None):
+    """Override pool sizing for this process (e.g. inside extraction workers).
+    ``page_slots`` is a semaphore shared with other processes, so their
+    pages count against one limit (``max_concurrent_pages`` of them)."""
+    global OCR_WORKERS, OCR_MAX_CONCURRENT_PAGES, _page_slots
+    shutdown_pool()
+    if workers is not None:
+        OCR_WORKERS = workers
+    OCR_MAX_CONCURRENT_PAGES = max_concurrent_pages or OCR_WORKERS * 2
+    _page_slots = page_slots if page_slots is not None else threading.BoundedSemaphore(max(1, OCR_MAX_CONCURRENT_PAGES))
+
+
+class GrayImage(NamedTuple):
+    """8-bit grayscale pixels of one rendered page, ``stride`` bytes per row"""
+    width: int
+    height: int
+    stride: int
+    samples: bytes
+    dpi: int = 0
+
+
+PageImage = Union[GrayImage, bytes]
+
+
+class OcrTimeout(RuntimeError):
+    """The engine gave up on a page after OCR_PAGE_TIMEOUT"""
+
+
+class OcrResult(NamedTuple):
+    text: str
+    confidence: float  # mean word confidence, 0-100
+
+
+EMPTY_RESULT = OcrResult("", 0.0)
+
+
+def _to_pil(image: PageImage):
+    if isinstance(image, GrayImage):
+        return Image.frombuffer("L", (image.width, image.height), image.samples, "raw", "L", image.stride, 1)
+    return Image.open(io.BytesIO(image))
+
+
+class TesserocrEngine:
+    """tesserocr's TessBaseAPI: traineddata stays loaded across pages"""
+    name = "tesserocr"
+
+    def __init__(self, lang: str):
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def recognize(self, image) -> OcrResult:
+        self.api.SetImage(image)
+        # Recognize() honours a deadline (ms); GetUTF8Text() alone would not
+        if not self.api.Recognize(int(OCR_PAGE_TIMEOUT * 1000)):
+            self.api.Clear()
+            raise OcrTimeout(f"tesserocr gave up after {OCR_PAGE_TIMEOUT}s")
+        text = self.api.GetUTF8Text()
+        confidence = float(self.api.MeanTextConf()) if text.strip() else 0.0
+        self.api.Clear()
+        return OcrResult(text, confidence)
+
+    def close(self):
+        self.api.End()
+
+
+class PytesseractEngine:
+    """tesseract CLI through pytesseract, one process per page"""
+    name = "pytesseract"
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    def recognize(self, image) -> OcrResult:
+        """Word-level output gives text and confidence from a single run;
+        lines and paragraphs are rejoined as ``image_to_string`` lays them out"""
+        try:
+            # pytesseract kills the tesseract process once the timeout passes
+            data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT,
+                                             timeout=OCR_PAGE_TIMEOUT)
+        except RuntimeError as e:
+            if "timeout" in str(e).lower():
+                raise OcrTimeout(f"tesseract killed after {OCR_PAGE_TIMEOUT}s") from e
+            raise
+        lines: List[str] = []
+        confidences: List[float] = []
+        last_line = last_par = None
+        for i, word in enumerate(data["text"]):
+            word = (word or "").strip()
+            if not word:
+                continue
+            par = (data["block_num"][i], data["par_num"][i])
+            line = par + (data["line_num"][i],)
+            if line != last_line:
+                if last_par is not None and par != last_par:
+                    lines.append("")
+                lines.append(word)
+            else:
+                lines[-1] += " " + word
+            last_line, last_par = line, par
+            conf = float(data["conf"][i])
+            if conf >= 0:
+                confidences.append(conf)
+        text = "\n".join(lines) + "\n" if lines else ""
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return OcrResult(text, round(confidence, 1))
+
+    def close(self):
+        pass
+
+
+def engine_name() -> Optional[str]:
+    """Engine this process will use, or None when no OCR backend is installed"""
+    if OCR_ENGINE in ("auto", "tesserocr") and HAS_TESSEROCR:
+        return TesserocrEngine.name
+    if OCR_ENGINE in ("auto", "pytesseract") and HAS_PYTESSERACT:
+        return PytesseractEngine.name
+    return None
+
+
+# Engines live per thread: tesserocr handles are not thread-safe
+_engines = threading.local()
+
+
+def _get_engine(lang: str):
+    """This thread's warm engine for ``lang``, recycled every OCR_ENGINE_MAX_PAGES pages"""
+    cache: Dict[str, list] = getattr(_engines, "by_lang", None)
+    if cache is None:
+        cache = _engines.by_lang = {}
+    entry = cache.get(lang)
+    if entry is not None and OCR_ENGINE_MAX_PAGES and entry[1] >= OCR_ENGINE_MAX_PAGES:
+        _drop_engine(lang)
+        entry = None
+    if entry is None:
+        name = engine_name()
+        if name is None:
+            raise RuntimeError("No OCR engine installed (tesserocr or pytesseract)")
+        engine = TesserocrEngine(lang) if name == TesserocrEngine.name else PytesseractEngine(lang)
+        entry = cache[lang] = [engine, 0]
+    entry[1] += 1
+    return entry[0]
+
+
+def _drop_engine(lang: str):
+    entry = getattr(_engines, "by_lang", {}).pop(lang, None)
+    if entry is not None:
+        try:
+            entry[0].close()
+        except Exception:
+            pass
+
+
+def _init_worker(lang: str):
+    """Pool initializer: load the engine before the first page arrives"""
+    try:
+        _get_engine(lang)
+    except Exception as e:
+        logger.warning(f"OCR engine warm-up failed: {e}")
+
+
+def _ocr_image(image: PageImage, lang: str) -> OcrResult:
+    """Worker entry point: OCR one page (raw grayscale or an encoded image file).
+
+    An engine that raises is discarded so the next page starts a fresh one.
+    """
+    engine = _get_engine(lang)
+    try:
+        return engine.recognize(_to_pil(image))
+    except Exception:
+        _drop_engine(lang)
+        raise
+
+
+def _probe(lang: str) -> str:
+    """Worker entry point for health checks: recognise a blank tile"""
+    _ocr_image(GrayImage(32, 32, 32, b"\xff" * 1024), lang)
+    return engine_name()
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared OCR pool, creating it on first use"""
+    global _pool
+    if OCR_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_init_worker, initargs=('eng',))
+            except Exception as e:  # e.g. no multiprocessing support in the sandbox
+                logger.warning(f"OCR process pool unavailable, running inline: {e}")
+                return None
+        return _pool
+
+
+def shutdown_pool(wait: bool = False):
+    """Stop the OCR worker processes"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor, reason: str = "OCR worker process died",
+                         terminate: bool = False):
+    """Drop a pool whose worker died (or hung) so the next call starts a fresh
+    one. ``terminate`` kills its processes: shutdown() alone leaves a worker
+    stuck in native code running, holding its slot forever."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            logger.warning(f"{reason}, restarting pool")
+            _pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values()) if terminate else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        try:
+            process.terminate()
+        except Exception:
+            pass
+
+
+def health_check(lang: str = 'eng') -> Dict:
+    """Recognise a blank tile on a worker (or inline). A pool that fails to
+    answer within OCR_HEALTH_TIMEOUT is replaced."""
+    status = {"engine": engine_name(), "workers": OCR_WORKERS, "ok": False}
+    if status["engine"] is None:
+        status["error"] = "no OCR engine installed"
+        return status
+    pool = get_pool()
+    try:
+        if pool is None:
+            _probe(lang)
+        else:
+            pool.submit(_probe, lang).result(timeout=OCR_HEALTH_TIMEOUT)
+        status["ok"] = True
+    except Exception as e:
+        status["error"] = str(e) or type(e).__name__
+        if pool is not None:
+            _discard_broken_pool(pool, "OCR health check failed")
+    return status
+
+
+
+def engine_check(lang: str = 'eng') -> Dict:
+    """Recognise a blank tile on the calling thread, bypassing the page pools,
+    so a probe never waits behind queued pages"""
+    status = {"engine": engine_name(), "workers": OCR_WORKERS, "ok": False}
+    if status["engine"] is None:
+        status["error"] = "no OCR engine installed"
+        return status
+    try:
+        _probe(lang)
+        status["ok"] = True
+    except Exception as e:
+        status["error"] = str(e) or type(e).__name__
+    return status
+
+
+_cache: Optional[TieredCache] = None
+_cache_pid: Optional[int] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[TieredCache]:
+    """This process's handle on the page cache (SQLite connections do not
+    survive a fork, so each worker process opens its own)"""
+    global _cache, _cache_pid
+    if not OCR_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            _cache = TieredCache(OCR_CACHE_PATH, OCR_CACHE_MAX_MB * 1024 * 1024, OCR_CACHE_MEMORY_ENTRIES)
+            _cache_pid = os.getpid()
+        return _cache
+
+
+def page_key(image: PageImage, lang: str) -> str:
+    """Cache key: SHA-256 of the page downsampled to OCR_CACHE_HASH_WIDTH and
+    quantised to 16 gray levels, plus DPI, size, language and engine"""
+    img = _to_pil(image).convert("L")
+    height = max(1, round(img.height * OCR_CACHE_HASH_WIDTH / img.width))
+    thumb = img.resize((OCR_CACHE_HASH_WIDTH, height), Image.BOX).point(lambda v: v >> 4)
+    dpi = image.dpi if isinstance(image, GrayImage) else 0
+    return content_key(thumb.tobytes(), "ocr", str(dpi), f"{img.width}x{img.height}", lang, engine_name() or "")
+
+
+def _cache_get(cache: Optional[TieredCache], key: Optional[str]) -> Optional[OcrResult]:
+    if cache is None or key is None:
+        return None
+    value = cache.get(key)
+    OCR_CACHE_LOOKUPS.inc("miss" if value is None else "hit")
+    return OcrResult(value["text"], value["confidence"]) if value is not None else None
+
+
+def _cache_put(cache: Optional[TieredCache], key: Optional[str], result: OcrResult):
+    # Empty results are also what failures and timeouts return, so they are not kept
+    if cache is not None and key is not None and result.text.strip():
+        cache.put(key, {"text": result.text, "confidence": result.confidence})
+
+
+@timed(STAGE_SECONDS, "ocr_pages")
+def ocr_images(images: Iterable[PageImage], lang: str = 'eng', max_pages: int = OCR_MAX_PAGES) -> List[OcrResult]:
+    """OCR page images in parallel.
+
+    ``images`` may be a lazy iterable so pages are only rendered once a
+    concurrency slot is free. Returns one result per page in input order;
+    pages that fail or time out yield ``EMPTY_RESULT``.
+    """
+    if not HAS_TESSERACT:
+        raise RuntimeError("No OCR engine installed (tesserocr or pytesseract)")
+
+    pool = get_pool()
+    slots = _page_slots
+    cache = get_cache()
+    futures = []  # (page index, cache key, future)
+    results: List[OcrResult] = []
+    cached_pages = 0
+
+    for page_num, image in enumerate(images):
+        if page_num >= max_pages:
+            logger.info(f"OCR page cap reached ({max_pages}), skipping remaining pages")
+            break
+
+        key = None
+        if cache is not None:
+            try:
+                key = page_key(image, lang)
+            except Exception as key_err:
+                logger.warning(f"OCR page {page_num+1} could not be hashed: {key_err}")
+        cached = _cache_get(cache, key)
+        if cached is not None:
+            results.append(cached)
+            cached_pages += 1
+            continue
+
+        if pool is None:
+            try:
+                result = _ocr_image(image, lang)
+                _cache_put(cache, key, result)
+            except OcrTimeout as timeout_err:
+                OCR_TIMEOUTS.inc("engine")
+                logger.warning(f"OCR page {page_num+1} timed out: {timeout_err}")
+                result = EMPTY_RESULT
+            except Exception as page_err:
+                logger.warning(f"OCR page {page_num+1} failed: {page_err}")
+                result = EMPTY_RESULT
+            results.append(result)
+            continue
+
+        slots.acquire()
+        try:
+            future = pool.submit(_ocr_image, image, lang)
+        except Exception as submit_err:
+            slots.release()
+            if isinstance(submit_err, BrokenProcessPool):
+                _discard_broken_pool(pool)
+            raise
+        future.add_done_callback(lambda _f: slots.release())
+        futures.append((len(results), key, future))
+        results.append(EMPTY_RESULT)
+
+    for index, key, future in futures:
+        try:
+            results[index] = future.result(timeout=OCR_PAGE_TIMEOUT + OCR_STUCK_GRACE)
+            _cache_put(cache, key, results[index])
+        except OcrTimeout as timeout_err:
+            OCR_TIMEOUTS.inc("engine")
+            logger.warning(f"OCR page {index+1} timed out: {timeout_err}")
+        except FutureTimeout:
+            # The engine ignored its deadline; cancel() cannot stop a running
+            # page, so kill the pool rather than leak the worker
+            OCR_TIMEOUTS.inc("worker")
+            if not future.cancel():
+                _discard_broken_pool(pool, f"OCR page {index+1} stuck past {OCR_PAGE_TIMEOUT}s", terminate=True)
+            logger.warning(f"OCR page {index+1} timed out after {OCR_PAGE_TIMEOUT}s")
+        except Exception as page_err:
+            if isinstance(page_err, BrokenProcessPool):
+                _discard_broken_pool(pool)
+            logger.warning(f"OCR page {index+1} failed: {page_err}")
+
+    OCR_PAGES.inc(amount=len(results) - cached_pages)
+    for page_num, result in enumerate(results):
+        logger.info(f"OCR page {page_num+1}: {len(result.text)} chars, confidence {result.confidence}")
+    return results
@@ -0,0 +1,235 @@
+"""
+Shared PDF document session
+Loads an uploaded PDF once and hands out one parsed handle per backend
+(PyMuPDF, pdfplumber, PyPDF2) for the lifetime of a single analysis
+"""
+
+import io
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import ocr
+from lazy_imports import lazy_import
+from metrics import OCR_EARLY_STOPS, OCR_RETRIES
+from ocr import (
+    OCR_DPI, OCR_FAST_DPI, OCR_MAX_PAGES, OCR_MAX_PIXELS, OCR_MIN_CONFIDENCE, GrayImage, OcrResult, ocr_images,
+)
+
+PyPDF2 = lazy_import("PyPDF2")
+fitz = lazy_import("fitz")
+HAS_PYMUPDF = fitz is not None
+pdfplumber = lazy_import("pdfplumber")
+HAS_PDFPLUMBER = pdfplumber is not None
+
+logger = logging.getLogger(__name__)
+
+# A page with less native text than this is a candidate for OCR
+OCR_PAGE_MIN_TEXT_CHARS = int(os.getenv("OCR_PAGE_MIN_TEXT_CHARS", "25"))
+# ...if images cover at least this fraction of it
+OCR_PAGE_MIN_IMAGE_COVERAGE = float(os.getenv("OCR_PAGE_MIN_IMAGE_COVERAGE", "0.05"))
+# Mostly-image pages with only a caption of text are OCR'd too
+OCR_PAGE_SCAN_COVERAGE = 0.6
+OCR_PAGE_CAPTION_CHARS = 200
+
+
+def render_page(page, dpi: int = OCR_DPI, max_pixels: int = OCR_MAX_PIXELS) -> GrayImage:
+    """Rasterize one PyMuPDF page to 8-bit grayscale in-process.
+
+    Pages that would exceed ``max_pixels`` at ``dpi`` (posters, huge scans)
+    are rendered at the largest resolution that fits, so one page never
+    needs more than ``max_pixels`` bytes.
+    """
+    zoom = dpi / 72
+    width, height = page.rect.width * zoom, page.rect.height * zoom
+    if max_pixels > 0 and width * height > max_pixels:
+        scale = math.sqrt(max_pixels / (width * height))
+        # Leave room for the pixmap rounding each side up to a whole pixel
+        scale *= 1 - 1 / (width * scale) - 1 / (height * scale)
+        zoom *= scale
+        logger.info(f"Page {page.number+1} rendered at {zoom * 72:.0f} DPI to stay under {max_pixels} pixels")
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    return GrayImage(pix.width, pix.height, pix.stride, pix.samples, round(zoom * 72))
+
+
+@dataclass
+class PageProfile:
+    number: int
+    text: str
+    image_coverage: float
+
+    @property
+    def needs_ocr(self) -> bool:
+        """True for image-only (scanned) pages whose content is not in the text layer"""
+        chars = len(self.text.strip())
+        if chars < OCR_PAGE_MIN_TEXT_CHARS:
+            return self.image_coverage >= OCR_PAGE_MIN_IMAGE_COVERAGE
+        return self.image_coverage >= OCR_PAGE_SCAN_COVERAGE and chars < OCR_PAGE_CAPTION_CHARS
+
+
+class PdfSession:
+    """Holds the PDF bytes and lazily opened backend handles for one request.
+
+    Each backend parses the document at most once; handles are released by
+    ``close()`` (or on leaving the ``with`` block).
+    """
+
+    def __init__(self, source: Union[str, bytes]):
+        if isinstance(source, (bytes, bytearray)):
+            self.file_path = None
+            self.data = bytes(source)
+        else:
+            self.file_path = str(source)
+            with open(self.file_path, 'rb') as f:
+                self.data = f.read()
+        self._fitz_doc = None
+        self._plumber_pdf = None
+        self._pypdf_reader = None
+        self._profiles: Optional[List[PageProfile]] = None
+
+    def __enter__(self) -> "PdfSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def fitz_doc(self):
+        """PyMuPDF document, opened from memory on first use"""
+        if not HAS_PYMUPDF:
+            return None
+        if self._fitz_doc is None:
+            self._fitz_doc = fitz.open(stream=self.data, filetype="pdf")
+        return self._fitz_doc
+
+    @property
+    def plumber_pdf(self):
+        """pdfplumber document, opened from memory on first use"""
+        if not HAS_PDFPLUMBER:
+            return None
+        if self._plumber_pdf is None:
+            self._plumber_pdf = pdfplumber.open(io.BytesIO(self.data))
+        return self._plumber_pdf
+
+    @property
+    def pypdf_reader(self) -> "PyPDF2.PdfReader":
+        """PyPDF2 reader, opened from memory on first use"""
+        if self._pypdf_reader is None:
+            self._pypdf_reader = PyPDF2.PdfReader(io.BytesIO(self.data))
+        return self._pypdf_reader
+
+    def page_count(self) -> Optional[int]:
+        """Page count from whichever backend is already open, else the cheapest one"""
+        if self._fitz_doc is not None:
+            return len(self._fitz_doc)
+        if self._plumber_pdf is not None:
+            return len(self._plumber_pdf.pages)
+        if self._pypdf_reader is not None:
+            return len(self._pypdf_reader.pages)
+
+        try:
+            if HAS_PYMUPDF:
+                return len(self.fitz_doc)
+        except Exception as e:
+            logger.warning(f"Could not count pages: {e}")
+
+        try:
+            return len(self.pypdf_reader.pages)
+        except Exception as e:
+            logger.warning(f"PyPDF2 page count failed: {e}")
+
+        return None
+
+    @property
+    def producer(self) -> Optional[str]:
+        """Producer (or creator) metadata of the document, if PyMuPDF can read it"""
+        doc = self.fitz_doc
+        if doc is None:
+            return None
+        metadata = doc.metadata or {}
+        return metadata.get('producer') or metadata.get('creator') or None
+
+    def page_profiles(self) -> List[PageProfile]:
+        """Native text and image coverage of every page, from PyMuPDF"""
+        if self._profiles is None:
+            profiles = []
+            doc = self.fitz_doc
+            if doc is not None:
+                for page in doc:
+                    area = abs(page.rect) or 1.0
+                    covered = sum(abs(fitz.Rect(info['bbox']) & page.rect) for info in page.get_image_info())
+                    profiles.append(PageProfile(page.number, page.get_text("text"), min(1.0, covered / area)))
+            self._profiles = profiles
+        return self._profiles
+
+    def ocr_pages(self, page_numbers: Iterable[int], lang: str = 'eng', dpi: Optional[int] = None,
+                  stop_when: Optional[Callable[[str], bool]] = None) -> Dict[int, str]:
+        """Render the given pages with PyMuPDF and OCR them in parallel.
+
+        Pages are read at OCR_FAST_DPI first and only those below
+        OCR_MIN_CONFIDENCE are re-rendered at OCR_DPI (a fixed ``dpi`` skips
+        the ladder). With ``stop_when``, pages go out in pool-sized batches
+        and the rest are skipped once it returns True for the text so far.
+        """
+        numbers = list(page_numbers)[:OCR_MAX_PAGES]
+        if self.fitz_doc is None or not numbers:
+            return {}
+
+        ladder = [dpi] if dpi else sorted({min(OCR_FAST_DPI, OCR_DPI), OCR_DPI})
+        batch = max(1, ocr.OCR_WORKERS) if stop_when else len(numbers)
+        results: Dict[int, OcrResult] = {}
+        for start in range(0, len(numbers), batch):
+            results.update(self._ocr_progressive(numbers[start:start + batch], lang, ladder))
+            done = start + batch
+            if stop_when and done < len(numbers) and stop_when("".join(results[n].text for n in sorted(results))):
+                logger.info(f"OCR stopped early after {done}/{len(numbers)} pages")
+                OCR_EARLY_STOPS.inc()
+                break
+        return {n: r.text for n, r in results.items()}
+
+    def _ocr_progressive(self, numbers: List[int], lang: str, ladder: List[int]) -> Dict[int, OcrResult]:
+        """OCR pages up the DPI ladder, keeping each page's most confident read"""
+        doc = self.fitz_doc
+        best: Dict[int, OcrResult] = {}
+        pending = numbers
+        for step, dpi in enumerate(ladder):
+            if step:
+                logger.info(f"Re-rendering {len(pending)} low-confidence page(s) at {dpi} DPI")
+                OCR_RETRIES.inc(amount=len(pending))
+            rendered = (render_page(doc[n], dpi) for n in pending)
+            for n, result in zip(pending, ocr_images(rendered, lang=lang, max_pages=len(pending))):
+                if n not in best or result.confidence > best[n].confidence:
+                    best[n] = result
+            pending = [n for n in pending if best[n].confidence < OCR_MIN_CONFIDENCE]
+            if not pending:
+                break
+        return best
+
+    @staticmethod
+    def merge_pages(page_texts: List[str], ocr_texts: Dict[int, str]) -> str:
+        """Join per-page text, substituting OCR output where it recovered more"""
+        merged = []
+        for page_num, page_text in enumerate(page_texts):
+            page_text = page_text or ""
+            ocr_text = ocr_texts.get(page_num, "")
+            merged.append(ocr_text if len(ocr_text.strip()) > len(page_text.strip()) else page_text)
+        return "".join(t + "\n" for t in merged if t)
+
+    def close(self):
+        """Release all parsed handles"""
+        if self._fitz_doc is not None:
+            try:
+                self._fitz_doc.close()
+            except Exception:
+                pass
+            self._fitz_doc = None
+        if self._plumber_pdf is not None:
+            try:
+                self._plumber_pdf.close()
+            except Exception:
+                pass
+            self._plumber_pdf = None
+        self._pypdf_reader = None
+        self._profiles = None
@@ -0,0 +1,202 @@
+"""
+Resume analysis pipeline
+The stages behind /upload-resume as plain module-level functions, so they
+can run in worker processes as well as inline
+"""
+
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import lazy_imports
+import ocr
+import pdf_session
+import src.helper
+from resume_parser_enhanced import ResumeParser
+from database import ResumeData
+from courses import get_courses_by_field, get_personalized_courses
+from src.helper import extract_text_from_pdf
+from metrics import STAGE_SECONDS, timed
+
+logger = logging.getLogger("resume_analyzer")
+
+
+class _BytesUpload:
+    """Adapts already-read upload bytes to the file-like API the helpers expect"""
+    def __init__(self, b: bytes):
+        self._b = b
+    def read(self):
+        return self._b
+
+
+def extract_resume(file_path: str, data: Optional[bytes] = None) -> Dict:
+    """Extract the raw text and page count of a resume PDF"""
+    parser = ResumeParser(file_path, data=data)
+    with parser._document():
+        text = parser.extract_text()
+        if not text or len(text.strip()) < 20:
+            raise ValueError("Could not extract text from PDF")
+        pages = parser.count_pdf_pages()
+    return {'text': text, 'pages': pages}
+
+
+def parse_resume_text(text: str, pages: int) -> Dict:
+    """Structured fields (name, contact, skills, ...) from extracted text"""
+    return ResumeParser("").parse_text(text, pages)
+
+
+def parse_resume(file_path: str, data: Optional[bytes] = None) -> Dict:
+    """Extract text and structured data from a resume PDF"""
+    extracted = extract_resume(file_path, data)
+    return {'text': extracted['text'], 'data': parse_resume_text(extracted['text'], extracted['pages'])}
+
+
+def extract_resume_text(data: bytes) -> str:
+    """Plain text of an uploaded PDF for the job matcher"""
+    return extract_text_from_pdf(_BytesUpload(data))
+
+
+# Enough text for extract_resume's minimum, with a few skills for the matcher
+_WARMUP_TEXT = "Jane Doe\njane@example.com\nSkills: Python, SQL, Docker, React"
+
+
+def warm_up(check_ocr: bool = True) -> Dict:
+    """Load the deferred PDF/OCR imports and run one tiny resume through the
+    pipeline, so the first real request does not pay for it. ``check_ocr``
+    also starts and probes this process's OCR engine."""
+    start = time.perf_counter()
+    loaded = lazy_imports.load([
+        pdf_session.fitz, pdf_session.pdfplumber, pdf_session.PyPDF2,
+        ocr.Image, ocr.pytesseract, src.helper.requests,
+    ])
+    if pdf_session.HAS_PYMUPDF:
+        doc = pdf_session.fitz.open()
+        doc.new_page().insert_text((72, 72), _WARMUP_TEXT)
+        data = doc.tobytes()
+        doc.close()
+        extracted = extract_resume("", data)
+        analyze_resume_data(parse_resume_text(extracted['text'], extracted['pages']), "warmup.pdf")
+        extract_resume_text(data)
+    status = {"modules": loaded}
+    if check_ocr:
+        status["ocr"] = ocr.health_check()
+    status["seconds"] = round(time.perf_counter() - start, 3)
+    return status
+
+
+def _is_valid_email(email: str) -> bool:
+    if not email or not isinstance(email, str):
+        return False
+    return re.match(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$", email) is not None
+
+
+def _is_valid_phone(phone: str) -> bool:
+    if not phone or not isinstance(phone, str):
+        return False
+    digits = "".join(ch for ch in phone if ch.isdigit())
+    # Consider valid if 10-14 digits
+    return 10 <= len(digits) <= 14
+
+
+def _is_valid_name(name: str) -> bool:
+    if not name or not isinstance(name, str):
+        return False
+    if name.strip().lower() in {"unknown", "professional", "n/a"}:
+        return False
+    if any(ch.isdigit() for ch in name):
+        return False
+    # Must contain letters and at least one space or be 3+ letters
+    letters = re.sub(r"[^A-Za-z\s]", "", name).strip()
+    return bool(letters) and (" " in letters or len(letters) >= 3)
+
+
+@timed(STAGE_SECONDS, "score")
+def score_resume(resume_data: Dict) -> Tuple[Dict, int]:
+    """Field/level analysis and resume score"""
+    parser = ResumeParser("")
+
+    # Analyze skills and recommend field
+    try:
+        analysis = parser.analyze_skills(resume_data['skills'])
+        logger.info(f"Skills analysis complete: {analysis['field']}")
+    except Exception as analysis_err:
+        logger.exception("Failed to analyze skills")
+        analysis = {'field': 'General IT', 'level': 'Intermediate', 'recommended_skills': []}
+
+    # Calculate resume score
+    try:
+        score = parser.calculate_score(resume_data, analysis)
+    except Exception as score_err:
+        logger.exception("Failed to calculate score")
+        score = 50
+
+    return analysis, score
+
+
+@timed(STAGE_SECONDS, "courses")
+def recommend_courses(resume_data: Dict, analysis: Dict) -> List[Dict]:
+    """Personalized course recommendations based on missing skills"""
+    try:
+        courses = get_personalized_courses(
+            user_skills=resume_data.get('skills', []),
+            field=analysis['field'],
+            recommended_skills=analysis.get('recommended_skills', []),
+            max_courses=8
+        )
+        logger.info(f"Generated {len(courses)} personalized course recommendations")
+    except Exception as course_err:
+        logger.exception("Failed to get personalized courses, falling back to field courses")
+        courses = get_courses_by_field(analysis['field'])
+    return courses
+
+
+def build_response(resume_data: Dict, analysis: Dict, score: int, courses: List[Dict], filename: str) -> Dict:
+    """API response payload for an analysed resume"""
+    validations = {
+        "name": _is_valid_name(resume_data.get('name')),
+        "email": _is_valid_email(resume_data.get('email')),
+        "phone": _is_valid_phone(resume_data.get('phone')),
+    }
+
+    return {
+        "name": resume_data.get('name', 'Unknown'),
+        "email": resume_data.get('email', 'N/A'),
+        "phone": resume_data.get('phone', 'N/A'),
+        "pages": resume_data.get('pages', 1),
+        "skills": resume_data.get('skills', []),
+        "experience": resume_data.get('experience', 'Fresher'),
+        "education": resume_data.get('education', []),
+        "score": score,
+        "level": analysis.get('level', 'Fresher'),
+        "field": analysis.get('field', 'General IT'),
+        "recommended_skills": analysis.get('recommended_skills', []),
+        "courses": courses[:8] if courses else [],  # Up to 8 personalized courses
+        "filename": filename,
+        "validations": validations,
+    }
+
+
+def analyze_resume_data(resume_data: Dict, filename: str) -> Tuple[Dict, List[Dict]]:
+    """Field/level analysis, score and course recommendations for parsed
+    resume data. Returns the API response payload and the course list."""
+    analysis, score = score_resume(resume_data)
+    courses = recommend_courses(resume_data, analysis)
+    return build_response(resume_data, analysis, score, courses, filename), courses
+
+
+def build_resume_record(response_data: Dict, courses: List[Dict]) -> ResumeData:
+    """Database row for an analysed resume"""
+    return ResumeData(
+        name=response_data['name'],
+        email=response_data['email'],
+        resume_score=response_data['score'],
+        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        page_no=response_data['pages'],
+        predicted_field=response_data['field'],
+        user_level=response_data['level'],
+        actual_skills=", ".join(response_data['skills']) if response_data['skills'] else "",
+        recommended_skills=", ".join(response_data['recommended_skills']) if response_data['recommended_skills'] else "",
+        recommended_courses=", ".join([c['name'] for c in courses[:5]]) if courses else ""
+    )
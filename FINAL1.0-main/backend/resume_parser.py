@@ -5,6 +5,10 @@ import logging
 from PIL import Image
 import io
 
+from ocr import HAS_TESSERACT as HAS_OCR
+from pdf_session import PdfSession
+from skill_matcher import SkillMatcher
+
 logger = logging.getLogger(__name__)
 
 # Try to import multiple PDF libraries
@@ -22,14 +26,160 @@ except ImportError:
     HAS_PDFPLUMBER = False
     logger.warning("pdfplumber not available")
 
-try:
-    import pytesseract
-    from pdf2image import convert_from_path
-    HAS_OCR = True
-except ImportError:
-    HAS_OCR = False
+if not HAS_OCR:
     logger.warning("OCR not available")
 
+# Expanded skill dictionary with more variations (aliases are literal strings)
+ALL_SKILLS = {
+    # Programming Languages
+    'Python': ['python', 'python3', 'python2', 'py'],
+    'JavaScript': ['javascript', 'js', 'ecmascript', 'es6', 'es5'],
+    'TypeScript': ['typescript', 'ts'],
+    'Java': ['java', 'java8', 'java11', 'java17'],
+    'C++': ['c++', 'cpp', 'cplusplus', 'c plus plus'],
+    'C#': ['c#', 'csharp', 'c sharp', 'c-sharp'],
+    'C': ['\\bc\\b', 'c language', 'ansi c'],
+    'PHP': ['php', 'php7', 'php8'],
+    'Ruby': ['ruby', 'ruby on rails', 'ror'],
+    'Go': ['golang', '\\bgo\\b', 'go lang'],
+    'Rust': ['rust', 'rust lang'],
+    'Swift': ['swift', 'swift ui', 'swiftui'],
+    'Kotlin': ['kotlin'],
+    'R': ['\\br\\b', 'r programming', 'r language'],
+    'Scala': ['scala'],
+    'Perl': ['perl'],
+    'Shell': ['shell', 'bash', 'shell script', 'bash script'],
+    
+    # Web Technologies
+    'HTML': ['html', 'html5', 'html 5'],
+    'CSS': ['\\bcss\\b', 'css3', 'css 3'],
+    'SCSS': ['scss', 'sass'],
+    'Bootstrap': ['bootstrap', 'bootstrap4', 'bootstrap5'],
+    'Tailwind': ['tailwind', 'tailwind css', 'tailwindcss'],
+    'jQuery': ['jquery', 'jquery ui'],
+    
+    # Frontend Frameworks
+    'React': ['react', 'reactjs', 'react.js', 'react js'],
+    'Angular': ['angular', 'angularjs', 'angular2'],
+    'Vue': ['vue', 'vuejs', 'vue.js', 'vue js'],
+    'Next.js': ['next.js', 'nextjs', 'next js', 'next'],
+    'Nuxt': ['nuxt', 'nuxtjs'],
+    'Svelte': ['svelte'],
+    
+    # Backend Frameworks
+    'Node.js': ['node.js', 'nodejs', 'node js', 'node'],
+    'Express': ['express', 'expressjs', 'express.js'],
+    'Django': ['django', 'django rest'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi', 'fast api'],
+    'Spring': ['spring', 'spring boot', 'springboot'],
+    'ASP.NET': ['asp.net', 'asp net', '.net', 'dotnet'],
+    'Laravel': ['laravel'],
+    'Rails': ['rails', 'ruby on rails'],
+    
+    # Databases
+    'SQL': ['\\bsql\\b', 'sql server'],
+    'MySQL': ['mysql'],
+    'PostgreSQL': ['postgresql', 'postgres', 'psql'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'Firebase': ['firebase'],
+    'Redis': ['redis'],
+    'Elasticsearch': ['elasticsearch', 'elastic'],
+    'Oracle': ['oracle', 'oracle db'],
+    'SQLite': ['sqlite'],
+    'Cassandra': ['cassandra'],
+    'DynamoDB': ['dynamodb'],
+    
+    # Cloud & DevOps
+    'Docker': ['docker', 'dockerfile'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'AWS': ['aws', 'amazon web services'],
+    'Azure': ['azure', 'microsoft azure'],
+    'GCP': ['gcp', 'google cloud', 'google cloud platform'],
+    'CI/CD': ['ci/cd', 'cicd', 'continuous integration', 'continuous deployment'],
+    'Jenkins': ['jenkins'],
+    'GitLab CI': ['gitlab ci', 'gitlab'],
+    'GitHub Actions': ['github actions'],
+    'Terraform': ['terraform'],
+    'Ansible': ['ansible'],
+    
+    # Version Control
+    'Git': ['git', 'github', 'gitlab', 'bitbucket'],
+    'SVN': ['svn', 'subversion'],
+    
+    # Mobile Development
+    'iOS': ['ios', 'ios development'],
+    'Android': ['android', 'android development'],
+    'Flutter': ['flutter'],
+    'React Native': ['react native', 'react-native', 'reactnative'],
+    'Xamarin': ['xamarin'],
+    
+    # Data Science & ML
+    'Machine Learning': ['machine learning', 'ml', 'ml engineering'],
+    'Deep Learning': ['deep learning', 'dl'],
+    'TensorFlow': ['tensorflow', 'tf'],
+    'PyTorch': ['pytorch'],
+    'Keras': ['keras'],
+    'Pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'Scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
+    'Data Analysis': ['data analysis', 'data analytics'],
+    'Data Science': ['data science'],
+    'Computer Vision': ['computer vision', 'cv', 'opencv'],
+    'NLP': ['nlp', 'natural language processing'],
+    'Matplotlib': ['matplotlib'],
+    'Seaborn': ['seaborn'],
+    'Tableau': ['tableau'],
+    'Power BI': ['power bi', 'powerbi'],
+    
+    # Testing
+    'Testing': ['testing', 'test automation', 'unit testing', 'qa'],
+    'Jest': ['jest'],
+    'Pytest': ['pytest'],
+    'Selenium': ['selenium', 'selenium webdriver'],
+    'Cypress': ['cypress'],
+    'JUnit': ['junit'],
+    'Mocha': ['mocha'],
+    'Chai': ['chai'],
+    
+    # Design
+    'Figma': ['figma'],
+    'Adobe XD': ['adobe xd', 'xd'],
+    'Sketch': ['sketch'],
+    'Photoshop': ['photoshop', 'adobe photoshop'],
+    'Illustrator': ['illustrator', 'adobe illustrator'],
+    'UI/UX': ['ui/ux', 'ui', 'ux', 'user interface', 'user experience'],
+    
+    # Methodologies
+    'Agile': ['agile', 'agile methodology'],
+    'Scrum': ['scrum', 'scrum master'],
+    'Kanban': ['kanban'],
+    'Jira': ['jira'],
+    'Waterfall': ['waterfall'],
+    
+    # Other Technologies
+    'REST API': ['rest api', 'restful', 'rest', 'rest apis'],
+    'GraphQL': ['graphql'],
+    'API': ['api', 'apis', 'api development'],
+    'Microservices': ['microservices', 'micro services'],
+    'Webpack': ['webpack'],
+    'Babel': ['babel'],
+    'Redux': ['redux', 'redux toolkit'],
+    'Vuex': ['vuex'],
+    'Linux': ['linux', 'unix'],
+    'Windows': ['windows'],
+    'macOS': ['macos', 'mac os'],
+    'Nginx': ['nginx'],
+    'Apache': ['apache'],
+    'OOP': ['oop', 'object oriented', 'object-oriented'],
+    'Design Patterns': ['design patterns'],
+    'System Design': ['system design'],
+    'Data Structures': ['data structures', 'algorithms'],
+    'Problem Solving': ['problem solving', 'problem-solving'],
+}
+
+_SKILL_MATCHER = SkillMatcher(ALL_SKILLS, literal=True)
+
 class ResumeParser:
     def __init__(self, file_path: str):
         self.file_path = file_path
@@ -136,38 +286,10 @@ class ResumeParser:
     def extract_text_with_ocr(self) -> str:
         """Extract text from image-based PDF using OCR"""
         try:
-            # Method 1: Use PyMuPDF to extract images and OCR them
-            if HAS_PYMUPDF:
-                doc = fitz.open(self.file_path)
-                text = ""
-                
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    
-                    # Get page as image
-                    pix = page.get_pixmap(dpi=300)  # High DPI for better OCR
-                    img_data = pix.tobytes("png")
-                    img = Image.open(io.BytesIO(img_data))
-                    
-                    # Run OCR
-                    page_text = pytesseract.image_to_string(img, lang='eng')
-                    text += page_text + "\n"
-                    logger.info(f"OCR page {page_num + 1}: {len(page_text)} chars")
-                
-                doc.close()
-                return text
-            
-            # Method 2: Use pdf2image
-            logger.info("Using pdf2image for OCR...")
-            images = convert_from_path(self.file_path, dpi=300, first_page=1, last_page=5)
-            text = ""
-            
-            for i, image in enumerate(images):
-                page_text = pytesseract.image_to_string(image, lang='eng')
-                text += page_text + "\n"
-                logger.info(f"OCR page {i + 1}: {len(page_text)} chars")
-            
-            return text
+            # Pages are rasterized in-process and OCR'd on the shared pool
+            with PdfSession(self.file_path) as session:
+                ocr_texts = session.ocr_pages(range(len(session.fitz_doc)), lang='eng')
+            return "".join(ocr_texts[i] + "\n" for i in sorted(ocr_texts))
             
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}")
@@ -306,173 +428,10 @@ class ResumeParser:
         """Extract skills from text - COMPREHENSIVE SKILL DETECTION"""
         text_lower = text.lower()
         
-        # Expanded skill dictionary with more variations
-        all_skills = {
-            # Programming Languages
-            'Python': ['python', 'python3', 'python2', 'py'],
-            'JavaScript': ['javascript', 'js', 'ecmascript', 'es6', 'es5'],
-            'TypeScript': ['typescript', 'ts'],
-            'Java': ['java', 'java8', 'java11', 'java17'],
-            'C++': ['c++', 'cpp', 'cplusplus', 'c plus plus'],
-            'C#': ['c#', 'csharp', 'c sharp', 'c-sharp'],
-            'C': ['\\bc\\b', 'c language', 'ansi c'],
-            'PHP': ['php', 'php7', 'php8'],
-            'Ruby': ['ruby', 'ruby on rails', 'ror'],
-            'Go': ['golang', '\\bgo\\b', 'go lang'],
-            'Rust': ['rust', 'rust lang'],
-            'Swift': ['swift', 'swift ui', 'swiftui'],
-            'Kotlin': ['kotlin'],
-            'R': ['\\br\\b', 'r programming', 'r language'],
-            'Scala': ['scala'],
-            'Perl': ['perl'],
-            'Shell': ['shell', 'bash', 'shell script', 'bash script'],
-            
-            # Web Technologies
-            'HTML': ['html', 'html5', 'html 5'],
-            'CSS': ['\\bcss\\b', 'css3', 'css 3'],
-            'SCSS': ['scss', 'sass'],
-            'Bootstrap': ['bootstrap', 'bootstrap4', 'bootstrap5'],
-            'Tailwind': ['tailwind', 'tailwind css', 'tailwindcss'],
-            'jQuery': ['jquery', 'jquery ui'],
-            
-            # Frontend Frameworks
-            'React': ['react', 'reactjs', 'react.js', 'react js'],
-            'Angular': ['angular', 'angularjs', 'angular2'],
-            'Vue': ['vue', 'vuejs', 'vue.js', 'vue js'],
-            'Next.js': ['next.js', 'nextjs', 'next js', 'next'],
-            'Nuxt': ['nuxt', 'nuxtjs'],
-            'Svelte': ['svelte'],
-            
-            # Backend Frameworks
-            'Node.js': ['node.js', 'nodejs', 'node js', 'node'],
-            'Express': ['express', 'expressjs', 'express.js'],
-            'Django': ['django', 'django rest'],
-            'Flask': ['flask'],
-            'FastAPI': ['fastapi', 'fast api'],
-            'Spring': ['spring', 'spring boot', 'springboot'],
-            'ASP.NET': ['asp.net', 'asp net', '.net', 'dotnet'],
-            'Laravel': ['laravel'],
-            'Rails': ['rails', 'ruby on rails'],
-            
-            # Databases
-            'SQL': ['\\bsql\\b', 'sql server'],
-            'MySQL': ['mysql'],
-            'PostgreSQL': ['postgresql', 'postgres', 'psql'],
-            'MongoDB': ['mongodb', 'mongo'],
-            'Firebase': ['firebase'],
-            'Redis': ['redis'],
-            'Elasticsearch': ['elasticsearch', 'elastic'],
-            'Oracle': ['oracle', 'oracle db'],
-            'SQLite': ['sqlite'],
-            'Cassandra': ['cassandra'],
-            'DynamoDB': ['dynamodb'],
-            
-            # Cloud & DevOps
-            'Docker': ['docker', 'dockerfile'],
-            'Kubernetes': ['kubernetes', 'k8s'],
-            'AWS': ['aws', 'amazon web services'],
-            'Azure': ['azure', 'microsoft azure'],
-            'GCP': ['gcp', 'google cloud', 'google cloud platform'],
-            'CI/CD': ['ci/cd', 'cicd', 'continuous integration', 'continuous deployment'],
-            'Jenkins': ['jenkins'],
-            'GitLab CI': ['gitlab ci', 'gitlab'],
-            'GitHub Actions': ['github actions'],
-            'Terraform': ['terraform'],
-            'Ansible': ['ansible'],
-            
-            # Version Control
-            'Git': ['git', 'github', 'gitlab', 'bitbucket'],
-            'SVN': ['svn', 'subversion'],
-            
-            # Mobile Development
-            'iOS': ['ios', 'ios development'],
-            'Android': ['android', 'android development'],
-            'Flutter': ['flutter'],
-            'React Native': ['react native', 'react-native', 'reactnative'],
-            'Xamarin': ['xamarin'],
-            
-            # Data Science & ML
-            'Machine Learning': ['machine learning', 'ml', 'ml engineering'],
-            'Deep Learning': ['deep learning', 'dl'],
-            'TensorFlow': ['tensorflow', 'tf'],
-            'PyTorch': ['pytorch'],
-            'Keras': ['keras'],
-            'Pandas': ['pandas'],
-            'NumPy': ['numpy'],
-            'Scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
-            'Data Analysis': ['data analysis', 'data analytics'],
-            'Data Science': ['data science'],
-            'Computer Vision': ['computer vision', 'cv', 'opencv'],
-            'NLP': ['nlp', 'natural language processing'],
-            'Matplotlib': ['matplotlib'],
-            'Seaborn': ['seaborn'],
-            'Tableau': ['tableau'],
-            'Power BI': ['power bi', 'powerbi'],
-            
-            # Testing
-            'Testing': ['testing', 'test automation', 'unit testing', 'qa'],
-            'Jest': ['jest'],
-            'Pytest': ['pytest'],
-            'Selenium': ['selenium', 'selenium webdriver'],
-            'Cypress': ['cypress'],
-            'JUnit': ['junit'],
-            'Mocha': ['mocha'],
-            'Chai': ['chai'],
-            
-            # Design
-            'Figma': ['figma'],
-            'Adobe XD': ['adobe xd', 'xd'],
-            'Sketch': ['sketch'],
-            'Photoshop': ['photoshop', 'adobe photoshop'],
-            'Illustrator': ['illustrator', 'adobe illustrator'],
-            'UI/UX': ['ui/ux', 'ui', 'ux', 'user interface', 'user experience'],
-            
-            # Methodologies
-            'Agile': ['agile', 'agile methodology'],
-            'Scrum': ['scrum', 'scrum master'],
-            'Kanban': ['kanban'],
-            'Jira': ['jira'],
-            'Waterfall': ['waterfall'],
-            
-            # Other Technologies
-            'REST API': ['rest api', 'restful', 'rest', 'rest apis'],
-            'GraphQL': ['graphql'],
-            'API': ['api', 'apis', 'api development'],
-            'Microservices': ['microservices', 'micro services'],
-            'Webpack': ['webpack'],
-            'Babel': ['babel'],
-            'Redux': ['redux', 'redux toolkit'],
-            'Vuex': ['vuex'],
-            'Linux': ['linux', 'unix'],
-            'Windows': ['windows'],
-            'macOS': ['macos', 'mac os'],
-            'Nginx': ['nginx'],
-            'Apache': ['apache'],
-            'OOP': ['oop', 'object oriented', 'object-oriented'],
-            'Design Patterns': ['design patterns'],
-            'System Design': ['system design'],
-            'Data Structures': ['data structures', 'algorithms'],
-            'Problem Solving': ['problem solving', 'problem-solving'],
-        }
-        
-        found_skills = []
-        
-        for skill_name, patterns in all_skills.items():
-            for pattern in patterns:
-                try:
-                    # Use word boundary for better matching
-                    if re.search(r'\b' + re.escape(pattern) + r'\b', text_lower):
-                        if skill_name not in found_skills:
-                            found_skills.append(skill_name)
-                        break
-                except:
-                    # Fallback to simple search if regex fails
-                    if pattern in text_lower:
-                        if skill_name not in found_skills:
-                            found_skills.append(skill_name)
-                        break
+        # One pass over the text for every alias of every skill
+        found_skills = _SKILL_MATCHER.find(text_lower)
         
-        logger.info(f"Found {len(found_skills)} skills: {found_skills}")
+        logger.info(f"Found {len(found_skills)} skills")
         return found_skills
     
     def get_page_count(self) -> int:
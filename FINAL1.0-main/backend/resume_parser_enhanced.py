@@ -3,72 +3,127 @@ Enhanced Resume Parser with OCR support
 Handles PDF text extraction using multiple methods including OCR
 """
 
-import PyPDF2
 import re
 from typing import Dict, List, Optional, Tuple
 import logging
 from pathlib import Path
+from contextlib import contextmanager
+import hashlib
 import json
+import os
+
+from ocr import HAS_TESSERACT as HAS_OCR
+from pdf_session import HAS_PDFPLUMBER, HAS_PYMUPDF, PdfSession
+from skill_matcher import SkillMatcher
+from metrics import EXTRACTION_BACKEND, STAGE_SECONDS, timed
+from extraction_router import EXTRACTION_MIN_QUALITY, router as extraction_router, score_text
 
-# PDF and Image processing
-try:
-    import fitz
-    HAS_PYMUPDF = True
-except ImportError:
-    HAS_PYMUPDF = False
-    
-try:
-    import pdfplumber
-    HAS_PDFPLUMBER = True
-except ImportError:
-    HAS_PDFPLUMBER = False
 
-try:
-    import pytesseract
-    from pdf2image import convert_from_path
-    HAS_OCR = True
-except ImportError:
-    HAS_OCR = False
+logger = logging.getLogger(__name__)
 
-try:
-    from PIL import Image
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
+# Comprehensive skill list (aliases are regex fragments)
+SKILLS = {
+    'Python': ['python', 'py', 'python3'],
+    'JavaScript': ['javascript', 'js', 'es6', 'node.js', 'nodejs'],
+    'TypeScript': ['typescript', 'ts'],
+    'Java': ['java', 'j2ee', 'java8', 'jdk'],
+    'C++': ['c\\+\\+', 'cpp', 'c plus plus'],
+    'C#': ['c#', 'csharp'],
+    'React': ['react', 'reactjs', 'react.js', 'jsx'],
+    'Angular': ['angular', 'angularjs'],
+    'Vue': ['vue', 'vuejs'],
+    'Next.js': ['next.js', 'nextjs'],
+    # Add loose 'node' so formats like 'REACT.NODE.MONGO.' are caught
+    'Node.js': ['node.js', 'nodejs', 'node', 'npm', 'mern'],
+    'Django': ['django', 'django rest'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi'],
+    'Spring': ['spring', 'spring boot'],
+    'SQL': ['sql', 'mysql', 'postgresql', 'oracle'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'PostgreSQL': ['postgresql', 'postgres', 'psql'],
+    'Docker': ['docker'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'AWS': ['aws', 'amazon web services'],
+    'Azure': ['azure'],
+    'GCP': ['gcp', 'google cloud'],
+    'Git': ['git', 'github', 'gitlab'],
+    'Machine Learning': ['machine learning', 'ml', 'tensorflow', 'pytorch', 'keras'],
+    'Data Science': ['data science', 'pandas', 'numpy', 'scipy'],
+    'REST API': ['rest', 'restful', 'api', 'graphql'],
+    'HTML': ['html', 'html5'],
+    'CSS': ['css', 'css3', 'scss'],
+    'Tableau': ['tableau'],
+    'Power BI': ['power bi', 'powerbi'],
+    'Agile': ['agile', 'scrum', 'kanban'],
+    'Linux': ['linux', 'ubuntu', 'centos'],
+    'Windows': ['windows'],
+    'iOS': ['ios', 'swift'],
+    'Android': ['android', 'kotlin'],
+}
 
-import io
+_SKILL_MATCHER = SkillMatcher(SKILLS, literal=False)
+
+# Bump PARSER_VERSION when extraction/parsing output changes; cached results
+# keyed on an older version (or an edited taxonomy) are ignored
+PARSER_VERSION = "4"
+# OCR of long scans stops once contact details and this many skills are found (0 disables)
+OCR_STOP_MIN_SKILLS = int(os.getenv("OCR_STOP_MIN_SKILLS", "5"))
+
+TAXONOMY_VERSION = hashlib.sha1(json.dumps(SKILLS, sort_keys=True).encode()).hexdigest()[:12]
 
-logger = logging.getLogger(__name__)
 
 class ResumeParserEnhanced:
     """Enhanced resume parser with OCR and multi-method text extraction"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, data: Optional[bytes] = None):
         self.file_path = file_path
+        self.data = data  # uploaded bytes, if the caller already has them in memory
         self.text = None
         self.metadata = {}
+        self.session: Optional[PdfSession] = None
+
+    @contextmanager
+    def _document(self):
+        """Reuse the active PDF session, or open one for the duration of the call"""
+        if self.session is not None:
+            yield self.session
+            return
+        with PdfSession(self.data if self.data is not None else self.file_path) as session:
+            self.session = session
+            try:
+                yield session
+            finally:
+                self.session = None
         
     def extract_data(self) -> Dict:
         """Extract all resume data"""
         logger.info(f"Extracting data from: {self.file_path}")
         
-        # Extract text
-        self.text = self.extract_text()
-        if not self.text or len(self.text.strip()) < 20:
-            raise ValueError("Could not extract text from PDF")
-        
-        logger.info(f"✅ Extracted {len(self.text)} characters from PDF")
+        # One session per analysis: the file is read and parsed once per backend
+        with self._document():
+            # Extract text
+            self.text = self.extract_text()
+            if not self.text or len(self.text.strip()) < 20:
+                raise ValueError("Could not extract text from PDF")
+            
+            logger.info(f"✅ Extracted {len(self.text)} characters from PDF")
+            pages = self.count_pdf_pages()
         
-        # Parse structured data
+        return self.parse_text(self.text, pages)
+    
+    def parse_text(self, text: str, pages: int = 1) -> Dict:
+        """Parse structured data out of already extracted resume text"""
+        self.text = text
         data = {
-            'name': self.extract_name(self.text),
-            'email': self.extract_email(self.text),
-            'phone': self.extract_phone(self.text),
-            'skills': self.extract_skills(self.text),
-            'education': self.extract_education(self.text),
-            'experience': self.extract_experience_level(self.text),
-            'pages': self.count_pdf_pages(),
-            'text': self.text[:2000]  # First 2000 chars for analysis
+            'name': self.extract_name(text),
+            'email': self.extract_email(text),
+            'phone': self.extract_phone(text),
+            'skills': self.extract_skills(text),
+            'education': self.extract_education(text),
+            'experience': self.extract_experience_level(text),
+            'pages': pages,
+            'text': text[:2000]  # First 2000 chars for analysis
         }
         
         logger.info(f"Extracted data: Name={data['name']}, Email={data['email']}, Skills count={len(data['skills'])}")
@@ -76,130 +131,121 @@ class ResumeParserEnhanced:
     
     def count_pdf_pages(self) -> int:
         """Count pages in PDF"""
-        try:
-            if HAS_PYMUPDF:
-                doc = fitz.open(self.file_path)
-                pages = len(doc)
-                doc.close()
-                return pages
-        except Exception as e:
-            logger.warning(f"Could not count pages: {e}")
-        
-        try:
-            with open(self.file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                return len(reader.pages)
-        except Exception as e:
-            logger.warning(f"PyPDF2 page count failed: {e}")
-        
-        return 1
+        with self._document() as session:
+            return session.page_count() or 1
     
+    @timed(STAGE_SECONDS, "extract_text")
     def extract_text(self) -> str:
         """Extract text from PDF with multiple fallback methods"""
+        with self._document() as session:
+            return self._extract_text(session)
+
+    def _extract_text(self, session: PdfSession) -> str:
+        # Classify pages first: image-only pages are OCR'd, the rest keep their text layer
+        ocr_texts: Dict[int, str] = {}
+        profiles = []
+        if HAS_PYMUPDF:
+            try:
+                profiles = session.page_profiles()
+                image_pages = [p.number for p in profiles if p.needs_ocr]
+                if image_pages and HAS_OCR:
+                    logger.info(f"OCR needed for {len(image_pages)}/{len(profiles)} image-only pages")
+                    native_text = "".join(p.text for p in profiles if not p.needs_ocr)
+                    ocr_texts = session.ocr_pages(
+                        image_pages, stop_when=lambda ocr_text: self._found_key_fields(native_text + ocr_text))
+            except Exception as e:
+                logger.warning(f"Page classification failed: {e}")
+        
         text = ""
+        producer = session.producer if profiles else None
+        candidates = []  # (quality, backend, text)
+        
+        # Method 1: PyMuPDF (fast path), already read while classifying pages
+        if profiles:
+            text = session.merge_pages([p.text for p in profiles], ocr_texts)
+            quality = score_text(text, len(profiles))
+            logger.info(f"PyMuPDF: {len(text)} chars, quality {quality.score}")
+            if quality.score >= EXTRACTION_MIN_QUALITY and extraction_router.route(producer) == "pymupdf":
+                logger.info(f"✅ PyMuPDF: {len(text)} chars extracted")
+                extraction_router.record(producer, "pymupdf")
+                EXTRACTION_BACKEND.inc("pymupdf")
+                return text
+            candidates.append((quality.score, "pymupdf", text))
         
-        # Method 1: pdfplumber (best for structured content)
+        # Method 2: pdfplumber layout analysis, only when the fast path scored poorly
+        # (or this producer's documents usually read better with it)
         if HAS_PDFPLUMBER:
             try:
-                logger.info("Trying pdfplumber extraction...")
-                with pdfplumber.open(self.file_path) as pdf:
-                    for i, page in enumerate(pdf.pages):
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                            logger.info(f"pdfplumber page {i+1}: {len(page_text)} chars")
-                
-                if len(text.strip()) > 100:
-                    logger.info(f"✅ pdfplumber: {len(text)} chars extracted")
-                    return text
+                logger.info("Escalating to pdfplumber extraction...")
+                pdf = session.plumber_pdf
+                page_texts = []
+                for i, page in enumerate(pdf.pages):
+                    page_text = page.extract_text() or ""
+                    page_texts.append(page_text)
+                    if page_text:
+                        logger.info(f"pdfplumber page {i+1}: {len(page_text)} chars")
+                text = session.merge_pages(page_texts, ocr_texts)
+                quality = score_text(text, len(page_texts))
+                logger.info(f"pdfplumber: {len(text)} chars, quality {quality.score}")
+                # Ties go to pdfplumber's layout-aware text
+                candidates.insert(0, (quality.score, "pdfplumber", text))
             except Exception as e:
                 logger.warning(f"pdfplumber failed: {e}")
                 text = ""
         
-        # Method 2: PyMuPDF (fitz)
-        if HAS_PYMUPDF:
-            try:
-                logger.info("Trying PyMuPDF extraction...")
-                doc = fitz.open(self.file_path)
-                for i in range(len(doc)):
-                    page = doc[i]
-                    page_text = page.get_text("text")
-                    if page_text:
-                        text += page_text + "\n"
-                        logger.info(f"PyMuPDF page {i+1}: {len(page_text)} chars")
-                
-                doc.close()
-                if len(text.strip()) > 100:
-                    logger.info(f"✅ PyMuPDF: {len(text)} chars extracted")
-                    return text
-            except Exception as e:
-                logger.warning(f"PyMuPDF failed: {e}")
-                text = ""
+        if candidates:
+            score, backend, best = max(candidates, key=lambda c: c[0])
+            if len(best.strip()) > 100:
+                logger.info(f"✅ {backend}: {len(best)} chars extracted (quality {score})")
+                if profiles:
+                    extraction_router.record(producer, backend)
+                EXTRACTION_BACKEND.inc(backend)
+                return best
+            text = best
         
         # Method 3: PyPDF2 (fallback)
         try:
             logger.info("Trying PyPDF2 extraction...")
-            with open(self.file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for i, page in enumerate(reader.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                        logger.info(f"PyPDF2 page {i+1}: {len(page_text)} chars")
+            reader = session.pypdf_reader
+            page_texts = []
+            for i, page in enumerate(reader.pages):
+                page_text = page.extract_text() or ""
+                page_texts.append(page_text)
+                if page_text:
+                    logger.info(f"PyPDF2 page {i+1}: {len(page_text)} chars")
+            text = session.merge_pages(page_texts, ocr_texts)
             
             if len(text.strip()) > 100:
                 logger.info(f"✅ PyPDF2: {len(text)} chars extracted")
+                EXTRACTION_BACKEND.inc("pypdf2")
                 return text
         except Exception as e:
             logger.warning(f"PyPDF2 failed: {e}")
         
-        # Method 4: OCR as last resort
-        if len(text.strip()) < 50 and HAS_OCR and HAS_PYMUPDF:
+        # Method 4: OCR every page as last resort (pages with neither text nor images)
+        if len(text.strip()) < 50 and HAS_OCR and not ocr_texts:
             logger.warning("Text extraction failed, attempting OCR...")
+            EXTRACTION_BACKEND.inc("ocr")
             return self.extract_text_ocr()
         
+        EXTRACTION_BACKEND.inc("none" if not text.strip() else "partial")
         return text
     
+    @timed(STAGE_SECONDS, "ocr")
     def extract_text_ocr(self) -> str:
         """Extract text using OCR for image-based PDFs"""
+        with self._document() as session:
+            return self._extract_text_ocr(session)
+
+    def _extract_text_ocr(self, session: PdfSession) -> str:
         try:
             logger.info("🔍 Starting OCR extraction...")
             
-            if HAS_PYMUPDF:
-                doc = fitz.open(self.file_path)
-                text = ""
-                
-                for page_num in range(len(doc)):
-                    try:
-                        page = doc[page_num]
-                        # Convert page to high-resolution image
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2), alpha=False)
-                        img_data = pix.tobytes("png")
-                        img = Image.open(io.BytesIO(img_data))
-                        
-                        # OCR
-                        page_text = pytesseract.image_to_string(img, lang='eng')
-                        text += page_text + "\n"
-                        logger.info(f"OCR page {page_num+1}: {len(page_text)} chars")
-                    except Exception as page_err:
-                        logger.warning(f"OCR page {page_num+1} failed: {page_err}")
-                
-                doc.close()
-                
-                if len(text.strip()) > 50:
-                    logger.info(f"✅ OCR: {len(text)} chars extracted")
-                    return text
-            
-            # Alternative: pdf2image
-            elif HAS_OCR:
-                logger.info("Using pdf2image for OCR...")
-                images = convert_from_path(self.file_path, dpi=300)
-                text = ""
-                
-                for i, image in enumerate(images[:5]):  # Limit to first 5 pages
-                    page_text = pytesseract.image_to_string(image, lang='eng')
-                    text += page_text + "\n"
-                    logger.info(f"OCR page {i+1}: {len(page_text)} chars")
+            if HAS_PYMUPDF and HAS_OCR:
+                # OCR pages in parallel, merged back in page order
+                ocr_texts = session.ocr_pages(range(len(session.fitz_doc)), lang='eng',
+                                              stop_when=self._found_key_fields)
+                text = "".join(ocr_texts[i] + "\n" for i in sorted(ocr_texts))
                 
                 if len(text.strip()) > 50:
                     logger.info(f"✅ OCR: {len(text)} chars extracted")
@@ -210,7 +256,16 @@ class ResumeParserEnhanced:
         
         return ""
     
-    def extract_email(self, text: str) -> Optional[str]:
+    def _found_key_fields(self, text: str) -> bool:
+        """True once OCR text holds an email, a phone number and enough skills"""
+        if OCR_STOP_MIN_SKILLS <= 0:
+            return False
+        # log=False: this runs after every OCR batch and must not echo contact details
+        if not self.extract_email(text, log=False) or not self.extract_phone(text, log=False):
+            return False
+        return len(_SKILL_MATCHER.find(text.lower())) >= OCR_STOP_MIN_SKILLS
+    
+    def extract_email(self, text: str, log: bool = True) -> Optional[str]:
         """Extract email address"""
         text_clean = text.replace('\n', ' ').replace('\r', ' ')
         
@@ -223,13 +278,15 @@ class ResumeParserEnhanced:
             matches = re.findall(pattern, text_clean, re.IGNORECASE)
             if matches:
                 email = matches[0].strip().lower()
-                logger.info(f"Found email: {email}")
+                if log:
+                    logger.info(f"Found email: {email}")
                 return email
         
-        logger.info("No email found")
+        if log:
+            logger.info("No email found")
         return None
     
-    def extract_phone(self, text: str) -> Optional[str]:
+    def extract_phone(self, text: str, log: bool = True) -> Optional[str]:
         """Extract phone number"""
         text_clean = text.replace('\n', ' ').replace('\r', ' ')
         
@@ -244,10 +301,12 @@ class ResumeParserEnhanced:
             matches = re.findall(pattern, text_clean)
             if matches:
                 phone = matches[0].strip()
-                logger.info(f"Found phone: {phone}")
+                if log:
+                    logger.info(f"Found phone: {phone}")
                 return phone
         
-        logger.info("No phone found")
+        if log:
+            logger.info("No phone found")
         return None
     
     def extract_name(self, text: str) -> str:
@@ -356,53 +415,11 @@ class ResumeParserEnhanced:
         else:
             return "Intermediate"
     
+    @timed(STAGE_SECONDS, "skill_match")
     def extract_skills(self, text: str) -> List[str]:
         """Extract technical skills from resume"""
         text_lower = text.lower()
         
-        # Comprehensive skill list
-        skills_dict = {
-            'Python': ['python', 'py', 'python3'],
-            'JavaScript': ['javascript', 'js', 'es6', 'node.js', 'nodejs'],
-            'TypeScript': ['typescript', 'ts'],
-            'Java': ['java', 'j2ee', 'java8', 'jdk'],
-            'C++': ['c\\+\\+', 'cpp', 'c plus plus'],
-            'C#': ['c#', 'csharp'],
-            'React': ['react', 'reactjs', 'react.js', 'jsx'],
-            'Angular': ['angular', 'angularjs'],
-            'Vue': ['vue', 'vuejs'],
-            'Next.js': ['next.js', 'nextjs'],
-            # Add loose 'node' so formats like 'REACT.NODE.MONGO.' are caught
-            'Node.js': ['node.js', 'nodejs', 'node', 'npm', 'mern'],
-            'Django': ['django', 'django rest'],
-            'Flask': ['flask'],
-            'FastAPI': ['fastapi'],
-            'Spring': ['spring', 'spring boot'],
-            'SQL': ['sql', 'mysql', 'postgresql', 'oracle'],
-            'MongoDB': ['mongodb', 'mongo'],
-            'PostgreSQL': ['postgresql', 'postgres', 'psql'],
-            'Docker': ['docker'],
-            'Kubernetes': ['kubernetes', 'k8s'],
-            'AWS': ['aws', 'amazon web services'],
-            'Azure': ['azure'],
-            'GCP': ['gcp', 'google cloud'],
-            'Git': ['git', 'github', 'gitlab'],
-            'Machine Learning': ['machine learning', 'ml', 'tensorflow', 'pytorch', 'keras'],
-            'Data Science': ['data science', 'pandas', 'numpy', 'scipy'],
-            'REST API': ['rest', 'restful', 'api', 'graphql'],
-            'HTML': ['html', 'html5'],
-            'CSS': ['css', 'css3', 'scss'],
-            'Tableau': ['tableau'],
-            'Power BI': ['power bi', 'powerbi'],
-            'Agile': ['agile', 'scrum', 'kanban'],
-            'Linux': ['linux', 'ubuntu', 'centos'],
-            'Windows': ['windows'],
-            'iOS': ['ios', 'swift'],
-            'Android': ['android', 'kotlin'],
-        }
-        
-        found_skills = []
-        
         # Normalize dotted/upper tokens (e.g., "REACT.NODE.MONGO.")
         tokens = re.split(r'[\s,;\|\/]+', text_lower)
         dotted_parts = []
@@ -410,21 +427,10 @@ class ResumeParserEnhanced:
             dotted_parts.extend(tok.split('.'))
         tokens.extend(dotted_parts)
 
-        for skill, patterns in skills_dict.items():
-            for pattern in patterns:
-                boundary_pattern = r'\b' + pattern + r'\b'
-                if re.search(boundary_pattern, text_lower):
-                    found_skills.append(skill)
-                    break
-                # Also check token list to catch odd punctuation-separated skills
-                if pattern in tokens:
-                    found_skills.append(skill)
-                    break
-        
-        # Remove duplicates while preserving order
-        found_skills = list(dict.fromkeys(found_skills))
-        
-        logger.info(f"Found {len(found_skills)} skills: {found_skills}")
+        # Single pass over the text; the token set catches odd punctuation-separated skills
+        found_skills = _SKILL_MATCHER.find(text_lower, tokens=set(tokens))
+        
+        logger.info(f"Found {len(found_skills)} skills")
         return found_skills
     
     def analyze_skills(self, skills: List[str]) -> Dict:
@@ -465,7 +471,7 @@ class ResumeParserEnhanced:
         if 'sql' not in skill_set:
             recommended.append('SQL')
         
-        logger.info(f"Analysis: field={field}, level={level}, recommended={recommended}")
+        logger.info(f"Analysis: field={field}, level={level}, recommended={len(recommended)}")
         
         return {
             'field': field,
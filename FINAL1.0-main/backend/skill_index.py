@@ -0,0 +1,274 @@
+"""
+In-memory bitmap index for candidate search
+Keeps one bitmap of resume ids per skill (per kind, keyed like the SQL
+skills table), per predicted field and per level, plus one bitmap per resume
+score with the scores kept in a sorted array. A skill query is a few bitmap
+ANDs/ORs, and top-K walks the score bitmaps from the best score down, so
+/admin/search only goes to the database to fetch the winning rows.
+
+Bitmaps are pyroaring BitMaps (compressed) when pyroaring is installed, else
+Python ints used as bitsets. The index is loaded from user_data at startup,
+and refresh() before every search reads the rows committed since (by this
+or any other process: other uvicorn workers, batch_analyze.py), so answers
+match the SQL path.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from functools import reduce
+from operator import and_, or_
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from database import (
+    RESUME_PAGE_MAX, SEARCH_LIMIT_DEFAULT, SKILL_DIMENSIONS, Database,
+    _split_skills, parse_skill_query, resolve_skill_keys, skill_key,
+)
+from lazy_imports import lazy_import
+
+logger = logging.getLogger("resume_analyzer")
+
+pyroaring = lazy_import("pyroaring")
+HAS_ROARING = pyroaring is not None
+
+# Rows per user_data query while loading
+SKILL_INDEX_LOAD_CHUNK = 5000
+# Ids are not committed in id order when writers overlap (MySQL, several
+# processes), so ids missing just below the newest indexed one are re-checked
+# by later refreshes: those within this many ids of it, for this many seconds
+# (a rolled-back insert leaves a permanent hole)
+SKILL_INDEX_GAP_WINDOW = 1000
+SKILL_INDEX_GAP_SECONDS = 60.0
+
+
+class IntBitmap:
+    """Bitset over a Python int; the subset of pyroaring.BitMap the index uses"""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "IntBitmap":
+        ids = list(ids)
+        if not ids:
+            return cls()
+        # Setting bits in a bytearray avoids copying the int once per id
+        buf = bytearray(max(ids) // 8 + 1)
+        for i in ids:
+            buf[i >> 3] |= 1 << (i & 7)
+        return cls(int.from_bytes(buf, "little"))
+
+    def add(self, i: int):
+        self.bits |= 1 << i
+
+    def __and__(self, other: "IntBitmap") -> "IntBitmap":
+        return IntBitmap(self.bits & other.bits)
+
+    def __or__(self, other: "IntBitmap") -> "IntBitmap":
+        return IntBitmap(self.bits | other.bits)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def descending(self) -> Iterator[int]:
+        bits = self.bits
+        while bits:
+            top = bits.bit_length() - 1
+            yield top
+            bits ^= 1 << top
+
+
+def new_bitmap(ids: Iterable[int] = ()):
+    """Bitmap of ``ids`` in the available representation"""
+    if HAS_ROARING:
+        return pyroaring.BitMap(sorted(ids))
+    return IntBitmap.from_ids(ids)
+
+
+def _descending(bitmap) -> Iterator[int]:
+    if isinstance(bitmap, IntBitmap):
+        return bitmap.descending()
+    return (bitmap[i] for i in range(len(bitmap) - 1, -1, -1))
+
+
+class SkillIndex:
+    """Bitmaps of resume ids by skill, field, level and score"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # bitmaps
+        self._refresh_lock = threading.Lock()  # _max_id and _gaps; one catch-up at a time
+        self._reset()
+
+    def _reset(self):
+        self._skills: Dict[str, Dict[str, object]] = {kind: {} for kind in SKILL_DIMENSIONS}
+        self._fields: Dict[str, object] = {}
+        self._levels: Dict[str, object] = {}
+        self._by_score: Dict[int, object] = {}
+        self._scores: List[int] = []  # distinct scores, ascending
+        self._known: set = set()  # skill keys of either kind
+        self._all = new_bitmap()
+        self._max_id = 0
+        self._gaps: Dict[int, float] = {}  # missing id -> when first missed
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    @property
+    def backend(self) -> str:
+        return "pyroaring" if HAS_ROARING else "int"
+
+    def load(self, db: Database):
+        """(Re)build the index from every user_data row"""
+        start = time.perf_counter()
+        with self._refresh_lock:
+            groups: Dict[Tuple[str, object], List[int]] = {}
+            recent = deque(maxlen=SKILL_INDEX_GAP_WINDOW)
+            after_id = 0
+            while True:
+                rows = db.scan_index_rows(after_id, SKILL_INDEX_LOAD_CHUNK)
+                if not rows:
+                    break
+                after_id = rows[-1]["id"]
+                for row in rows:
+                    for key in self._row_keys(row):
+                        groups.setdefault(key, []).append(row["id"])
+                    recent.append(row["id"])
+            with self._lock:
+                self._reset()
+                for (dimension, value), ids in groups.items():
+                    self._bitmaps(dimension)[value] = new_bitmap(ids)
+                self._scores = sorted(self._by_score)
+                self._known = {key for kind in SKILL_DIMENSIONS for key in self._skills[kind]}
+                self._all = reduce(or_, self._by_score.values(), new_bitmap())
+                self.loaded = True
+            self._track(recent, 0)
+        logger.info(f"Skill index loaded {len(self)} resumes ({self.backend} bitmaps) "
+                    f"in {time.perf_counter() - start:.2f}s")
+
+    def refresh(self, db: Database) -> int:
+        """Index the user_data rows committed since the last load/refresh;
+        returns how many were added. One indexed range query when nothing
+        is new."""
+        if not self.loaded:
+            return 0
+        added = 0
+        with self._refresh_lock:
+            now = time.monotonic()
+            self._gaps = {i: t for i, t in self._gaps.items() if now - t < SKILL_INDEX_GAP_SECONDS}
+            rows = db.scan_index_rows(self._max_id, SKILL_INDEX_LOAD_CHUNK, ids=sorted(self._gaps))
+            while rows:
+                previous_max = self._max_id
+                self._add_rows(rows)
+                for row in rows:
+                    self._gaps.pop(row["id"], None)
+                self._track([row["id"] for row in rows if row["id"] > previous_max], previous_max)
+                added += len(rows)
+                if len(rows) < SKILL_INDEX_LOAD_CHUNK:
+                    break
+                rows = db.scan_index_rows(self._max_id, SKILL_INDEX_LOAD_CHUNK)
+        return added
+
+    def _add_rows(self, rows: List[Dict]):
+        with self._lock:
+            for row in rows:
+                resume_id = row["id"]
+                for dimension, value in self._row_keys(row):
+                    bitmaps = self._bitmaps(dimension)
+                    if value not in bitmaps:
+                        bitmaps[value] = new_bitmap()
+                        if dimension == "score":
+                            bisect.insort(self._scores, value)
+                    bitmaps[value].add(resume_id)
+                    if dimension in SKILL_DIMENSIONS:
+                        self._known.add(value)
+                self._all.add(resume_id)
+
+    def _track(self, new_ids: Iterable[int], previous_max: int):
+        """Advance _max_id past ``new_ids`` (ascending, all > previous_max) and
+        remember the ids skipped near the top as gaps to re-check"""
+        new_ids = list(new_ids)
+        if not new_ids:
+            return
+        self._max_id = new_ids[-1]
+        present = set(new_ids)
+        now = time.monotonic()
+        for missing in range(max(previous_max, self._max_id - SKILL_INDEX_GAP_WINDOW) + 1, self._max_id):
+            if missing not in present:
+                self._gaps.setdefault(missing, now)
+
+    def _bitmaps(self, dimension: str) -> Dict:
+        if dimension == "score":
+            return self._by_score
+        if dimension == "field":
+            return self._fields
+        if dimension == "level":
+            return self._levels
+        return self._skills[dimension]
+
+    @staticmethod
+    def _row_keys(row: Dict) -> List[Tuple[str, object]]:
+        """(dimension, value) bitmaps a scan_index_rows row belongs to"""
+        keys = [("score", row["resume_score"]), ("field", row["predicted_field"]), ("level", row["user_level"])]
+        for kind in SKILL_DIMENSIONS:
+            names = _split_skills(row[f"{kind}_skills"])
+            keys.extend((kind, key) for key in dict.fromkeys(skill_key(name) for name in names))
+        return keys
+
+    def search(self, skills: str, kind: str = "actual", field: Optional[str] = None,
+               level: Optional[str] = None, min_score: Optional[int] = None,
+               limit: int = SEARCH_LIMIT_DEFAULT) -> Dict:
+        """Ids of the resumes matching a skill query, best score first (same
+        query syntax and order as Database.search_resumes; totals are exact)"""
+        if kind not in SKILL_DIMENSIONS:
+            raise ValueError(f"kind must be one of: {', '.join(SKILL_DIMENSIONS)}")
+        if not 1 <= limit <= RESUME_PAGE_MAX:
+            raise ValueError(f"limit must be between 1 and {RESUME_PAGE_MAX}")
+        groups = parse_skill_query(skills)
+        with self._lock:
+            postings = self._skills[kind]
+            resolved = resolve_skill_keys({key for group in groups for key in group}, self._known)
+            result = {"total": 0, "total_exact": True, "ids": [],
+                      "unknown_skills": sorted(key for key, canonical in resolved.items() if canonical not in self._known)}
+
+            # Smallest operand first keeps the intermediate bitmaps small
+            filters = []
+            for group in groups:
+                bitmaps = [postings[resolved[key]] for key in group if resolved[key] in postings]
+                if not bitmaps:
+                    return result
+                filters.append(reduce(or_, bitmaps))
+            for bitmaps, value in ((self._fields, field), (self._levels, level)):
+                if value is not None:
+                    if value not in bitmaps:
+                        return result
+                    filters.append(bitmaps[value])
+            matches = reduce(and_, sorted(filters, key=len))
+
+            # Without min_score the count is known up front and the walk stops
+            # once the top ``limit`` ids are in; with it, every score bitmap
+            # >= min_score is intersected for the count
+            ids = result["ids"]
+            total = len(matches) if min_score is None else 0
+            for score in reversed(self._scores):
+                if min_score is not None and score < min_score:
+                    break
+                if min_score is None and len(ids) >= min(limit, total):
+                    break
+                hits = matches & self._by_score[score]
+                if min_score is not None:
+                    total += len(hits)
+                if len(ids) < limit and hits:
+                    for resume_id in _descending(hits):
+                        ids.append(resume_id)
+                        if len(ids) >= limit:
+                            break
+            result["total"] = total
+        return result
@@ -0,0 +1,127 @@
+"""
+Compiled multi-pattern skill matcher
+Finds every skill of a taxonomy in a single regex pass instead of one
+full-text search per alias
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+# Regex metacharacters we cannot flatten into a trie of single-character atoms
+_UNSUPPORTED = set('[](){}?*+|^$')
+
+
+def _atomize(alias: str, literal: bool) -> Optional[List[str]]:
+    """Split an alias into single-character regex atoms ('.' is a wildcard).
+
+    Returns None when a regex alias uses syntax other than plain characters,
+    escaped characters and '.'.
+    """
+    if literal:
+        return [re.escape(ch) for ch in alias]
+
+    atoms = []
+    i = 0
+    while i < len(alias):
+        ch = alias[i]
+        if ch == '\\':
+            if i + 1 >= len(alias) or alias[i + 1].isalnum():
+                return None  # \b, \d, ... are not single characters
+            atoms.append(re.escape(alias[i + 1]))
+            i += 2
+            continue
+        if ch in _UNSUPPORTED:
+            return None
+        atoms.append('.' if ch == '.' else re.escape(ch))
+        i += 1
+    return atoms
+
+
+def _trie_pattern(sequences: Iterable[List[str]]) -> str:
+    """Build a prefix-shared alternation from atom sequences"""
+    trie: Dict = {}
+    for atoms in sequences:
+        node = trie
+        for atom in atoms:
+            node = node.setdefault(atom, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [atom + build(child) for atom, child in sorted(node.items()) if atom]
+        optional = '' in node
+        if not branches:
+            return ''
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if optional else body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """Matches canonical skills by their aliases with word-boundary semantics.
+
+    ``skills`` maps a canonical name to its aliases. With ``literal=True``
+    aliases are plain strings; otherwise they are regex fragments, exactly
+    as they would be used in ``r'\\b' + alias + r'\\b'``. Results keep the
+    dictionary order of ``skills``.
+    """
+
+    def __init__(self, skills: Dict[str, List[str]], literal: bool = True):
+        self.skills = list(skills)
+        self.aliases: Dict[str, List[int]] = {}
+        self._buckets: Dict[str, List] = {}
+        self._wildcards: List = []
+        self._fallback: List = []
+
+        sequences = []
+        for index, (skill, aliases) in enumerate(skills.items()):
+            for alias in aliases:
+                self.aliases.setdefault(alias, []).append(index)
+                fragment = re.escape(alias) if literal else alias
+                pattern = re.compile(r'\b' + fragment + r'\b')
+                atoms = _atomize(alias, literal)
+                if not atoms:
+                    self._fallback.append((index, pattern))
+                    continue
+                sequences.append(atoms)
+                first = atoms[0]
+                if first == '.':
+                    self._wildcards.append((index, pattern))
+                else:
+                    self._buckets.setdefault(re.sub(r'\\(.)', r'\1', first), []).append((index, pattern))
+
+        for bucket in self._buckets.values():
+            bucket.extend(self._wildcards)
+
+        # Zero-width so overlapping aliases at neighbouring positions are all seen
+        self._prefilter = re.compile(r'\b(?=' + _trie_pattern(sequences) + ')') if sequences else None
+
+    def find(self, text: str, tokens: Optional[Set[str]] = None) -> List[str]:
+        """Return the canonical skills present in ``text``.
+
+        ``text`` should already be lowercased. Aliases found verbatim in
+        ``tokens`` count as matches too.
+        """
+        found: Set[int] = set()
+        total = len(self.skills)
+
+        if self._prefilter is not None:
+            for m in self._prefilter.finditer(text):
+                pos = m.start()
+                for index, pattern in self._buckets.get(text[pos], self._wildcards):
+                    if index not in found and pattern.match(text, pos):
+                        found.add(index)
+                if len(found) == total:
+                    break
+
+        for index, pattern in self._fallback:
+            if index not in found and pattern.search(text):
+                found.add(index)
+
+        if tokens:
+            for alias in tokens.intersection(self.aliases):
+                found.update(self.aliases[alias])
+
+        return [self.skills[i] for i in sorted(found)]
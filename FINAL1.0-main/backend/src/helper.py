@@ -1,17 +1,14 @@
-import fitz  # PyMuPDF
-import pdfplumber
-import PyPDF2
-from pdf2image import convert_from_bytes
-import pytesseract
-from PIL import Image
 from collections import Counter
+from itertools import islice
 import json
 import os
 import re
 from typing import List, Tuple
-import io
 
-import requests
+from lazy_imports import lazy_import
+from metrics import STAGE_SECONDS, timed
+from pdf_session import PdfSession
+from extraction_router import EXTRACTION_MIN_QUALITY, score_text
 
 
 STOPWORDS = {
@@ -21,64 +18,74 @@ STOPWORDS = {
     "pdf", "page", "pages"
 }
 
+# Bump when extract_text_from_pdf output changes (invalidates cached text)
+EXTRACTOR_VERSION = "5"
+
+requests = lazy_import("requests")
+
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "anthropic/claude-3-haiku-20240307")
 OPENROUTER_SITE = os.getenv("OPENROUTER_SITE_URL", "http://localhost")
 OPENROUTER_APP = os.getenv("OPENROUTER_APP_NAME", "job-recommender")
 
 
+@timed(STAGE_SECONDS, "matcher_text")
 def extract_text_from_pdf(uploaded_file):
     """Extract text from a PDF upload using multiple methods with OCR fallback."""
     pdf_bytes = uploaded_file.read()
     text = ""
-    
-    # Method 1: Try pdfplumber (best for text-based PDFs)
-    try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        if text.strip():
-            return text
-    except Exception as e:
-        print(f"pdfplumber extraction failed: {e}")
-    
-    # Method 2: Try PyMuPDF
-    try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = "".join(page.get_text() for page in doc)
-        if text.strip():
-            return text
-    except Exception as e:
-        print(f"PyMuPDF extraction failed: {e}")
-    
-    # Method 3: Try PyPDF2
-    try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        if text.strip():
-            return text
-    except Exception as e:
-        print(f"PyPDF2 extraction failed: {e}")
-    
-    # Method 4: OCR fallback for image-based PDFs
-    print("Text extraction failed, attempting OCR...")
-    try:
-        images = convert_from_bytes(pdf_bytes, dpi=300)
-        text = ""
-        for i, image in enumerate(images):
-            print(f"Processing page {i+1} with OCR...")
-            page_text = pytesseract.image_to_string(image, lang='eng')
-            text += page_text + "\n"
-        if text.strip():
-            return text
-    except Exception as e:
-        print(f"OCR extraction failed: {e}")
-    
+    ocr_texts = {}
+
+    # One session for the whole chain: each library parses the PDF at most
+    # once, and pages OCR'd by the fast path are never recognised again
+    with PdfSession(pdf_bytes) as session:
+        # Method 0: PyMuPDF text layer (fast path), with only the image-only pages
+        # (scans, certificates) OCR'd; accepted when the text scores well
+        try:
+            profiles = session.page_profiles()
+            image_pages = [p.number for p in profiles if p.needs_ocr]
+            if image_pages:
+                print(f"OCR needed for {len(image_pages)}/{len(profiles)} image-only pages")
+                ocr_texts = session.ocr_pages(image_pages)
+            text = session.merge_pages([p.text for p in profiles], ocr_texts)
+            if image_pages and text.strip():
+                return text
+            if score_text(text, len(profiles)).score >= EXTRACTION_MIN_QUALITY:
+                return text
+            text = ""
+        except Exception as e:
+            print(f"Hybrid page extraction failed: {e}")
+            text = ""
+
+        # Method 1: Try pdfplumber (layout analysis for poorly scored text layers)
+        try:
+            text = session.merge_pages([page.extract_text() or "" for page in session.plumber_pdf.pages], ocr_texts)
+            if text.strip():
+                return text
+        except Exception as e:
+            print(f"pdfplumber extraction failed: {e}")
+
+        # Method 2: Try PyPDF2 (PyMuPDF's text layer was already read above)
+        try:
+            text = session.merge_pages([page.extract_text() or "" for page in session.pypdf_reader.pages], ocr_texts)
+            if text.strip():
+                return text
+        except Exception as e:
+            print(f"PyPDF2 extraction failed: {e}")
+
+        # Method 3: OCR fallback for image-based PDFs, skipping pages already OCR'd
+        print("Text extraction failed, attempting OCR...")
+        try:
+            remaining = [i for i in range(len(session.fitz_doc)) if i not in ocr_texts]
+            print(f"Processing {len(remaining)} pages with OCR...")
+            if remaining:
+                ocr_texts.update(session.ocr_pages(remaining, lang='eng'))
+            text = "\n".join(ocr_texts[i] for i in sorted(ocr_texts)) + "\n"
+            if text.strip():
+                return text
+        except Exception as e:
+            print(f"OCR extraction failed: {e}")
+
     return text
 
 
@@ -126,32 +133,59 @@ def summarize_resume(text: str, max_sentences: int = 5) -> str:
     return summary[:500]  # Limit to reasonable length
 
 
+# Common technical skills and keywords, in priority order
+SKILL_PATTERNS = [
+    'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
+    'node', 'nodejs', 'express', 'django', 'flask', 'fastapi', 
+    'mongodb', 'mongo', 'mysql', 'postgresql', 'sql', 'nosql', 'redis',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'git',
+    'html', 'css', 'tailwind', 'bootstrap', 'sass',
+    'rest', 'api', 'graphql', 'microservices',
+    'machine learning', 'ml', 'ai', 'data science', 'nlp',
+    'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
+    'ci/cd', 'jenkins', 'github', 'gitlab', 'devops',
+    'agile', 'scrum', 'jira', 'testing', 'jest', 'pytest',
+    'c++', 'c#', '.net', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin',
+    'frontend', 'backend', 'fullstack', 'full stack', 'full-stack',
+    'developer', 'engineer', 'software', 'web', 'mobile',
+]
+
+# Role inference terms (single tokens or bigrams)
+FRONTEND_TERMS = {'frontend', 'front-end', 'front end', 'react', 'reactjs', 'vue', 'vuejs', 'angular', 'angularjs'}
+BACKEND_TERMS = {'backend', 'back-end', 'back end', 'node', 'nodejs', 'django', 'flask'}
+FULLSTACK_TERMS = {'fullstack', 'full-stack', 'full stack'}
+FULLSTACK_FRONT_TERMS = {'react', 'reactjs', 'vue', 'vuejs', 'angular', 'angularjs'}
+FULLSTACK_BACK_TERMS = {'node', 'nodejs', 'django', 'flask', 'express', 'expressjs'}
+WEB_DEV_TERMS = {'web developer', 'web development'}
+
+_TOKEN_RE = re.compile(r"[a-z0-9.#+][a-z0-9_+#/.-]*")
+_SUBTOKEN_RE = re.compile(r"[./-]")
+
+
+def _tokenize(text_lower: str) -> Tuple[set, Counter]:
+    """One pass over the text: a lookup set of tokens, their dotted/slashed
+    parts and adjacent bigrams, plus a token frequency table."""
+    tokens = [t.rstrip('./-') for t in _TOKEN_RE.findall(text_lower)]
+    tokens = [t for t in tokens if t]
+    counts = Counter(tokens)
+
+    terms = set(counts)
+    for token in counts:
+        if _SUBTOKEN_RE.search(token):
+            terms.update(part for part in _SUBTOKEN_RE.split(token) if part)
+    terms.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return terms, counts
+
+
+@timed(STAGE_SECONDS, "keywords")
 def extract_keywords(text: str, limit: int = 10) -> Tuple[str, List[str]]:
     """Extract keywords with better skill detection, prioritizing technical skills"""
-    # Common technical skills and keywords
-    skill_patterns = [
-        'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
-        'node', 'nodejs', 'express', 'django', 'flask', 'fastapi', 
-        'mongodb', 'mongo', 'mysql', 'postgresql', 'sql', 'nosql', 'redis',
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'git',
-        'html', 'css', 'tailwind', 'bootstrap', 'sass',
-        'rest', 'api', 'graphql', 'microservices',
-        'machine learning', 'ml', 'ai', 'data science', 'nlp',
-        'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-        'ci/cd', 'jenkins', 'github', 'gitlab', 'devops',
-        'agile', 'scrum', 'jira', 'testing', 'jest', 'pytest',
-        'c++', 'c#', '.net', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin',
-        'frontend', 'backend', 'fullstack', 'full stack', 'full-stack',
-        'developer', 'engineer', 'software', 'web', 'mobile',
-    ]
-    
-    text_lower = text.lower()
+    terms, counts = _tokenize(text.lower())
     found_skills = []
     
-    # First, look for specific skills (with whole word matching)
-    for skill in skill_patterns:
-        # Use word boundaries for whole words, or substring match for compound terms
-        if re.search(r'\b' + re.escape(skill) + r'\b', text_lower) or skill in text_lower:
+    # First, look for specific skills (whole tokens or bigrams)
+    for skill in SKILL_PATTERNS:
+        if skill in terms:
             # Normalize skill names
             if skill == 'nodejs' or skill == 'node':
                 if 'node' not in found_skills and 'nodejs' not in found_skills:
@@ -164,16 +198,16 @@ def extract_keywords(text: str, limit: int = 10) -> Tuple[str, List[str]]:
     
     # Extract role-related keywords
     role_keywords = []
-    if any(word in text_lower for word in ['frontend', 'front-end', 'front end', 'react', 'vue', 'angular']):
+    if not terms.isdisjoint(FRONTEND_TERMS):
         role_keywords.append('frontend developer')
-    if any(word in text_lower for word in ['backend', 'back-end', 'back end', 'node', 'django', 'flask']):
+    if not terms.isdisjoint(BACKEND_TERMS):
         role_keywords.append('backend developer')
-    if any(word in text_lower for word in ['fullstack', 'full-stack', 'full stack']) or (
-        any(word in text_lower for word in ['react', 'vue', 'angular']) and 
-        any(word in text_lower for word in ['node', 'django', 'flask', 'express'])
+    if not terms.isdisjoint(FULLSTACK_TERMS) or (
+        not terms.isdisjoint(FULLSTACK_FRONT_TERMS) and
+        not terms.isdisjoint(FULLSTACK_BACK_TERMS)
     ):
         role_keywords.append('fullstack developer')
-    if any(word in text_lower for word in ['web developer', 'web development']):
+    if not terms.isdisjoint(WEB_DEV_TERMS):
         role_keywords.append('web developer')
     
     # Combine: prioritize found technical skills, then role keywords
@@ -192,13 +226,13 @@ def extract_keywords(text: str, limit: int = 10) -> Tuple[str, List[str]]:
             keywords.append(skill)
             seen.add(skill)
     
-    # If we don't have enough keywords, extract general tokens
+    # If we don't have enough keywords, fall back to the most frequent general tokens
     if len(keywords) < limit:
-        tokens = re.findall(r"[A-Za-z][A-Za-z0-9_+#/.-]{2,}", text_lower)
-        tokens = [t for t in tokens if t not in STOPWORDS and len(t) > 2]
-        counts = Counter(tokens)
-        
-        for token, _ in counts.most_common(limit * 2):
+        general = (
+            token for token, _ in counts.most_common()
+            if token not in STOPWORDS and len(token) > 2 and token[0].isalpha()
+        )
+        for token in islice(general, limit * 2):
             if token not in seen and len(keywords) < limit * 2:
                 keywords.append(token)
                 seen.add(token)
@@ -296,6 +330,7 @@ def build_roadmap(tokens: List[str]) -> str:
     return "\n".join(f"- {item}" for item in roadmap_items[:5])  # Limit to 5 items
 
 
+@timed(STAGE_SECONDS, "openrouter")
 def ask_openrouter(prompt: str, max_tokens: int = 500) -> str:
     if not OPENROUTER_API_KEY:
         raise RuntimeError("OPENROUTER_API_KEY not set")
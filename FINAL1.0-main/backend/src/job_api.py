@@ -1,4 +1,6 @@
-import feedparser
+from lazy_imports import lazy_import
+
+feedparser = lazy_import("feedparser")
 
 
 RSS_FEEDS = [
@@ -0,0 +1,31 @@
+"""
+Shared fixtures. The backend modules are flat, so the backend directory goes
+on sys.path (run pytest from backend/).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Keep tests off the on-disk caches next to the code, and skip the warm-up
+os.environ.setdefault("PARSE_CACHE_PATH", "")
+os.environ.setdefault("OCR_CACHE_PATH", "")
+os.environ.setdefault("WARMUP", "0")
+
+from database import Database  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def db(db_path):
+    database = Database(db_path)
+    database.create_tables()
+    yield database
+    database.close()
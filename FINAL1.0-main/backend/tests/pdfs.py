@@ -0,0 +1,45 @@
+"""
+PDF fixtures built with PyMuPDF: text-layer pages and image-only (scanned)
+pages, so extraction tests need no files on disk
+"""
+
+import io
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+Image = pytest.importorskip("PIL.Image")
+
+
+def _page_png(shade: int) -> bytes:
+    image = Image.new("L", (400, 500), 255)
+    image.paste(shade, (40, 40, 360, 120))
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def make_pdf(pages) -> bytes:
+    """One page per item: a str becomes a text page, an int an image-only
+    page (a scan) whose drawn block has that gray level"""
+    doc = fitz.open()
+    for content in pages:
+        page = doc.new_page()
+        if isinstance(content, str):
+            y = 72
+            for line in content.splitlines():
+                page.insert_text((72, y), line)
+                y += 14
+        else:
+            page.insert_image(page.rect, stream=_page_png(content))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com | +1 555 123 4567
+Senior software engineer with 8 years of experience
+Skills: Python, SQL, Docker, React, AWS, Kubernetes
+Education: B.Tech in Computer Science
+Experience: built data pipelines and web services"""
@@ -0,0 +1,60 @@
+from collections import Counter
+
+import pytest
+
+from benchmarks.skill_index import synthetic_rows
+from database import SCORE_BINS
+
+
+@pytest.fixture
+def rows(db):
+    # One row a minute from 2024-01-01 00:00, so three days of data
+    records = synthetic_rows(3 * 24 * 60, seed=12)
+    db.insert_resume_data_batch(records)
+    return records
+
+
+def test_daily_uploads_match_the_rows(db, rows):
+    series = db.analytics_uploads("day", "2023-12-31", "2024-01-04")
+    per_day = Counter(r.timestamp[:10] for r in rows)
+    assert [(point["bucket"], point["resumes"]) for point in series] == [
+        ("2023-12-31", 0), ("2024-01-01", per_day["2024-01-01"]), ("2024-01-02", per_day["2024-01-02"]),
+        ("2024-01-03", per_day["2024-01-03"]), ("2024-01-04", 0),
+    ]
+    day = [r.resume_score for r in rows if r.timestamp.startswith("2024-01-02")]
+    assert series[2]["average_score"] == round(sum(day) / len(day), 2)
+    assert series[0]["average_score"] is None
+
+
+def test_hourly_field_mix_and_score_histogram(db, rows):
+    day = [r for r in rows if r.timestamp.startswith("2024-01-02")]
+    fields = db.analytics_fields("hour", "2024-01-02", "2024-01-02")
+    assert len(fields) == 24
+    noon = Counter(r.predicted_field for r in day if r.timestamp[11:13] == "12")
+    assert fields[12] == {"bucket": "2024-01-02 12:00:00", "fields": dict(noon)}
+
+    expected = Counter()
+    for row in day:
+        low, high = next(b for b in SCORE_BINS if b[0] <= row.resume_score <= b[1])
+        expected[f"{low}-{high}"] += 1
+    assert db.analytics_scores("day", "2024-01-02", "2024-01-02") == \
+        [{"range": f"{low}-{high}", "resumes": expected[f"{low}-{high}"]} for low, high in SCORE_BINS]
+
+
+def test_top_skills_match_the_rows(db, rows):
+    counts = Counter(s.strip() for r in rows for s in r.actual_skills.split(","))
+    top = db.analytics_skills("actual", "day", "2024-01-01", "2024-01-03", limit=5)
+    assert [item["resumes"] for item in top] == [n for _, n in counts.most_common(5)]
+
+
+def test_rebuild_matches_incremental_rollups(db, rows):
+    before = db.analytics_uploads("hour", "2024-01-01", "2024-01-03")
+    db.rebuild_analytics()
+    assert db.analytics_uploads("hour", "2024-01-01", "2024-01-03") == before
+
+
+def test_rejects_bad_ranges(db):
+    with pytest.raises(ValueError):
+        db.analytics_uploads("week")
+    with pytest.raises(ValueError):
+        db.analytics_uploads("day", "2024-02-01", "2024-01-01")
@@ -0,0 +1,85 @@
+import csv
+import json
+
+import pytest
+
+import batch_analyze
+from batch_analyze import COLUMNS, ResultWriter, analyze_file, main
+from database import Database
+from pdfs import RESUME_TEXT, make_pdf
+
+
+@pytest.fixture
+def resume_dir(tmp_path):
+    directory = tmp_path / "resumes"
+    (directory / "nested").mkdir(parents=True)
+    (directory / "a.pdf").write_bytes(make_pdf([RESUME_TEXT]))
+    (directory / "nested" / "b.pdf").write_bytes(make_pdf([RESUME_TEXT.replace("Jane", "John")]))
+    (directory / "broken.pdf").write_bytes(b"not a pdf")
+    (directory / "notes.txt").write_text("skipped")
+    return directory
+
+
+def error_row(path="broken.pdf"):
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=path, status="error", error="Could not extract text from PDF")
+    return row
+
+
+def test_analyze_file_rows(resume_dir):
+    ok = analyze_file(str(resume_dir / "a.pdf"))
+    assert ok["status"] == "ok"
+    assert ok["email"] == "jane.doe@example.com"
+    assert isinstance(ok["resume_score"], int)
+
+    failed = analyze_file(str(resume_dir / "broken.pdf"))
+    assert failed["status"] == "error" and failed["error"]
+    assert failed["resume_score"] is None
+
+
+def test_result_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        ResultWriter(tmp_path / "checkpoint.jsonl", 10)
+
+
+def test_csv_run_resumes_from_checkpoint(resume_dir, tmp_path, capsys):
+    output = tmp_path / "results.csv"
+    assert main([str(resume_dir), "--output", str(output), "--workers", "2", "--batch-size", "2"]) == 0
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(row["status"] for row in rows) == ["error", "ok", "ok"]
+    assert {row["path"].rsplit("/", 1)[-1] for row in rows} == {"a.pdf", "b.pdf", "broken.pdf"}
+    with open(f"{output}.checkpoint.jsonl", encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 3
+
+    capsys.readouterr()
+    assert main([str(resume_dir), "--output", str(output)]) == 0
+    assert "0 PDFs to analyze (3 already done" in capsys.readouterr().err
+
+
+def test_db_run_inserts_successful_rows(resume_dir, tmp_path):
+    db_path = tmp_path / "batch.db"
+    assert main([str(resume_dir), "--db", "--sqlite-path", str(db_path), "--workers", "1"]) == 0
+    db = Database(str(db_path))
+    try:
+        assert db.get_statistics()["total_resumes"] == 2
+    finally:
+        db.close()
+
+
+def test_parquet_batches_mixing_ok_and_failed_rows(resume_dir, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "results.parquet"
+    writer = batch_analyze.ParquetWriter(output, tmp_path / "checkpoint.jsonl", batch_size=2)
+    writer.add(analyze_file(str(resume_dir / "a.pdf")))
+    writer.add(error_row())  # ok and error rows in one part
+    writer.add(error_row("other.pdf"))  # an error-only part
+    writer.close()
+
+    parts = sorted(output.glob("part-*.parquet"))
+    assert len(parts) == 2
+    assert pq.read_schema(parts[0]) == pq.read_schema(parts[1]) == writer.schema
+    table = pq.read_table(output)
+    assert table.num_rows == 3
+    scores = table.column("resume_score").to_pylist()
+    assert scores.count(None) == 2 and isinstance(max(s for s in scores if s is not None), int)
@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("fitz")
+
+from benchmarks import stages  # noqa: E402
+from benchmarks.corpus import build_corpus, build_resume, case_id  # noqa: E402
+from pdf_session import PdfSession  # noqa: E402
+from resume_parser_enhanced import ResumeParserEnhanced  # noqa: E402
+
+
+def test_corpus_is_deterministic_per_seed():
+    first, again, other = build_resume("text", 2, 3), build_resume("text", 2, 3), build_resume("text", 2, 4)
+    assert first.text == again.text and first.skills == again.skills
+    assert first.text != other.text
+
+
+def test_scanned_pages_have_no_text_layer():
+    mixed = build_resume("mixed", 4, 5)
+    with PdfSession(mixed.pdf) as session:
+        assert [p.needs_ocr for p in session.page_profiles()] == [False, True, False, True]
+
+
+def test_text_resumes_extract_their_ground_truth():
+    resume = build_resume("multicolumn", 1, 6, skill_count=10)
+    parser = ResumeParserEnhanced("", data=resume.pdf)
+    text = parser.extract_text()
+    assert resume.name in text
+    assert len(parser.extract_skills(text)) >= 5
+
+
+def test_corpus_filters_by_kind_and_pages():
+    corpus = build_corpus(kinds=["text"], max_pages=2)
+    assert [case_id(r) for r in corpus] == ["text-1p-25s", "text-2p-25s", "text-2p-300s"]
+
+
+def test_stage_run_times_every_text_stage(capsys):
+    results = stages.run(7, ["text"], 1, 1, run_ocr=False)
+    [case] = results["cases"]
+    assert set(case["stages"]) == set(stages.STAGES) - {"extract_text_ocr"}
+    assert all(t["median_ms"] >= 0 for t in case["stages"].values())
+    assert set(results["totals"]) == set(case["stages"])
+    stages.compare(results, results)
+    assert "extract_text=1.00x" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+import asyncio
+import io
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import UploadFile
+
+import bulk
+import jobs
+from bulk import BulkTooLarge, expand_uploads, new_spool_dir, stream_bulk_analysis
+from cache import TieredCache
+from executors import BoundedExecutor
+from pdfs import RESUME_TEXT, make_pdf
+from write_behind import WriteBehindBuffer
+
+
+def upload(name: str, content: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=name)
+
+
+def zipped(members) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_SPOOL_DIR", str(tmp_path))
+    return new_spool_dir()
+
+
+def test_parts_are_spooled_to_disk(spool_dir):
+    pdf = make_pdf([RESUME_TEXT])
+    files = [
+        upload("a.pdf", pdf),
+        upload("batch.zip", zipped({"b.pdf": pdf, "notes.txt": b"x", "__MACOSX/._b.pdf": b"x"})),
+        upload("broken.zip", b"not a zip"),
+    ]
+    items = asyncio.run(expand_uploads(files, spool_dir))
+    assert [(item.filename, item.error) for item in items] == [
+        ("a.pdf", None),
+        ("batch.zip/b.pdf", None),
+        ("batch.zip/notes.txt", "Only PDF files are supported"),
+        ("broken.zip", "Not a valid zip archive"),
+    ]
+    assert len(list(spool_dir.iterdir())) == 3
+    assert items[0].read() == pdf and items[1].read() == pdf
+
+
+def test_total_upload_size_is_capped(spool_dir, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_MAX_TOTAL_BYTES", 1000)
+    with pytest.raises(BulkTooLarge):
+        asyncio.run(expand_uploads([upload("a.pdf", bytes(600)), upload("b.pdf", bytes(600))], spool_dir))
+
+
+def test_stream_reports_each_resume_then_a_summary(db, spool_dir, monkeypatch):
+    monkeypatch.setattr(jobs, "extraction_executor",
+                        BoundedExecutor("extraction", lambda: ThreadPoolExecutor(2), 8))
+    pdf = make_pdf([RESUME_TEXT])
+    files = [upload("a.pdf", pdf), upload("b.zip", zipped({"b.pdf": pdf})), upload("c.doc", b"x")]
+    writer = WriteBehindBuffer(db)
+
+    async def scenario():
+        await writer.start()
+        items = await expand_uploads(files, spool_dir)
+        lines = [json.loads(line) async for line in stream_bulk_analysis(items, writer, TieredCache(None, 0), spool_dir)]
+        await writer.stop()
+        return lines
+
+    lines = asyncio.run(scenario())
+    assert sorted((line["filename"], line["status"]) for line in lines[:-1]) == [
+        ("a.pdf", "ok"), ("b.zip/b.pdf", "ok"), ("c.doc", "error")]
+    assert lines[-1] == {"summary": {"total": 3, "ok": 2, "error": 1, "saved": 2}}
+    assert db.get_statistics()["total_resumes"] == 2
+    assert not spool_dir.exists()
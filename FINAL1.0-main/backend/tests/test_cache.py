@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+import jobs
+from cache import LRUCache, SQLiteCache, TieredCache, content_key
+from executors import BoundedExecutor
+from pdfs import RESUME_TEXT, make_pdf
+
+
+def test_content_key_covers_bytes_and_versions():
+    assert content_key(b"%PDF-1", "resume", "1") == content_key(b"%PDF-1", "resume", "1")
+    assert content_key(b"%PDF-1", "resume", "1") != content_key(b"%PDF-2", "resume", "1")
+    assert content_key(b"%PDF-1", "resume", "1") != content_key(b"%PDF-1", "resume", "2")
+
+
+def test_lru_cache_drops_least_recently_used():
+    lru = LRUCache(2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    lru.get("a")
+    lru.put("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+
+
+def test_replacing_a_key_keeps_the_total(tmp_path):
+    store = SQLiteCache(str(tmp_path / "cache.db"), 10_000)
+    store.put("a", bytes(100))
+    store.put("a", bytes(300))
+    store.put("b", bytes(50))
+    assert store.total_bytes == 350
+    assert store.get("a") == bytes(300)
+    store.close()
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "LAST_ACCESS_RESOLUTION", 0.0)
+    store = SQLiteCache(str(tmp_path / "cache.db"), 3000)
+    for key in "abc":
+        store.put(key, bytes(1000))
+    store.get("a")
+    store.put("d", bytes(1000))
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.total_bytes == 3000
+    store.close()
+
+
+def test_tiered_cache_round_trip(tmp_path):
+    key = content_key(b"%PDF", "resume", "1")
+    writer = TieredCache(str(tmp_path / "cache.db"), 10_000)
+    writer.put(key, {"data": {"name": "A"}})
+    writer.close()
+    reader = TieredCache(str(tmp_path / "cache.db"), 10_000)
+    assert reader.get(key) == {"data": {"name": "A"}}
+    assert reader.hits == 1
+    reader.close()
+
+
+class ThreadRecordingCache(TieredCache):
+    """Notes which thread each lookup and store ran on"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(("get", threading.get_ident()))
+        return super().get(key)
+
+    def put(self, key, value):
+        self.threads.append(("put", threading.get_ident()))
+        super().put(key, value)
+
+
+def test_parse_cache_stays_off_the_event_loop(tmp_path, monkeypatch):
+    # Threads stand in for the extraction processes; only the cache matters here
+    monkeypatch.setattr(jobs, "extraction_executor",
+                        BoundedExecutor("extraction", lambda: ThreadPoolExecutor(1), 4))
+    parse_cache = ThreadRecordingCache(str(tmp_path / "cache.db"), 1_000_000)
+    pdf = tmp_path / "resume.pdf"
+    pdf.write_bytes(make_pdf([RESUME_TEXT]))
+
+    async def analyze_twice():
+        loop_thread = threading.get_ident()
+        for _ in range(2):
+            result = await jobs.analyze_resume_file(str(pdf), pdf.read_bytes(), "resume.pdf", None,
+                                                    parse_cache, save=False)
+        return loop_thread, result
+
+    loop_thread, result = asyncio.run(analyze_twice())
+    assert [op for op, _ in parse_cache.threads] == ["get", "put", "get"]
+    assert all(thread != loop_thread for _, thread in parse_cache.threads)
+    assert parse_cache.hits == 1
+    assert result["email"] != "N/A"
+    parse_cache.close()
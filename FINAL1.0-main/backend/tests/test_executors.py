@@ -0,0 +1,101 @@
+import asyncio
+import os
+import re
+import time
+
+import pytest
+
+import executors
+import ocr
+import resume_parser_enhanced
+from executors import BoundedExecutor, ServerBusy
+from pdfs import make_pdf
+from pipeline import extract_resume
+
+
+class PidEngine:
+    """Fake OCR engine: reports which process read the page and when"""
+    name = "fake"
+
+    def recognize(self, image) -> ocr.OcrResult:
+        start = time.time()
+        time.sleep(0.3)
+        return ocr.OcrResult(f"page read by pid={os.getpid()} from={start:.3f} to={time.time():.3f}\n", 95.0)
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """Worker processes are forked after this, so they inherit the patches"""
+    monkeypatch.setattr(ocr, "_get_engine", lambda lang: PidEngine())
+    monkeypatch.setattr(ocr, "HAS_TESSERACT", True)
+    monkeypatch.setattr(resume_parser_enhanced, "HAS_OCR", True)
+    monkeypatch.setattr(ocr, "OCR_CACHE_PATH", "")
+    monkeypatch.setattr(ocr, "OCR_FAST_DPI", 72)
+
+
+def ocr_reads(text):
+    return [(int(pid), float(start), float(end))
+            for pid, start, end in re.findall(r"pid=(\d+) from=([\d.]+) to=([\d.]+)", text)]
+
+
+def max_overlap(reads):
+    events = sorted([(start, 1) for _, start, _ in reads] + [(end, -1) for _, _, end in reads])
+    running = peak = 0
+    for _, step in events:
+        running += step
+        peak = max(peak, running)
+    return peak
+
+
+@pytest.mark.parametrize("cpus", [2, 4, 8])
+def test_default_sizing_keeps_page_ocr_parallel(monkeypatch, cpus):
+    # The defaults on a machine with this many cores
+    monkeypatch.setattr(ocr, "OCR_WORKERS", min(4, cpus))
+    monkeypatch.setattr(executors, "EXTRACTION_WORKERS", min(4, cpus))
+    assert executors.ocr_workers_per_extraction_worker() >= 2
+
+
+def test_scanned_resume_is_split_across_ocr_processes(monkeypatch, fake_ocr):
+    monkeypatch.setattr(ocr, "OCR_WORKERS", 4)
+    monkeypatch.setattr(executors, "EXTRACTION_WORKERS", 4)
+    pool = executors.extraction_pool()
+    try:
+        extracted = pool.submit(extract_resume, "", make_pdf([0, 40, 80, 120])).result(60)
+    finally:
+        pool.shutdown(wait=True)
+    reads = ocr_reads(extracted["text"])
+    assert len(reads) == 4
+    assert len({pid for pid, _, _ in reads}) >= 2
+    assert max_overlap(reads) >= 2
+
+
+def test_page_ocr_is_capped_across_extraction_workers(monkeypatch, fake_ocr):
+    monkeypatch.setattr(ocr, "OCR_WORKERS", 2)
+    monkeypatch.setattr(executors, "EXTRACTION_WORKERS", 2)
+    pool = executors.extraction_pool()
+    try:
+        futures = [pool.submit(extract_resume, "", make_pdf([0, 40, 80, 120])) for _ in range(2)]
+        reads = [read for future in futures for read in ocr_reads(future.result(60)["text"])]
+    finally:
+        pool.shutdown(wait=True)
+    assert len(reads) == 8
+    assert max_overlap(reads) <= 2
+
+
+def test_bounded_executor_rejects_when_saturated():
+    from concurrent.futures import ThreadPoolExecutor
+
+    async def scenario():
+        pool = BoundedExecutor("test", lambda: ThreadPoolExecutor(max_workers=1), max_pending=2)
+        started = [asyncio.create_task(pool.run(time.sleep, 0.2)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.pending == 2
+        with pytest.raises(ServerBusy) as busy:
+            await pool.run(time.sleep, 0)
+        assert busy.value.name == "test"
+        await asyncio.gather(*started)
+        assert pool.pending == 0
+        assert await pool.run(sum, [1, 2]) == 3
+        pool.shutdown()
+
+    asyncio.run(scenario())
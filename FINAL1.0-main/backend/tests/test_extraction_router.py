@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+import ocr
+from extraction_router import EXTRACTION_MIN_QUALITY, BackendRouter, producer_key, score_text
+from pdf_session import PdfSession
+from pdfs import RESUME_TEXT, make_pdf
+from src.helper import extract_text_from_pdf
+
+
+def test_clean_text_scores_high_and_garbage_low():
+    assert score_text(RESUME_TEXT, 1).score >= EXTRACTION_MIN_QUALITY
+    assert score_text("", 1).score == 0.0
+    assert score_text("(cid:12)(cid:34) " * 40, 1).score == 0.0
+    assert score_text("�� word " * 40, 1).score == 0.0
+    # The same words spread over ten pages are too sparse to trust
+    assert score_text(RESUME_TEXT, 10).score < EXTRACTION_MIN_QUALITY
+
+
+def test_producer_key_drops_versions():
+    assert producer_key("Microsoft® Word 2016") == producer_key("Microsoft® Word 2019") == "microsoft word"
+    assert producer_key(None) == producer_key("1.2.3") == "unknown"
+
+
+def test_router_learns_which_backend_wins_per_producer():
+    router = BackendRouter(min_samples=3, max_producers=2)
+    for _ in range(2):
+        router.record("LaTeX 3.1", "pdfplumber")
+    assert router.route("LaTeX 3.2") == "pymupdf"  # too few samples yet
+    router.record("LaTeX", "pdfplumber")
+    assert router.route("LaTeX 3.2") == "pdfplumber"
+    assert router.route("Word") == "pymupdf"
+    router.record("Word", "pymupdf")
+    router.record("Canva", "pymupdf")
+    assert "latex" not in router.snapshot()  # least recently used producer dropped
+
+
+class BlankEngine:
+    """Fake OCR engine that finds no text on any page"""
+    name = "fake"
+
+    def recognize(self, image) -> ocr.OcrResult:
+        return ocr.OcrResult("", 0.0)
+
+
+@pytest.fixture
+def ocr_calls(monkeypatch):
+    monkeypatch.setattr(ocr, "_get_engine", lambda lang: BlankEngine())
+    monkeypatch.setattr(ocr, "HAS_TESSERACT", True)
+    monkeypatch.setattr(ocr, "OCR_WORKERS", 1)
+    calls = []
+    ocr_pages = PdfSession.ocr_pages
+
+    def recording(self, numbers, *args, **kwargs):
+        calls.append(list(numbers))
+        return ocr_pages(self, calls[-1], *args, **kwargs)
+    monkeypatch.setattr(PdfSession, "ocr_pages", recording)
+    return calls
+
+
+def test_matcher_fallback_does_not_ocr_a_page_twice(ocr_calls):
+    extract_text_from_pdf(io.BytesIO(make_pdf([200, "", 120])))
+    pages = [number for call in ocr_calls for number in call]
+    assert sorted(pages) == [0, 1, 2]
+
+
+def test_matcher_escalates_poor_text_layers_without_ocr(ocr_calls):
+    text = extract_text_from_pdf(io.BytesIO(make_pdf(["Jane Doe", "Python"])))
+    assert "Jane Doe" in text and "Python" in text
+    assert ocr_calls == []
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+import pytest
+
+import main
+import ocr
+
+
+class CountingEngine:
+    """Fake OCR engine that counts probes and can be made to hang"""
+    name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def recognize(self, image) -> ocr.OcrResult:
+        self.calls += 1
+        self.release.wait()
+        return ocr.OcrResult("", 0.0)
+
+
+@pytest.fixture
+def engine(monkeypatch, db):
+    engine = CountingEngine()
+    monkeypatch.setattr(ocr, "_get_engine", lambda lang: engine)
+    monkeypatch.setattr(ocr, "engine_name", lambda: "fake")
+    monkeypatch.setattr(main, "db", db)
+    monkeypatch.setattr(main, "ocr_health", {"status": None, "checked": 0.0, "probe": None})
+    yield engine
+    engine.release.set()
+
+
+def check_health():
+    return asyncio.run(asyncio.wait_for(main.health(), 5))
+
+
+def test_health_does_not_queue_behind_extraction(monkeypatch, engine):
+    async def stuck(fn, *args):
+        await asyncio.Event().wait()  # every extraction worker is busy
+    monkeypatch.setattr(main.extraction_executor, "run", stuck)
+    status = check_health()
+    assert status["status"] == "ok"
+    assert status["ocr"]["engine"] == "fake"
+
+
+def test_health_reuses_a_recent_probe(monkeypatch, engine):
+    assert check_health()["ocr"]["ok"]
+    assert check_health()["ocr"]["ok"]
+    assert engine.calls == 1
+    monkeypatch.setattr(main, "OCR_HEALTH_TTL", 0.0)
+    check_health()
+    assert engine.calls == 2
+
+
+def test_hung_probe_reports_degraded_within_the_timeout(monkeypatch, engine):
+    monkeypatch.setattr(main, "OCR_HEALTH_PROBE_TIMEOUT", 0.2)
+    engine.release.clear()
+    status = check_health()
+    assert status["status"] == "degraded"
+    assert "did not answer" in status["ocr"]["error"]
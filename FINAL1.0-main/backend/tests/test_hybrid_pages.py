@@ -0,0 +1,54 @@
+import pytest
+
+import ocr
+import resume_parser_enhanced
+from pdf_session import PageProfile, PdfSession
+from pdfs import RESUME_TEXT, make_pdf
+from resume_parser_enhanced import ResumeParserEnhanced
+
+
+class ScanEngine:
+    """Fake OCR engine that 'reads' a certificate off every scanned page"""
+    name = "fake"
+
+    def recognize(self, image) -> ocr.OcrResult:
+        return ocr.OcrResult("Certified Kubernetes Administrator\n", 92.0)
+
+
+@pytest.fixture
+def ocr_calls(monkeypatch):
+    monkeypatch.setattr(ocr, "_get_engine", lambda lang: ScanEngine())
+    monkeypatch.setattr(ocr, "HAS_TESSERACT", True)
+    monkeypatch.setattr(ocr, "OCR_WORKERS", 1)
+    monkeypatch.setattr(resume_parser_enhanced, "HAS_OCR", True)
+    calls = []
+    ocr_pages = PdfSession.ocr_pages
+
+    def recording(self, numbers, *args, **kwargs):
+        calls.append(list(numbers))
+        return ocr_pages(self, calls[-1], *args, **kwargs)
+    monkeypatch.setattr(PdfSession, "ocr_pages", recording)
+    return calls
+
+
+@pytest.mark.parametrize("chars, coverage, expected", [
+    (0, 0.9, True),       # scan
+    (0, 0.0, False),      # blank page
+    (500, 1.0, False),    # text over a background image
+    (100, 0.8, True),     # scan with a short caption
+    (100, 0.1, False),    # short text page with a logo
+    (10, 0.1, True),      # small image, almost no text
+])
+def test_page_classification(chars, coverage, expected):
+    assert PageProfile(0, "x" * chars, coverage).needs_ocr is expected
+
+
+def test_only_image_only_pages_are_ocrd(ocr_calls):
+    pdf = make_pdf([RESUME_TEXT, 200, RESUME_TEXT])
+    with PdfSession(pdf) as session:
+        assert [p.needs_ocr for p in session.page_profiles()] == [False, True, False]
+
+    text = ResumeParserEnhanced("", data=pdf).extract_text()
+    assert ocr_calls == [[1]]
+    assert text.count("Jane Doe") == 2
+    assert "Certified Kubernetes Administrator" in text
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import jobs
+import pipeline
+from cache import TieredCache
+from database import Database
+from executors import ServerBusy
+from jobs import STAGES, JobQueue
+from pdfs import RESUME_TEXT, make_pdf
+from write_behind import WriteBehindBuffer
+
+
+class FlakyExecutor:
+    """Runs calls on a thread, rejecting every ``busy_every``-th one as a
+    saturated extraction pool would"""
+
+    def __init__(self, busy_every: int = 0):
+        self.busy_every = busy_every
+        self.calls = 0
+
+    async def run(self, fn, *args):
+        self.calls += 1
+        if self.busy_every and self.calls % self.busy_every == 0:
+            raise ServerBusy("extraction", retry_after=0)
+        return await asyncio.to_thread(fn, *args)
+
+
+def sse_events(chunks):
+    events = []
+    for chunk in chunks:
+        if chunk.startswith("event: "):
+            name, data = chunk.split("\n")[:2]
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+async def running(queue: JobQueue, body):
+    await queue.writer.start()
+    await queue.start()
+    try:
+        return await body()
+    finally:
+        await queue.stop()
+        await queue.writer.stop()
+
+
+def test_job_streams_every_stage_and_survives_busy_retries(db, tmp_path, monkeypatch):
+    extractions = []
+    extract_resume = pipeline.extract_resume
+    monkeypatch.setattr(pipeline, "extract_resume", lambda *args: extractions.append(1) or extract_resume(*args))
+    monkeypatch.setattr(jobs, "extraction_executor", FlakyExecutor(busy_every=2))
+    pdf = tmp_path / "resume.pdf"
+    pdf.write_bytes(make_pdf([RESUME_TEXT]))
+    queue = JobQueue(db, TieredCache(None, 0), WriteBehindBuffer(db), workers=1)
+
+    async def submit_and_follow():
+        job_id = await queue.submit(str(pdf), "resume.pdf")
+        return job_id, [chunk async for chunk in queue.events(job_id)]
+
+    job_id, chunks = asyncio.run(running(queue, submit_and_follow))
+    events = sse_events(chunks)
+    assert [name for name, _ in events] == ["status", "status", *["stage"] * len(STAGES), "done"]
+    assert [payload["stage"] for name, payload in events if name == "stage"] == list(STAGES)
+    assert len(extractions) == 1
+    job = db.get_job(job_id)
+    assert job["status"] == "done" and job["result"]["email"] != "N/A"
+
+
+def test_only_one_owner_holds_a_job(db):
+    db.create_job("job1", "a.pdf", "/tmp/a.pdf")
+    assert db.claim_job("job1", "a", 60)
+    assert not db.claim_job("job1", "b", 60)
+    assert db.claim_job("job1", "a", 60)  # renewal
+    assert db.get_unfinished_jobs() == []
+    db.claim_job("job1", "a", -1)  # lease ran out
+    assert [job["id"] for job in db.get_unfinished_jobs()] == ["job1"]
+    assert db.claim_job("job1", "b", 60)
+    db.update_job("job1", status="done")
+    assert not db.claim_job("job1", "b", 60)
+
+
+def test_queues_sharing_a_database_run_each_job_once(db, db_path, tmp_path, monkeypatch):
+    runs = []
+
+    async def analyze(file_path, data, filename, writer, cache, on_stage=None, save=True):
+        runs.append(filename)
+        await asyncio.sleep(0.05)
+        return {"filename": filename}
+    monkeypatch.setattr(jobs, "analyze_resume_file", analyze)
+    for name in ("orphaned", "crashed", "live"):
+        (tmp_path / name).write_bytes(b"%PDF")
+        db.create_job(name, name, str(tmp_path / name))
+    db.claim_job("crashed", "dead-process", -1)
+    db.claim_job("live", "other-process", 60)
+
+    other_db = Database(db_path)
+    queues = [JobQueue(database, TieredCache(None, 0), WriteBehindBuffer(database))
+              for database in (db, other_db)]
+
+    async def both():
+        await asyncio.gather(*(queue.start() for queue in queues))
+        for _ in range(100):
+            if all(db.get_job(name)["status"] == "done" for name in ("orphaned", "crashed")):
+                break
+            await asyncio.sleep(0.02)
+        await asyncio.gather(*(queue.stop() for queue in queues))
+
+    asyncio.run(both())
+    other_db.close()
+    assert sorted(runs) == ["crashed", "orphaned"]
+    assert db.get_job("live")["status"] == "queued"
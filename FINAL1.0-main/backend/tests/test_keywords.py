@@ -0,0 +1,26 @@
+from src.helper import _tokenize, extract_keywords
+
+
+def test_tokenizer_splits_compound_tokens_and_pairs_neighbours():
+    terms, counts = _tokenize("built apis in node.js, ci/cd with jenkins. machine learning.")
+    assert {"node.js", "node", "js", "ci/cd", "ci", "cd", "machine learning"} <= terms
+    assert counts["jenkins"] == 1 and "learning." not in counts
+
+
+def test_skills_match_whole_tokens_only():
+    _, keywords = extract_keywords("Google Cloud and JavaScript; goals included scalability")
+    assert "javascript" in keywords
+    assert "go" not in keywords and "java" not in keywords and "ai" not in keywords
+
+
+def test_roles_come_first_and_aliases_are_normalised():
+    summary, keywords = extract_keywords("React frontend with Node and Mongo, deployed on AWS", limit=7)
+    # fullstack: React plus Node; skills keep SKILL_PATTERNS order, aliases normalised
+    assert keywords == ["frontend developer", "backend developer", "fullstack developer",
+                        "react", "nodejs", "mongodb", "aws"]
+    assert summary == ", ".join(keywords)
+
+
+def test_frequent_words_fill_in_when_few_skills_are_found():
+    _, keywords = extract_keywords("Accountant: audits, audits, audits and payroll for the firm", limit=3)
+    assert keywords == ["audits", "accountant", "payroll"]
@@ -0,0 +1,76 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import metrics
+from metrics import Counter, Gauge, Histogram, timed
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Metrics made by a test register here, not next to the real ones"""
+    monkeypatch.setattr(metrics, "_registry", {})
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value, "ocr")
+    assert metrics.render().splitlines() == [
+        "# HELP stage_seconds Stage time",
+        "# TYPE stage_seconds histogram",
+        'stage_seconds_bucket{stage="ocr",le="0.1"} 1',
+        'stage_seconds_bucket{stage="ocr",le="1"} 3',
+        'stage_seconds_bucket{stage="ocr",le="+Inf"} 4',
+        'stage_seconds_sum{stage="ocr"} 4.05',
+        'stage_seconds_count{stage="ocr"} 4',
+    ]
+
+
+def test_label_values_are_escaped_and_empty_metrics_skipped():
+    Counter("unused_total", "Never incremented")
+    requests = Counter("requests_total", "Requests", ["route"])
+    requests.inc('/a"b\\c')
+    requests.inc('/a"b\\c', amount=2)
+    assert metrics.render().splitlines()[2:] == ['requests_total{route="/a\\"b\\\\c"} 3']
+
+
+def test_gauge_callback_is_read_at_scrape_time():
+    depth = {"value": 1}
+    Gauge("queue_depth", "Queued jobs", callback=lambda: {(): depth["value"]})
+    Gauge("broken", "Callback raises", callback=lambda: 1 / 0)
+    depth["value"] = 7
+    assert metrics.render().splitlines()[2:] == ["queue_depth 7"]
+
+
+def test_timed_observes_failures_and_works_as_a_decorator():
+    hist = Histogram("work_seconds", "Work", ["step"])
+
+    @timed(hist, "decorated")
+    def work():
+        return 42
+
+    assert work() == 42
+    with pytest.raises(ValueError):
+        with timed(hist, "failing"):
+            raise ValueError
+    assert hist.count("decorated") == 1 and hist.count("failing") == 1
+
+
+def _record_pages(pages):
+    metrics._registry["pages_total"].inc(amount=pages)
+    with timed(metrics._registry["page_seconds"]):
+        return pages * 2
+
+
+def test_worker_samples_are_merged_into_the_server():
+    pages = Counter("pages_total", "Pages")
+    seconds = Histogram("page_seconds", "Page time")
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork")) as pool:
+        for n in (3, 4):
+            result, samples = pool.submit(metrics.call_collecting, _record_pages, n).result()
+            metrics.merge(samples)
+            assert result == n * 2
+    assert pages.value() == 7
+    assert seconds.count() == 2
@@ -0,0 +1,105 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+
+import database
+from benchmarks.skill_index import synthetic_rows
+from database import MIGRATIONS, Database, Migration
+
+
+def test_fresh_database_records_every_migration(db, db_path):
+    with sqlite3.connect(db_path) as conn:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+    assert versions == [m.version for m in MIGRATIONS]
+    assert db.migrate() == []
+    db.create_tables()  # idempotent on restart
+
+
+def test_migrations_backfill_legacy_database(db_path):
+    # user_data as created before any migration existed
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE user_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, email TEXT NOT NULL,
+                resume_score INTEGER NOT NULL, timestamp TEXT NOT NULL, page_no INTEGER NOT NULL,
+                predicted_field TEXT NOT NULL, user_level TEXT NOT NULL, actual_skills TEXT NOT NULL,
+                recommended_skills TEXT NOT NULL, recommended_courses TEXT NOT NULL)
+        """)
+        rows = synthetic_rows(50, seed=1)
+        conn.executemany(
+            "INSERT INTO user_data (name, email, resume_score, timestamp, page_no, predicted_field, "
+            "user_level, actual_skills, recommended_skills, recommended_courses) VALUES (?,?,?,?,?,?,?,?,?,?)",
+            [(r.name, r.email, r.resume_score, r.timestamp, r.page_no, r.predicted_field, r.user_level,
+              r.actual_skills, r.recommended_skills, r.recommended_courses) for r in rows],
+        )
+
+    db = Database(db_path)
+    try:
+        db.create_tables()
+        stats = db.get_statistics()
+        assert stats["total_resumes"] == 50
+        assert stats == db.rebuild_statistics()
+        assert sum(point["resumes"] for point in db.analytics_uploads("day", "2024-01-01", "2024-01-01")) == 50
+        python = [r for r in rows if "python" in {s.strip().lower() for s in r.actual_skills.split(",")}]
+        assert db.search_resumes("python")["total"] == len(python)
+    finally:
+        db.close()
+
+
+def _start_worker(db_path, ready):
+    ready.wait(10)
+    db = Database(db_path)
+    db.create_tables()
+    db.close()
+
+
+def test_workers_starting_together_migrate_once(db_path):
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Event()
+    workers = [ctx.Process(target=_start_worker, args=(db_path, ready)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    ready.set()
+    for worker in workers:
+        worker.join(60)
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    with sqlite3.connect(db_path) as conn:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+        assert conn.execute("SELECT resumes FROM stats_rollup WHERE dimension = 'total'").fetchall() == [(0,)]
+    assert versions == [m.version for m in MIGRATIONS]
+
+
+def test_failed_migration_is_rolled_back_and_retried(db, db_path, monkeypatch):
+    broken = Migration(999, "Broken", ("CREATE TABLE IF NOT EXISTS t999 (a INTEGER)", "SELECT * FROM missing"), ())
+    monkeypatch.setattr(database, "MIGRATIONS", MIGRATIONS + (broken,))
+    with pytest.raises(sqlite3.OperationalError):
+        db.migrate()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 't999'").fetchall() == []
+        assert conn.execute("SELECT version FROM schema_migrations WHERE version = 999").fetchall() == []
+
+    fixed = Migration(999, "Fixed", ("CREATE TABLE IF NOT EXISTS t999 (a INTEGER)",), ())
+    monkeypatch.setattr(database, "MIGRATIONS", MIGRATIONS + (fixed,))
+    assert db.migrate() == [999]
+
+
+class DuplicateIndex(Exception):
+    errno = 1061
+
+
+def test_mysql_reruns_skip_objects_that_already_exist():
+    db = Database(mysql_config={"host": "unused"})
+
+    class Cursor:
+        def execute(self, statement):
+            raise DuplicateIndex("Duplicate key name 'idx_user_data_timestamp'")
+
+    db._execute_ddl(Cursor(), "CREATE INDEX idx_user_data_timestamp ON user_data (timestamp, id)")
+
+    class Broken(Cursor):
+        def execute(self, statement):
+            raise ValueError("syntax error")
+
+    with pytest.raises(ValueError):
+        db._execute_ddl(Broken(), "CREATE INDEX")
@@ -0,0 +1,75 @@
+import multiprocessing
+import sqlite3
+
+import ocr
+from cache import SQLiteCache
+from ocr import GrayImage
+
+
+def _fill(path, max_bytes, worker):
+    store = SQLiteCache(path, max_bytes)
+    for i in range(200):
+        store.put(f"{worker}-{i}", bytes(1000))
+    store.close()
+
+
+def test_byte_total_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path, 50_000).close()
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_fill, args=(path, 50_000, w)) for w in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    store = SQLiteCache(path, 50_000)
+    with sqlite3.connect(path) as conn:
+        stored = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+    assert store.total_bytes == stored
+    assert stored <= 50_000
+    store.close()
+
+
+def test_reads_only_touch_last_access_once_per_resolution(tmp_path):
+    path = str(tmp_path / "cache.db")
+    store = SQLiteCache(path, 10_000)
+    store.put("a", b"x")
+    with sqlite3.connect(path) as conn:
+        before = conn.execute("SELECT last_access FROM cache_entries").fetchone()[0]
+    store.get("a")
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT last_access FROM cache_entries").fetchone()[0] == before
+    store.close()
+
+
+def page(shade: int, dpi: int = 150) -> GrayImage:
+    samples = bytes([255] * 200 * 150 + [shade] * 200 * 150)
+    return GrayImage(200, 300, 200, samples, dpi)
+
+
+def test_page_key_ignores_encoder_noise_but_not_content():
+    noisy = bytearray(page(0).samples)
+    noisy[5] ^= 3  # a few gray levels of noise in one pixel
+    assert ocr.page_key(GrayImage(200, 300, 200, bytes(noisy), 150), "eng") == ocr.page_key(page(0), "eng")
+    assert ocr.page_key(page(128), "eng") != ocr.page_key(page(0), "eng")
+    assert ocr.page_key(page(0, dpi=300), "eng") != ocr.page_key(page(0), "eng")
+    assert ocr.page_key(page(0), "deu") != ocr.page_key(page(0), "eng")
+
+
+def test_ocr_images_skips_cached_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "OCR_CACHE_PATH", str(tmp_path / "ocr_cache.db"))
+    monkeypatch.setattr(ocr, "_cache", None)
+    monkeypatch.setattr(ocr, "HAS_TESSERACT", True)
+    monkeypatch.setattr(ocr, "OCR_WORKERS", 1)
+    calls = []
+
+    def fake_ocr(image, lang):
+        calls.append(image.samples[-1])
+        return ocr.OcrResult(f"shade {image.samples[-1]}", 90.0)
+
+    monkeypatch.setattr(ocr, "_ocr_image", fake_ocr)
+    assert [r.text for r in ocr.ocr_images([page(0), page(64)])] == ["shade 0", "shade 64"]
+    assert [r.text for r in ocr.ocr_images([page(64), page(0), page(128)])] == ["shade 64", "shade 0", "shade 128"]
+    assert calls == [0, 64, 128]
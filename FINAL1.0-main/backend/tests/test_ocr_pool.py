@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+import pytest
+
+import ocr
+from ocr import EMPTY_RESULT, GrayImage
+
+
+class WidthEngine:
+    """Fake OCR engine: names the page by its width and the process that read
+    it. Width 13 crashes the worker process, width 17 raises."""
+    name = "fake"
+
+    def recognize(self, image) -> ocr.OcrResult:
+        if image.width == 13:
+            os._exit(1)
+        if image.width == 17:
+            raise ValueError("unreadable page")
+        time.sleep(0.1)
+        return ocr.OcrResult(f"page {image.width} pid {os.getpid()}", 90.0)
+
+
+def page(width: int) -> GrayImage:
+    return GrayImage(width, 4, width, b"\xff" * width * 4)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Two OCR processes, forked after the fake engine is patched in"""
+    monkeypatch.setattr(ocr, "_get_engine", lambda lang: WidthEngine())
+    monkeypatch.setattr(ocr, "HAS_TESSERACT", True)
+    monkeypatch.setattr(ocr, "OCR_WORKERS", 2)
+    monkeypatch.setattr(ocr, "_page_slots", threading.BoundedSemaphore(4))
+    ocr.shutdown_pool(wait=True)
+    yield
+    ocr.shutdown_pool(wait=True)
+
+
+def test_pages_come_back_in_order_from_several_processes(pool):
+    results = ocr.ocr_images(page(w) for w in range(20, 28))
+    assert [r.text.split(" pid ")[0] for r in results] == [f"page {w}" for w in range(20, 28)]
+    assert len({r.text.split(" pid ")[1] for r in results}) == 2
+    assert str(os.getpid()) not in {r.text.split(" pid ")[1] for r in results}
+
+
+def test_page_cap_and_failed_pages(pool):
+    results = ocr.ocr_images([page(20), page(17), page(21), page(22)], max_pages=3)
+    assert [r.text.split(" pid ")[0] for r in results] == ["page 20", "", "page 21"]
+    assert results[1] == EMPTY_RESULT
+
+
+def test_a_crashed_worker_only_costs_its_batch(pool):
+    results = ocr.ocr_images([page(13), page(20)])
+    assert results[0] == EMPTY_RESULT
+    # The broken pool was dropped; the next call gets a fresh one
+    assert ocr.ocr_images([page(21)])[0].text.startswith("page 21")
+
+
+def test_renders_wait_for_a_free_slot(pool, monkeypatch):
+    monkeypatch.setattr(ocr, "_page_slots", threading.BoundedSemaphore(2))
+    rendered = []
+
+    def pages():
+        for w in range(20, 26):
+            rendered.append(time.monotonic())
+            yield page(w)
+
+    start = time.monotonic()
+    ocr.ocr_images(pages())
+    # A page is rendered, then waits for a slot: with two slots (0.1s pages)
+    # the sixth render has to wait for two rounds of pages to finish
+    assert rendered[5] - start >= 0.15
@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.skill_index import synthetic_rows
+from database import decode_cursor, encode_cursor
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    rows = synthetic_rows(120, seed=2)
+    # Shared timestamps so the id tie-breaker matters
+    for i, row in enumerate(rows):
+        row.timestamp = f"2024-03-0{1 + i % 3} 12:00:00"
+    db.insert_resume_data_batch(rows)
+
+    seen, cursor = [], None
+    while True:
+        page = db.list_resumes(limit=25, cursor=cursor, fields=["id", "timestamp"])
+        seen.extend(page["resumes"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 120
+    assert len({row["id"] for row in seen}) == 120
+    keys = [(row["timestamp"], row["id"]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_keyset_filters(db):
+    rows = synthetic_rows(200, seed=3)
+    db.insert_resume_data_batch(rows)
+    page = db.list_resumes(limit=500, field="Data Science", min_score=60, max_score=80,
+                           since="2024-01-01 01:00:00", until="2024-01-01")
+    expected = [r for r in rows if r.predicted_field == "Data Science" and 60 <= r.resume_score <= 80
+                and "2024-01-01 01:00:00" <= r.timestamp <= "2024-01-01 23:59:59"]
+    assert sorted(r["email"] for r in page["resumes"]) == sorted(r.email for r in expected)
+    assert page["next_cursor"] is None
+
+
+def test_cursor_round_trip_and_rejects_garbage(db):
+    assert decode_cursor(encode_cursor("2024-01-01 00:00:00", 7)) == ("2024-01-01 00:00:00", 7)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        db.list_resumes(fields=["password"])
+    with pytest.raises(ValueError):
+        db.list_resumes(limit=0)
+
+
+class RecordingCursor:
+    def __init__(self, cursor, queries):
+        self._cursor = cursor
+        self._queries = queries
+
+    def execute(self, sql, params=()):
+        self._queries.append((sql, list(params)))
+        return self._cursor.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def test_deep_pages_are_an_index_range(db, monkeypatch):
+    db.insert_resume_data_batch(synthetic_rows(50, seed=6))
+    cursor = db.list_resumes(limit=10)["next_cursor"]
+    queries = []
+    monkeypatch.setattr(db, "_cursor", lambda conn: RecordingCursor(conn.cursor(), queries))
+    db.list_resumes(limit=10, cursor=cursor)
+    db.list_resumes(limit=10, cursor=cursor, field="Data Science")
+    monkeypatch.undo()
+
+    # Planned with bound parameters, as the query really runs
+    with db.connection() as conn:
+        plans = [" ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+                 for sql, params in queries]
+    assert "SEARCH user_data USING INDEX idx_user_data_timestamp (timestamp<?)" in plans[0]
+    assert "SEARCH user_data USING INDEX idx_user_data_field (predicted_field=? AND timestamp<?)" in plans[1]
+    assert not any("SCAN" in plan for plan in plans)
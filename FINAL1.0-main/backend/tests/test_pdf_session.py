@@ -0,0 +1,74 @@
+import builtins
+
+import pytest
+
+import pdf_session
+from pdf_session import PdfSession
+from pdfs import RESUME_TEXT, make_pdf
+from resume_parser_enhanced import ResumeParserEnhanced
+
+
+class CountingModule:
+    """Wraps a PDF library, counting how often it parses a document"""
+
+    def __init__(self, module, opener: str):
+        self._module = module
+        self._opener = opener
+        self.opened = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if name != self._opener:
+            return attr
+
+        def counting(*args, **kwargs):
+            self.opened += 1
+            return attr(*args, **kwargs)
+        return counting
+
+
+@pytest.fixture
+def libraries(monkeypatch):
+    counters = {
+        "fitz": CountingModule(pdf_session.fitz, "open"),
+        "pdfplumber": CountingModule(pdf_session.pdfplumber, "open"),
+        "PyPDF2": CountingModule(pdf_session.PyPDF2, "PdfReader"),
+    }
+    for name, counter in counters.items():
+        monkeypatch.setattr(pdf_session, name, counter)
+    return counters
+
+
+def test_full_analysis_reads_the_file_and_parses_each_backend_once(tmp_path, monkeypatch, libraries):
+    # A short text layer scores poorly, so extraction escalates through every backend
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf(["Jane Doe jane@example.com +1 555 123 4567", "Python developer, SQL and Docker"]))
+    reads = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) == str(path):
+            reads.append(file)
+        return real_open(file, *args, **kwargs)
+    monkeypatch.setattr(builtins, "open", counting_open)
+
+    data = ResumeParserEnhanced(str(path)).extract_data()
+    assert data["email"] == "jane@example.com"
+    assert len(reads) == 1
+    assert {name: counter.opened for name, counter in libraries.items()} == {"fitz": 1, "pdfplumber": 1, "PyPDF2": 1}
+
+
+def test_text_layer_resume_never_reaches_the_slow_backends(libraries):
+    with PdfSession(make_pdf([RESUME_TEXT])) as session:
+        parser = ResumeParserEnhanced("", data=session.data)
+        parser.session = session
+        assert "Jane Doe" in parser.extract_text()
+        assert session.page_count() == 1
+    assert [libraries[name].opened for name in ("fitz", "pdfplumber", "PyPDF2")] == [1, 0, 0]
+
+
+def test_close_releases_handles():
+    session = PdfSession(make_pdf([RESUME_TEXT, RESUME_TEXT]))
+    assert len(session.page_profiles()) == 2 and session.plumber_pdf is not None
+    session.close()
+    assert session._fitz_doc is None and session._plumber_pdf is None and session._profiles is None
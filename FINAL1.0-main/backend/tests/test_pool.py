@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from database import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def fake_pool(**kwargs):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection(len(opened)))
+        return opened[-1]
+
+    return ConnectionPool(connect, lambda conn: conn.alive, **kwargs), opened
+
+
+# Connection pool
+
+def test_pool_reuses_released_connections():
+    pool, opened = fake_pool(size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(opened) == 1
+    assert pool.stats() == {"size": 2, "open": 1, "in_use": 0, "idle": 1, "waiting": 0}
+
+
+def test_pool_times_out_when_exhausted():
+    pool, _ = fake_pool(size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+
+def test_pool_wakes_waiter_on_release():
+    pool, _ = fake_pool(size=1, timeout=5)
+    conn = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    pool.release(conn)
+    waiter.join(5)
+    assert got == [conn]
+
+
+def test_pool_replaces_stale_connection():
+    pool, opened = fake_pool(size=1, ping_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.alive = False
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.stats()["open"] == 1
+
+
+def test_pool_discards_connection_after_failure():
+    pool, opened = fake_pool(size=1)
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            conn.alive = False
+            raise ValueError("query failed")
+    assert conn.closed
+    assert pool.stats()["open"] == 0
+    with pool.connection() as fresh:
+        assert fresh is not conn
@@ -0,0 +1,66 @@
+import pytest
+
+import metrics
+import ocr
+import pdf_session
+import resume_parser_enhanced
+from pdf_session import PdfSession
+from pdfs import RESUME_TEXT, make_pdf
+from resume_parser_enhanced import ResumeParserEnhanced
+
+
+class ShadeEngine:
+    """Fake OCR engine. Pages drawn dark (shade < 100) read cleanly at any
+    resolution; light ones only once rendered wider than 1000 pixels."""
+    name = "fake"
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.calls = []
+
+    def recognize(self, image) -> ocr.OcrResult:
+        dark = image.getpixel((image.width // 2, image.height * 80 // 500)) < 100
+        self.calls.append(("dark" if dark else "light", image.width))
+        confident = dark or image.width > 1000
+        return ocr.OcrResult(self.text or f"read at {image.width}px\n", 95.0 if confident else 40.0)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = ShadeEngine()
+    monkeypatch.setattr(ocr, "_get_engine", lambda lang: engine)
+    monkeypatch.setattr(ocr, "HAS_TESSERACT", True)
+    monkeypatch.setattr(ocr, "OCR_WORKERS", 1)
+    monkeypatch.setattr(resume_parser_enhanced, "HAS_OCR", True)
+    monkeypatch.setattr(pdf_session, "OCR_FAST_DPI", 72)
+    monkeypatch.setattr(pdf_session, "OCR_DPI", 144)
+    monkeypatch.setattr(pdf_session, "OCR_MIN_CONFIDENCE", 75.0)
+    return engine
+
+
+def test_only_low_confidence_pages_are_re_rendered(engine):
+    retries = metrics.OCR_RETRIES.value()
+    with PdfSession(make_pdf([40, 200, 40])) as session:
+        texts = session.ocr_pages([0, 1, 2])
+    assert engine.calls == [("dark", 595), ("light", 595), ("dark", 595), ("light", 1190)]
+    assert texts == {0: "read at 595px\n", 1: "read at 1190px\n", 2: "read at 595px\n"}
+    assert metrics.OCR_RETRIES.value() == retries + 1
+
+
+def test_a_fixed_dpi_skips_the_ladder(engine):
+    with PdfSession(make_pdf([200])) as session:
+        session.ocr_pages([0], dpi=72)
+    assert engine.calls == [("light", 595)]
+
+
+def test_ocr_stops_once_the_caller_has_enough(engine):
+    with PdfSession(make_pdf([40] * 6)) as session:
+        texts = session.ocr_pages(range(6), stop_when=lambda text: text.count("read") >= 2)
+    assert sorted(texts) == [0, 1]
+
+
+def test_scanned_resume_stops_after_contact_details_and_skills(engine):
+    engine.text = RESUME_TEXT
+    text = ResumeParserEnhanced("", data=make_pdf([40] * 4)).extract_text()
+    assert len(engine.calls) == 1
+    assert "jane.doe@example.com" in text
@@ -0,0 +1,37 @@
+import pytest
+
+import ocr
+from pdf_session import PdfSession, render_page
+from pdfs import make_pdf
+
+fitz = pytest.importorskip("fitz")
+
+
+def poster(width: float, height: float) -> bytes:
+    doc = fitz.open()
+    doc.new_page(width=width, height=height)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_page_is_rendered_to_grayscale_in_memory():
+    with PdfSession(make_pdf([40])) as session:
+        page = session.fitz_doc[0]
+        image = render_page(page, dpi=144)
+        assert (image.width, image.height, image.dpi) == (round(page.rect.width * 2), round(page.rect.height * 2), 144)
+        assert len(image.samples) == image.stride * image.height
+        pil = ocr._to_pil(image)
+        assert pil.mode == "L" and pil.size == (image.width, image.height)
+        # The scan's dark block survives; the margin stays white
+        assert pil.getpixel((image.width // 2, image.height * 80 // 500)) < 100
+        assert pil.getpixel((5, 5)) == 255
+
+
+def test_huge_pages_are_scaled_under_the_pixel_ceiling():
+    with PdfSession(poster(72 * 40, 72 * 30)) as session:
+        image = render_page(session.fitz_doc[0], dpi=300, max_pixels=4_000_000)
+    assert image.width * image.height <= 4_000_000
+    assert image.width * image.height > 3_900_000
+    assert image.dpi < 300
+    assert image.width / image.height == pytest.approx(40 / 30, rel=0.01)
@@ -0,0 +1,48 @@
+import pytest
+
+from benchmarks.skill_index import synthetic_rows
+from database import SEARCH_COUNT_LIMIT, ResumeData, _split_skills, skill_key
+
+
+def brute_force(rows, ids, query, kind="actual", field=None, level=None, min_score=None):
+    groups = [[skill_key(term) for term in group.split("|")] for group in query.split(",")]
+    hits = []
+    for row, row_id in zip(rows, ids):
+        keys = {skill_key(name) for name in _split_skills(getattr(row, f"{kind}_skills"))}
+        if all(keys & set(group) for group in groups) and \
+                (field is None or row.predicted_field == field) and \
+                (level is None or row.user_level == level) and \
+                (min_score is None or row.resume_score >= min_score):
+            hits.append((row.resume_score, row_id))
+    return [row_id for _, row_id in sorted(hits, reverse=True)]
+
+
+def assert_search_matches_brute_force(db, rows, query, **filters):
+    ids = list(range(1, len(rows) + 1))
+    expected = brute_force(rows, ids, query, **filters)
+    result = db.search_resumes(query, limit=50, **filters)
+    assert [r["id"] for r in result["resumes"]] == expected[:50]
+    assert result["total"] == min(len(expected), SEARCH_COUNT_LIMIT)
+
+
+@pytest.mark.parametrize("query,filters", [
+    ("python", {}),
+    ("react|vue|angular,node.js", {}),
+    ("python,sql", {"field": "Data Science", "min_score": 70}),
+    ("ios|android", {"level": "Senior"}),
+    ("tableau", {"kind": "recommended"}),
+])
+def test_search_matches_brute_force(db, query, filters):
+    rows = synthetic_rows(400, seed=5)
+    db.insert_resume_data_batch(rows)
+    assert_search_matches_brute_force(db, rows, query, **filters)
+
+
+def test_search_keeps_accented_skills_apart(db):
+    base = dict(email="a@example.com", resume_score=50, timestamp="2024-01-01 00:00:00", page_no=1,
+                predicted_field="General IT", user_level="Fresher", recommended_skills="", recommended_courses="")
+    db.insert_resume_data(ResumeData(name="A", actual_skills="Café", **base))
+    db.insert_resume_data(ResumeData(name="B", actual_skills="Cafe", **base))
+    assert [r["name"] for r in db.search_resumes("café")["resumes"]] == ["A"]
+    assert [r["name"] for r in db.search_resumes("cafe")["resumes"]] == ["B"]
+    assert db.search_resumes("cobol")["unknown_skills"] == ["cobol"]
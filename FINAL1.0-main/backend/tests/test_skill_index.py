@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+import skill_index
+from benchmarks.skill_index import FIELDS, LEVELS, QUERIES, synthetic_rows
+from database import SEARCH_COUNT_LIMIT, Database
+from skill_index import IntBitmap, SkillIndex
+
+
+def assert_same_results(db, index, skills, **filters):
+    sql = db.search_resumes(skills, **filters)
+    hits = index.search(skills, **filters)
+    assert hits["ids"] == [row["id"] for row in sql["resumes"]]
+    assert min(hits["total"], SEARCH_COUNT_LIMIT) == sql["total"]
+    assert hits["unknown_skills"] == sql["unknown_skills"]
+
+
+@pytest.fixture
+def loaded(db):
+    db.insert_resume_data_batch(synthetic_rows(600, seed=7))
+    index = SkillIndex()
+    index.load(db)
+    return db, index
+
+
+@pytest.mark.parametrize("skills,filters", QUERIES)
+def test_index_matches_sql_search(loaded, skills, filters):
+    assert_same_results(*loaded, skills, **filters)
+
+
+def test_index_matches_sql_on_random_queries(loaded):
+    db, index = loaded
+    rng = random.Random(8)
+    names = ["python", "sql", "react", "docker", "aws", "java", "figma", "kotlin", "swift", "cobol"]
+    for _ in range(100):
+        groups = [rng.sample(names, rng.randint(1, 3)) for _ in range(rng.randint(1, 3))]
+        filters = {}
+        if rng.random() < 0.3:
+            filters["field"] = rng.choice(FIELDS)
+        if rng.random() < 0.3:
+            filters["level"] = rng.choice(LEVELS)
+        if rng.random() < 0.3:
+            filters["min_score"] = rng.randint(30, 90)
+        if rng.random() < 0.2:
+            filters["kind"] = "recommended"
+        filters["limit"] = rng.choice([1, 10, 50, 500])
+        assert_same_results(db, index, ",".join("|".join(group) for group in groups), **filters)
+
+
+def test_int_bitmap_fallback_matches(loaded, monkeypatch):
+    db, _ = loaded
+    monkeypatch.setattr(skill_index, "HAS_ROARING", False)
+    index = SkillIndex()
+    index.load(db)
+    assert isinstance(index._all, IntBitmap)
+    for skills, filters in QUERIES:
+        assert_same_results(db, index, skills, **filters)
+
+
+def test_refresh_picks_up_rows_written_elsewhere(loaded, db_path):
+    db, index = loaded
+    other = Database(db_path)  # another worker process writing the same database
+    try:
+        other.insert_resume_data_batch(synthetic_rows(50, seed=9))
+        for row in synthetic_rows(5, seed=10):
+            other.insert_resume_data(row)
+    finally:
+        other.close()
+    assert index.refresh(db) == 55
+    assert len(index) == 655
+    assert index.refresh(db) == 0
+    for skills, filters in QUERIES:
+        assert_same_results(db, index, skills, **filters)
+
+
+def test_refresh_rechecks_ids_committed_out_of_order(loaded):
+    db, index = loaded
+    rows = synthetic_rows(3, seed=11)
+    first, second, third = (db.insert_resume_data(row) for row in rows)
+    with db.connection() as conn:
+        saved = [dict(row) for row in conn.execute(
+            "SELECT * FROM user_data WHERE id IN (?, ?)", (first, second)).fetchall()]
+        # Simulate the first two ids still uncommitted when the index catches up
+        conn.execute("DELETE FROM user_data WHERE id IN (?, ?)", (first, second))
+        conn.commit()
+    assert index.refresh(db) == 1
+    assert set(index._gaps) >= {first, second}
+    with db.connection() as conn:
+        for row in saved:
+            conn.execute(f"INSERT INTO user_data ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                         tuple(row.values()))
+        conn.commit()
+    assert index.refresh(db) == 2
+    assert first not in index._gaps and second not in index._gaps
+    assert len(index) == 603
+
+
+def test_unloaded_index_does_not_refresh(db):
+    assert SkillIndex().refresh(db) == 0
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks.skill_matching import (
+    compiled_enhanced, compiled_resume_parser, legacy_enhanced, legacy_resume_parser, synthetic_resume,
+)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("density", [0.02, 0.2, 0.6])
+def test_compiled_matchers_find_what_the_regex_loops_found(seed, density):
+    text = synthetic_resume(400, density, seed)
+    assert compiled_resume_parser(text) == legacy_resume_parser(text)
+    assert compiled_enhanced(text) == legacy_enhanced(text)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "c++ and c# developer; node.js, react.js / vue",
+    "java javascript typescript",
+    "machine learning, deep-learning, ml ops",
+    "ci/cd with k8s | aws.amazon | gcp",
+])
+def test_compiled_matchers_on_edge_cases(text):
+    assert compiled_resume_parser(text) == legacy_resume_parser(text)
+    assert compiled_enhanced(text) == legacy_enhanced(text)
@@ -0,0 +1,24 @@
+from benchmarks.skill_index import synthetic_rows
+
+
+def test_stats_rollup_matches_a_full_recount(db):
+    rows = synthetic_rows(300, seed=4)
+    db.insert_resume_data_batch(rows[:200])
+    for row in rows[200:]:
+        db.insert_resume_data(row)
+
+    stats = db.get_statistics()
+    assert stats["total_resumes"] == 300
+    assert stats["average_score"] == round(sum(r.resume_score for r in rows) / 300, 2)
+    fields, levels = {}, {}
+    for row in rows:
+        fields[row.predicted_field] = fields.get(row.predicted_field, 0) + 1
+        levels[row.user_level] = levels.get(row.user_level, 0) + 1
+    assert stats["field_distribution"] == fields
+    assert stats["level_distribution"] == levels
+    assert db.rebuild_statistics() == stats
+
+
+def test_empty_database_statistics(db):
+    assert db.get_statistics() == {"total_resumes": 0, "average_score": 0.0,
+                                   "field_distribution": {}, "level_distribution": {}}
@@ -0,0 +1,44 @@
+import asyncio
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import lazy_imports
+import main
+import pipeline
+from executors import BoundedExecutor
+from lazy_imports import LazyModule, lazy_import
+
+HEAVY_MODULES = ("fitz", "pdfplumber", "PyPDF2", "PIL.Image", "pytesseract", "requests")
+
+
+def test_lazy_module_imports_on_first_attribute_access():
+    assert lazy_import("no_such_module_anywhere") is None
+    assert lazy_import("no_such_package.child") is None
+    module = LazyModule("json")
+    assert "not loaded" in repr(module)
+    assert module.dumps([1]) == "[1]"
+    assert "(loaded)" in repr(module)
+    assert lazy_imports.load([module, None]) == ["json"]
+
+
+def test_importing_the_app_defers_heavy_libraries():
+    probe = f"import sys, main; print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = {**os.environ, "WARMUP": "0", "PARSE_CACHE_PATH": "", "OCR_CACHE_PATH": ""}
+    out = subprocess.run([sys.executable, "-c", probe], cwd=Path(main.__file__).parent, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_warm_up_marks_the_server_ready(monkeypatch):
+    monkeypatch.setattr(main, "warmup_state", {"ready": False})
+    monkeypatch.setattr(main, "extraction_executor",
+                        BoundedExecutor("extraction", lambda: ThreadPoolExecutor(1), 2))
+    # Workers also probe OCR; that is covered by the health tests
+    monkeypatch.setattr(main, "warm_up", lambda check_ocr=True: pipeline.warm_up(False))
+    asyncio.run(main.run_warm_up())
+    state = main.warmup_state
+    assert state["ready"] and "error" not in state
+    assert "fitz" in state["api"]["modules"] and state["extraction"]["seconds"] >= 0
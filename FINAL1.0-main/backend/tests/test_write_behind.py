@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+import write_behind
+from benchmarks.skill_index import synthetic_rows
+from executors import ServerBusy
+from write_behind import WriteBehindBuffer, WriterClosed
+
+
+class FlakyDatabase:
+    """Stands in for Database: records inserts, fails the ones asked to"""
+
+    def __init__(self, db, fail_batches=False, bad_emails=(), busy=False):
+        self.db = db
+        self.fail_batches = fail_batches
+        self.bad_emails = set(bad_emails)
+        self.busy = busy
+        self.batches = []
+
+    def insert_resume_data_batch(self, records):
+        if self.busy:
+            raise ServerBusy("database", retry_after=0)
+        self.batches.append(len(records))
+        if self.fail_batches:
+            raise RuntimeError("batch failed")
+        return self.db.insert_resume_data_batch(records)
+
+    def insert_resume_data(self, record):
+        if self.busy:
+            raise ServerBusy("database", retry_after=0)
+        if record.email in self.bad_emails:
+            raise RuntimeError("bad row")
+        return self.db.insert_resume_data(record)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_stop_flushes_buffered_rows(db):
+    async def scenario():
+        writer = WriteBehindBuffer(db, batch_size=10, max_delay=60)
+        await writer.start()
+        futures = [await writer.add(row) for row in synthetic_rows(25, seed=1)]
+        await writer.stop()
+        return futures
+
+    futures = run(scenario())
+    assert all(f.result() is True for f in futures)
+    assert db.get_statistics()["total_resumes"] == 25
+
+
+def test_full_batch_is_written_without_waiting_for_the_delay(db):
+    async def scenario():
+        fake = FlakyDatabase(db)
+        writer = WriteBehindBuffer(fake, batch_size=5, max_delay=60)
+        await writer.start()
+        futures = [await writer.add(row) for row in synthetic_rows(5, seed=2)]
+        saved = await asyncio.wait_for(asyncio.gather(*futures), 5)
+        await writer.stop()
+        return saved, fake.batches
+
+    saved, batches = run(scenario())
+    assert saved == [True] * 5
+    assert batches == [5]
+
+
+def test_partial_batch_is_written_after_max_delay(db):
+    async def scenario():
+        writer = WriteBehindBuffer(db, batch_size=50, max_delay=0.05)
+        await writer.start()
+        future = await writer.add(synthetic_rows(1, seed=3)[0])
+        saved = await asyncio.wait_for(future, 5)
+        await writer.stop()
+        return saved
+
+    assert run(scenario()) is True
+
+
+def test_failed_batch_falls_back_to_row_inserts(db):
+    rows = synthetic_rows(6, seed=4)
+
+    async def scenario():
+        writer = WriteBehindBuffer(FlakyDatabase(db, fail_batches=True, bad_emails={rows[2].email}),
+                                   batch_size=10, max_delay=60)
+        await writer.start()
+        futures = [await writer.add(row) for row in rows]
+        await writer.stop()
+        return [f.result() for f in futures]
+
+    assert run(scenario()) == [True, True, False, True, True, True]
+    assert db.get_statistics()["total_resumes"] == 5
+
+
+def test_stop_gives_up_when_database_stays_busy(db, monkeypatch):
+    monkeypatch.setattr(write_behind, "DB_WRITE_BUSY_RETRIES", 3)
+
+    async def scenario():
+        writer = WriteBehindBuffer(FlakyDatabase(db, busy=True), batch_size=10, max_delay=60)
+        await writer.start()
+        futures = [await writer.add(row) for row in synthetic_rows(4, seed=5)]
+        await asyncio.wait_for(writer.stop(), 5)
+        return [f.result() for f in futures], writer.depth
+
+    results, depth = run(scenario())
+    assert results == [False] * 4
+    assert depth == 0
+
+
+def test_row_retry_gives_up_when_database_stays_busy(db, monkeypatch):
+    monkeypatch.setattr(write_behind, "DB_WRITE_BUSY_RETRIES", 2)
+    fake = FlakyDatabase(db, busy=True)
+
+    async def scenario():
+        writer = WriteBehindBuffer(fake, batch_size=10, max_delay=60)
+        return await writer._write_row(synthetic_rows(1, seed=6)[0])
+
+    assert run(scenario()) is False
+
+
+def test_add_refuses_rows_when_not_running(db):
+    async def scenario():
+        writer = WriteBehindBuffer(db)
+        with pytest.raises(WriterClosed):
+            await writer.add(synthetic_rows(1, seed=7)[0])
+        await writer.start()
+        await writer.stop()
+        with pytest.raises(WriterClosed):
+            await writer.add(synthetic_rows(1, seed=7)[0])
+
+    run(scenario())
+
+
+class InterleavingCursor:
+    """MySQL cursor whose auto-increment ids are interleaved with another
+    session's inserts, as innodb_autoinc_lock_mode=2 allows"""
+
+    def __init__(self):
+        self.next_id = 100
+        self.lastrowid = None
+
+    def execute(self, sql, params=()):
+        self.lastrowid = self.next_id
+        self.next_id += 2
+
+    def executemany(self, sql, rows):
+        raise AssertionError("a multi-row INSERT's ids are not consecutive on MySQL")
+
+
+def test_batch_insert_returns_each_rows_id(db):
+    rows = synthetic_rows(5, seed=8)
+    ids = db.insert_resume_data_batch(rows)
+    with db.connection() as conn:
+        cursor = db._cursor(conn)
+        cursor.execute("SELECT id, email FROM user_data")
+        stored = {row["id"]: row["email"] for row in cursor.fetchall()}
+    assert [stored[row_id] for row_id in ids] == [row.email for row in rows]
+
+    db.use_mysql = True
+    try:
+        assert db._insert_rows(InterleavingCursor(), "INSERT", [(), (), ()]) == [100, 102, 104]
+    finally:
+        db.use_mysql = False
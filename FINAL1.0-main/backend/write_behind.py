@@ -0,0 +1,164 @@
+"""
+Write-behind buffer for analysed resume rows
+Uploads hand their user_data row to a shared buffer instead of inserting
+and committing it themselves; a background task writes the buffer with one
+executemany() transaction per batch, once it is full or its oldest row has
+waited long enough. Whatever is buffered at shutdown is flushed by the
+app lifespan.
+"""
+
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from database import Database, ResumeData
+from executors import ServerBusy, db_executor
+
+logger = logging.getLogger("resume_analyzer")
+
+# Rows per executemany() insert
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "50"))
+# Seconds a buffered row may wait for its batch to fill before it is written anyway
+DB_WRITE_MAX_DELAY = float(os.getenv("DB_WRITE_MAX_DELAY", "0.5"))
+# Buffered rows before add() waits for a flush (backpressure if the database falls behind)
+DB_WRITE_MAX_BUFFERED = int(os.getenv("DB_WRITE_MAX_BUFFERED", "1000"))
+# Attempts while the DB pool is saturated for a row retried on its own, and
+# for a batch during shutdown; after that the rows are reported unsaved
+DB_WRITE_BUSY_RETRIES = int(os.getenv("DB_WRITE_BUSY_RETRIES", "5"))
+
+
+class WriterClosed(RuntimeError):
+    """The buffer is not running (not started yet, or shutting down)"""
+
+
+class WriteBehindBuffer:
+    """Batches resume inserts behind a background flusher task"""
+
+    def __init__(self, db: Database, batch_size: int = DB_WRITE_BATCH,
+                 max_delay: float = DB_WRITE_MAX_DELAY, max_buffered: int = DB_WRITE_MAX_BUFFERED):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.max_buffered = max(self.batch_size, max_buffered)
+        self._pending: List[Tuple[ResumeData, asyncio.Future]] = []
+        self._oldest = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._lock: Optional[asyncio.Lock] = None
+        self._has_rows: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+
+    @property
+    def depth(self) -> int:
+        """Rows waiting to be written"""
+        return len(self._pending)
+
+    async def start(self):
+        self._lock = asyncio.Lock()
+        self._has_rows = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write everything still buffered, then stop the flusher"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._has_rows.set()
+        self._batch_full.set()
+        await self._task
+        self._task = None
+
+    async def add(self, record: ResumeData) -> asyncio.Future:
+        """Buffer a row. The returned future resolves to True once the row is
+        committed (False if it could not be saved); callers need not await it."""
+        if self._task is None or self._closing:
+            raise WriterClosed("Write-behind buffer is not running")
+        if len(self._pending) >= self.max_buffered:
+            await self.flush()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            self._oldest = loop.time()
+        self._pending.append((record, future))
+        self._has_rows.set()
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+        return future
+
+    async def flush(self):
+        """Write all buffered rows now, a batch at a time"""
+        async with self._lock:
+            busy_attempts = 0
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    results = await self._write([record for record, _ in batch])
+                except ServerBusy as busy:
+                    # DB pool backlog is full; keep the rows and try again shortly.
+                    # During shutdown give up eventually instead of hanging stop()
+                    busy_attempts += 1
+                    if self._closing and busy_attempts >= DB_WRITE_BUSY_RETRIES:
+                        dropped, self._pending = batch + self._pending, []
+                        logger.error(f"Database still busy at shutdown; {len(dropped)} resume rows not saved")
+                        results, batch = [False] * len(dropped), dropped
+                    else:
+                        self._pending[:0] = batch
+                        await asyncio.sleep(busy.retry_after)
+                        continue
+                for (_, future), saved in zip(batch, results):
+                    if not future.done():
+                        future.set_result(saved)
+            self._has_rows.clear()
+            self._batch_full.clear()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._has_rows.wait()
+            while not self._closing and len(self._pending) < self.batch_size:
+                remaining = self._oldest + self.max_delay - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            await self.flush()
+            if self._closing:
+                return
+
+    async def _write(self, records: List[ResumeData]) -> List[bool]:
+        """Insert rows in one transaction; which of them were saved"""
+        try:
+            await db_executor.run(self.db.insert_resume_data_batch, records)
+        except ServerBusy:
+            raise
+        except Exception as batch_err:
+            # One bad row fails the whole executemany; save the rest individually
+            logger.warning(f"Batch insert of {len(records)} rows failed, retrying row by row: {batch_err}")
+        else:
+            logger.info(f"Saved {len(records)} resume rows to database")
+            return [True] * len(records)
+        return [await self._write_row(record) for record in records]
+
+    async def _write_row(self, record: ResumeData) -> bool:
+        # Rows before this one may already be committed, so a busy pool is
+        # waited out here rather than raised to flush(), which would re-add them
+        for attempt in range(DB_WRITE_BUSY_RETRIES):
+            try:
+                await db_executor.run(self.db.insert_resume_data, record)
+            except ServerBusy as busy:
+                if attempt < DB_WRITE_BUSY_RETRIES - 1:
+                    await asyncio.sleep(busy.retry_after)
+                    continue
+                logger.warning(f"Database insert failed (non-critical): {busy}")
+                return False
+            except Exception as db_err:
+                logger.warning(f"Database insert failed (non-critical): {str(db_err)}")
+                return False
+            return True
+        return False
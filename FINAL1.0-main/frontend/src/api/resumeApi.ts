@@ -45,6 +45,12 @@ export interface ResumeRecord {
   recommended_courses: string;
 }
 
+export interface ResumePage {
+  resumes: ResumeRecord[];
+  // Pass back as `cursor` for the next page; null on the last page
+  next_cursor: string | null;
+}
+
 const api = axios.create({
   baseURL: API_URL,
 });
@@ -73,9 +79,11 @@ export const getAdminStats = async (): Promise<AdminStats> => {
   return response.data;
 };
 
-export const getAllResumes = async (): Promise<ResumeRecord[]> => {
-  const response = await api.get('/admin/resumes');
-  return response.data.resumes;
+export const getResumesPage = async (cursor?: string | null, limit = 50): Promise<ResumePage> => {
+  const response = await api.get('/admin/resumes', {
+    params: { limit, ...(cursor ? { cursor } : {}) },
+  });
+  return response.data;
 };
 
 export const getCoursesByField = async (field: string): Promise<Course[]> => {
@@ -1,11 +1,13 @@
 import { useEffect, useState } from 'react';
 import { BarChart3, Users, TrendingUp } from 'lucide-react';
-import { getAdminStats, getAllResumes } from '../api/resumeApi';
+import { getAdminStats, getResumesPage } from '../api/resumeApi';
 import type { AdminStats, ResumeRecord } from '../api/resumeApi';
 
 function AdminPage() {
   const [stats, setStats] = useState<AdminStats | null>(null);
   const [resumes, setResumes] = useState<ResumeRecord[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
@@ -15,12 +17,13 @@ function AdminPage() {
 
   const loadData = async () => {
     try {
-      const [statsData, resumesData] = await Promise.all([
+      const [statsData, firstPage] = await Promise.all([
         getAdminStats(),
-        getAllResumes()
+        getResumesPage()
       ]);
       setStats(statsData);
-      setResumes(resumesData);
+      setResumes(firstPage.resumes);
+      setNextCursor(firstPage.next_cursor);
     } catch (err: any) {
       setError('Failed to load admin data');
       console.error('Admin data error:', err);
@@ -29,6 +32,22 @@ function AdminPage() {
     }
   };
 
+  // /admin/resumes is paginated; each click appends the next page
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getResumesPage(nextCursor);
+      setResumes((current) => [...current, ...page.resumes]);
+      setNextCursor(page.next_cursor);
+    } catch (err: any) {
+      setError('Failed to load more resumes');
+      console.error('Admin data error:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="page-container">
@@ -101,6 +120,9 @@ function AdminPage() {
 
       <div className="card">
         <h2>All Resumes</h2>
+        {stats && (
+          <p>Showing {resumes.length} of {stats.total_resumes} resumes</p>
+        )}
         <div className="table-container">
           <table>
             <thead>
@@ -127,6 +149,11 @@ function AdminPage() {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <button className="btn btn-primary" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );